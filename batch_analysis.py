@@ -0,0 +1,223 @@
+# Batch runner: analyze a portfolio of companies with bounded concurrency,
+# global OpenAI/Tavily rate limits and a resumable JSONL manifest
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from market_research_system import MarketResearchSystem
+from results import AnalysisResult, save_portfolio
+from dotenv import load_dotenv
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+
+# Read (company, industry) rows from a CSV with a header or from JSONL
+def load_companies(path: str) -> list:
+    companies = []
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    for row in rows:
+        company = (row.get("company") or "").strip()
+        industry = (row.get("industry") or "").strip()
+        if not company or not industry:
+            raise ValueError(f"Every row needs a company and an industry: {row}")
+        companies.append({"company": company, "industry": industry})
+    return companies
+
+
+# Manifest entries are keyed case-insensitively by company and industry
+def entry_key(company: str, industry: str) -> str:
+    return f"{company.strip().lower()}|{industry.strip().lower()}"
+
+
+# Latest status per company from an append-only manifest; the last line wins
+def load_manifest(path: str) -> dict:
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated final line
+                continue
+            entries[entry_key(entry["company"], entry["industry"])] = entry
+    return entries
+
+
+# Requests-per-minute to a limiter; None or 0 disables limiting
+def make_rate_limiter(requests_per_minute: float):
+    if not requests_per_minute:
+        return None
+    return InMemoryRateLimiter(
+        requests_per_second=requests_per_minute / 60.0,
+        check_every_n_seconds=0.1,
+        max_bucket_size=1
+    )
+
+
+class BatchAnalysis:
+    def __init__(self, companies: list, manifest_path: str, openai_api_key: str, tavily_api_key: str,
+                 workers: int = 4, openai_rpm: float = 60, tavily_rpm: float = 60,
+                 execution_strategy: str = "dag", use_search_cache: bool = True, pipeline: str = "multi_agent",
+                 system_factory=MarketResearchSystem):
+        self.companies = companies
+        self.manifest_path = manifest_path
+        self.openai_api_key = openai_api_key
+        self.tavily_api_key = tavily_api_key
+        self.workers = workers
+        self.execution_strategy = execution_strategy
+        self.use_search_cache = use_search_cache
+        self.pipeline = pipeline
+        # Builds the analysis for one company; MarketResearchSystem unless a test
+        # or harness substitutes its own
+        self.system_factory = system_factory
+
+        # One limiter per provider, shared by every worker
+        self.llm_rate_limiter = make_rate_limiter(openai_rpm)
+        self.search_rate_limiter = make_rate_limiter(tavily_rpm)
+
+        self._manifest_lock = threading.Lock()
+
+    def _record(self, entry: dict):
+        # Append and fsync so a crash never loses a finished company
+        with self._manifest_lock:
+            directory = os.path.dirname(self.manifest_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _analyze(self, company: str, industry: str) -> dict:
+        started = time.perf_counter()
+        self._record({
+            "company": company,
+            "industry": industry,
+            "status": "running",
+            "updated_at": datetime.now().isoformat()
+        })
+
+        entry = {"company": company, "industry": industry}
+        system = None
+        try:
+            system = self.system_factory(
+                company=company,
+                industry=industry,
+                openai_api_key=self.openai_api_key,
+                tavily_api_key=self.tavily_api_key,
+                use_search_cache=self.use_search_cache,
+                llm_rate_limiter=self.llm_rate_limiter,
+                search_rate_limiter=self.search_rate_limiter,
+                pipeline=self.pipeline
+            )
+            report, md_file, html_file = system.run(execution_strategy=self.execution_strategy) or (None, None, None)
+
+            if report:
+                entry.update({"status": "done", "md_file": md_file, "html_file": html_file,
+                              "result_file": system.result_file})
+            else:
+                entry.update({"status": "failed", "error": "Analysis generation failed"})
+        except Exception as e:
+            entry.update({"status": "failed", "error": str(e)})
+
+        if system is not None and system.usage:
+            entry["usage"] = system.usage["totals"]
+        entry["duration"] = time.perf_counter() - started
+        entry["updated_at"] = datetime.now().isoformat()
+        self._record(entry)
+        return entry
+
+    # Analyze every company not already marked done in the manifest
+    def run(self, retry_failed: bool = True) -> dict:
+        previous = load_manifest(self.manifest_path)
+        skip = {"done"} if retry_failed else {"done", "failed"}
+
+        todo = [
+            item for item in self.companies
+            if previous.get(entry_key(item["company"], item["industry"]), {}).get("status") not in skip
+        ]
+        print(f"{len(self.companies) - len(todo)} of {len(self.companies)} companies already processed, "
+              f"{len(todo)} remaining")
+
+        counts = {"done": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self._analyze, item["company"], item["industry"]): item
+                for item in todo
+            }
+            for future in as_completed(futures):
+                entry = future.result()
+                counts[entry["status"]] += 1
+                print(f"[{counts['done'] + counts['failed']}/{len(todo)}] {entry['company']}: "
+                      f"{entry['status']} in {entry['duration']:.1f}s")
+
+        return counts
+
+    # Collect the structured results of every finished company into one portfolio file
+    def export(self, path: str) -> int:
+        results = []
+        for entry in load_manifest(self.manifest_path).values():
+            result_file = entry.get("result_file")
+            if entry.get("status") == "done" and result_file and os.path.exists(result_file):
+                with open(result_file, encoding="utf-8") as f:
+                    results.append(AnalysisResult.from_json(f.read()))
+        save_portfolio(results, path)
+        return len(results)
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run market research analyses for a portfolio of companies")
+    parser.add_argument("input", help="CSV (with company,industry header) or JSONL file of companies")
+    parser.add_argument("--manifest", default="reports/batch_manifest.jsonl",
+                        help="Status/result manifest; rerunning with the same manifest resumes the batch")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent analyses")
+    parser.add_argument("--openai-rpm", type=float, default=60, help="Global OpenAI requests per minute (0 = unlimited)")
+    parser.add_argument("--tavily-rpm", type=float, default=60, help="Global Tavily requests per minute (0 = unlimited)")
+    parser.add_argument("--strategy", choices=["sequential", "dag"], default="dag", help="Task execution strategy")
+    parser.add_argument("--pipeline", default="multi_agent",
+                        help="Built-in pipeline (multi_agent, single_agent) or a YAML/JSON pipeline file")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry companies that failed previously")
+    parser.add_argument("--no-search-cache", action="store_true", help="Bypass the search cache")
+    parser.add_argument("--export", help="Write all structured results to this .jsonl, .msgpack or .parquet file")
+    args = parser.parse_args()
+
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    if not openai_api_key or not tavily_api_key:
+        parser.error("OPENAI_API_KEY and TAVILY_API_KEY must be set in the environment or a .env file")
+
+    batch = BatchAnalysis(
+        companies=load_companies(args.input),
+        manifest_path=args.manifest,
+        openai_api_key=openai_api_key,
+        tavily_api_key=tavily_api_key,
+        workers=args.workers,
+        openai_rpm=args.openai_rpm,
+        tavily_rpm=args.tavily_rpm,
+        execution_strategy=args.strategy,
+        use_search_cache=not args.no_search_cache,
+        pipeline=args.pipeline
+    )
+    counts = batch.run(retry_failed=not args.skip_failed)
+    print(f"Batch finished: {counts['done']} done, {counts['failed']} failed")
+    if args.export:
+        print(f"Exported {batch.export(args.export)} results to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
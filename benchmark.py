@@ -0,0 +1,195 @@
+# Offline benchmark for MarketResearchSystem.run() using the local stand-ins in fakes.py.
+# Reports end-to-end latency, per-task latency, throughput under concurrent runs and
+# peak memory for each pipeline (single-agent, multi-agent or a custom YAML/JSON one)
+# and each scheduling strategy, all on the same engine.
+from concurrent.futures import ThreadPoolExecutor
+from fakes import FakeChatModel, FaultInjector, fake_search_tool
+from market_research_system import MarketResearchSystem
+from pipelines import load_pipeline
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+# Build a system wired to the fake backends; caches and checkpoints are off so every run does full work.
+# fault_rate makes that share of fake API calls fail with a 429 or 503.
+# fast_latency sets the fake "fast" route's latency (the default route's when None);
+# with fast_invalid that route answers without a table, so every validated task falls back
+def build_system(pipeline: dict, company: str, llm_latency: float, search_latency: float, fault_rate: float = 0.0,
+                 fast_latency: float = None, fast_invalid: bool = False, routing: bool = True):
+    faults = FaultInjector(error_rate=fault_rate, seed=company) if fault_rate else None
+    fast = {}
+    if fast_latency is not None or fast_invalid:
+        options = {"final_answer": "No table yet."} if fast_invalid else {}
+        fast["fast"] = FakeChatModel(latency=llm_latency if fast_latency is None else fast_latency,
+                                     model_name="fake-gpt-mini", faults=faults, **options)
+    return MarketResearchSystem(
+        company=company,
+        industry="Semiconductors",
+        openai_api_key="sk-fake",
+        tavily_api_key="tvly-fake",
+        use_checkpoints=False,
+        report_max_age=0,
+        verify_links=False,
+        llm=FakeChatModel(latency=llm_latency, faults=faults),
+        search_tool=fake_search_tool(latency=search_latency, faults=faults),
+        pipeline=pipeline,
+        use_model_routing=routing,
+        llms=fast
+    )
+
+
+# One timed run; per-task latencies come from the run's progress events
+def timed_run(pipeline: dict, strategy: str, company: str, llm_latency: float, search_latency: float,
+              fault_rate: float = 0.0, routing_options: dict = None) -> dict:
+    system = build_system(pipeline, company, llm_latency, search_latency, fault_rate, **(routing_options or {}))
+    task_started = {}
+    task_latency = {}
+    errors = []
+
+    def on_event(event):
+        if event["type"] == "run_failed":
+            errors.append(event["error"])
+        elif event["type"] == "task_started":
+            task_started[event["task"]] = event["time"]
+        elif event["type"] == "task_finished" and event["task"] in task_started:
+            task_latency[event["task"]] = event["time"] - task_started[event["task"]]
+
+    started = time.perf_counter()
+    result = system.run(execution_strategy=strategy, callback=on_event, force_refresh=True)
+    latency = time.perf_counter() - started
+
+    retries = 0
+    if system.resilience:
+        retries = sum(stats["retries"] for stats in system.resilience["providers"].values())
+
+    fallbacks = sum(stats["fallbacks"] for stats in system.routing.values())
+
+    ok = bool(result and result[0])
+    return {"ok": ok, "error": None if ok else (errors[-1] if errors else "No report generated"), "latency": latency,
+            "tasks": task_latency, "retries": retries, "fallbacks": fallbacks}
+
+
+# Latency and throughput only count successful runs; a scenario with any failed
+# run is reported as failed with its errors
+def benchmark_scenario(pipeline: dict, strategy: str, runs: int, concurrency: int,
+                       llm_latency: float, search_latency: float, fault_rate: float = 0.0,
+                       routing_options: dict = None) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(timed_run, pipeline, strategy, f"Company{index}", llm_latency, search_latency, fault_rate,
+                        routing_options)
+            for index in range(runs)
+        ]
+        results = [future.result() for future in futures]
+
+    elapsed = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    succeeded = [result for result in results if result["ok"]]
+    latencies = sorted(result["latency"] for result in succeeded)
+    tasks = {}
+    for result in succeeded:
+        for task, latency in result["tasks"].items():
+            tasks.setdefault(task, []).append(latency)
+
+    return {
+        "pipeline": pipeline["name"],
+        "strategy": strategy,
+        "runs": runs,
+        "concurrency": concurrency,
+        "succeeded": len(succeeded),
+        "failed": runs - len(succeeded),
+        "errors": sorted({result["error"] for result in results if not result["ok"]}),
+        "fault_rate": fault_rate,
+        "retries": sum(result["retries"] for result in results),
+        "fallbacks": sum(result["fallbacks"] for result in results),
+        "latency_mean": statistics.mean(latencies) if latencies else None,
+        "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+        "latency_max": latencies[-1] if latencies else None,
+        "task_latency_mean": {task: statistics.mean(values) for task, values in tasks.items()},
+        "throughput_per_minute": len(succeeded) / elapsed * 60,
+        "peak_memory_mb": peak_memory / (1024 * 1024)
+    }
+
+
+def print_scenario(result: dict):
+    print(f"\n{result['pipeline']} / {result['strategy']} "
+          f"({result['runs']} runs, concurrency {result['concurrency']}, {result['succeeded']} succeeded)")
+    if result["failed"]:
+        print(f"  FAILED: {result['failed']} runs errored")
+        for error in result["errors"]:
+            print(f"    {error}")
+    if not result["succeeded"]:
+        return
+    print(f"  latency: mean {result['latency_mean']:.2f}s, p50 {result['latency_p50']:.2f}s, "
+          f"max {result['latency_max']:.2f}s")
+    for task, latency in result["task_latency_mean"].items():
+        print(f"  {task}: {latency:.2f}s")
+    print(f"  throughput: {result['throughput_per_minute']:.1f} runs/min")
+    if result["fault_rate"]:
+        print(f"  retries: {result['retries']} at a {result['fault_rate']:.0%} injected fault rate")
+    if result["fallbacks"]:
+        print(f"  fallbacks to the default model: {result['fallbacks']}")
+    print(f"  peak memory: {result['peak_memory_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline against local fake backends")
+    parser.add_argument("--runs", type=int, default=4, help="Runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=2, help="Concurrent runs per scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per fake LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Seconds per fake search")
+    parser.add_argument("--fault-rate", type=float, default=0.0,
+                        help="Share of fake API calls that fail with a transient error")
+    parser.add_argument("--fast-latency", type=float,
+                        help="Seconds per fake LLM call on the fast model route (default: --llm-latency)")
+    parser.add_argument("--fast-invalid", action="store_true",
+                        help="Make the fast route answer without a table so validated stages fall back")
+    parser.add_argument("--no-routing", action="store_true", help="Run every agent on the default model route")
+    parser.add_argument("--pipelines", default="single_agent,multi_agent",
+                        help="Comma-separated built-in pipeline names or YAML/JSON pipeline files")
+    parser.add_argument("--strategies", default="sequential,dag",
+                        help="Comma-separated strategies for pipelines with more than one task")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # Pipeline files are resolved before leaving the working tree
+    pipelines = [load_pipeline(os.path.abspath(spec) if os.path.exists(spec) else spec)
+                 for spec in args.pipelines.split(",")]
+
+    # Reports and caches go to a scratch directory, never the working tree
+    output_path = os.path.abspath(args.json) if args.json else None
+    os.chdir(tempfile.mkdtemp(prefix="market_research_bench_"))
+
+    routing_options = {"fast_latency": args.fast_latency, "fast_invalid": args.fast_invalid,
+                       "routing": not args.no_routing}
+
+    scenarios = []
+    for pipeline in pipelines:
+        strategies = args.strategies.split(",") if len(pipeline["tasks"]) > 1 else [pipeline["execution_strategy"]]
+        for strategy in strategies:
+            scenarios.append(benchmark_scenario(
+                pipeline, strategy, args.runs, args.concurrency, args.llm_latency, args.search_latency,
+                args.fault_rate, routing_options
+            ))
+            print_scenario(scenarios[-1])
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(scenarios, f, indent=2)
+
+    failed = [f"{scenario['pipeline']}/{scenario['strategy']}" for scenario in scenarios if scenario["failed"]]
+    if failed:
+        parser.exit(1, f"Failed scenarios: {', '.join(failed)}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Per-task output checkpoints, keyed like build targets: a task's prompt, its
+# agent's configuration and the hashes of its upstream outputs. Changing one
+# task's prompt only invalidates that task and its descendants, and a failed
+# run resumes from the last completed task. Checkpoints expire with the report
+# cache (max_age), so a rerun never replays outputs older than the reports it
+# would otherwise reuse, and the least recently used go once the store holds
+# max_entries.
+from report_cache import DEFAULT_REPORT_MAX_AGE
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(".cache", "task_checkpoints.sqlite")
+DEFAULT_MAX_CHECKPOINTS = 5000
+
+
+def _hash(value) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Everything about a task and its agent that can change the task's output
+def task_fingerprint(task, salt: dict = None) -> str:
+    agent = task.agent
+    return _hash({
+        "description": task.description,
+        "expected_output": getattr(task, "expected_output", None),
+        "agent": {
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "tools": [getattr(tool, "name", type(tool).__name__) for tool in (agent.tools or [])]
+        } if agent else None,
+        "salt": salt
+    })
+
+
+# Checkpoint key: the task's own fingerprint plus the content of every upstream output
+def checkpoint_key(fingerprint: str, upstream_outputs: list) -> str:
+    return _hash({
+        "task": fingerprint,
+        "upstream": [hashlib.sha256(output.encode("utf-8")).hexdigest() for output in upstream_outputs]
+    })
+
+
+# max_age should not exceed the report cache's, or reruns restore stale stages
+class CheckpointStore:
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, max_age: float = DEFAULT_REPORT_MAX_AGE,
+                 max_entries: int = DEFAULT_MAX_CHECKPOINTS):
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_checkpoints (
+                    key TEXT PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(task_checkpoints)")}
+            if "accessed_at" not in columns:
+                conn.execute("ALTER TABLE task_checkpoints ADD COLUMN accessed_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS task_checkpoints_created_at ON task_checkpoints (created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS task_checkpoints_accessed_at ON task_checkpoints (accessed_at)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT output FROM task_checkpoints WHERE key = ? AND created_at >= ?",
+                (key, now - self.max_age)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE task_checkpoints SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0] if row else None
+
+    # Writing also drops expired and least recently used checkpoints, so the table
+    # stays bounded
+    def set(self, key: str, task: str, output: str):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO task_checkpoints (key, task, output, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, task, output, now, now)
+            )
+            conn.execute("DELETE FROM task_checkpoints WHERE created_at < ?", (now - self.max_age,))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        if not self.max_entries:
+            return
+        overflow = conn.execute("SELECT COUNT(*) FROM task_checkpoints").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM task_checkpoints WHERE key IN "
+                "(SELECT key FROM task_checkpoints ORDER BY COALESCE(accessed_at, created_at) ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    # Remove checkpoints older than max_age seconds (default: the store's max_age)
+    def prune(self, max_age: float = None):
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM task_checkpoints WHERE created_at < ?", (time.time() - max_age,))
@@ -0,0 +1,154 @@
+# Process-wide registry of LLM and search clients.
+# Clients are keyed by a fingerprint of their credentials plus their configuration,
+# so analyses with the same settings reuse warm HTTP connection pools while keys
+# stay bound to the client instead of leaking through os.environ.
+from langchain_openai import ChatOpenAI
+from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper, TAVILY_API_URL
+from search_cache import CachedTavilySearchResults, DEFAULT_CACHE_PATH
+from events import EventCallbackHandler
+from usage import UsageCallbackHandler
+from tracing import TracingCallbackHandler
+from resilience import DEFAULT_RETRY_POLICY, ResilientChatModel, with_retries
+from langchain_core.callbacks import BaseCallbackManager
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional
+import hashlib
+import requests
+import threading
+
+DEFAULT_MODEL = "gpt-4-turbo-preview"
+SEARCH_TIMEOUT_SECONDS = 60
+
+_clients = {}
+_clients_lock = threading.Lock()
+_http_session = None
+
+
+# Never keep raw API keys in registry keys
+def _fingerprint(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+# Shared keep-alive session for Tavily; requests.post would open a new connection per search
+def get_http_session() -> requests.Session:
+    global _http_session
+    with _clients_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+# TavilySearchAPIWrapper that posts through the shared pooled session
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    timeout: float = SEARCH_TIMEOUT_SECONDS
+
+    def raw_results(
+        self,
+        query: str,
+        max_results: Optional[int] = 5,
+        search_depth: Optional[str] = "advanced",
+        include_domains: Optional[List[str]] = [],
+        exclude_domains: Optional[List[str]] = [],
+        include_answer: Optional[bool] = False,
+        include_raw_content: Optional[bool] = False,
+        include_images: Optional[bool] = False,
+    ) -> Dict:
+        params = {
+            "api_key": self.tavily_api_key.get_secret_value(),
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_domains": include_domains,
+            "exclude_domains": exclude_domains,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+            "include_images": include_images,
+        }
+        response = get_http_session().post(
+            f"{TAVILY_API_URL}/search",
+            json=params,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def _get_or_create(key: tuple, factory):
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+# Callbacks of every chat model in a run: token streaming events, usage and budgets, tracing
+def llm_callbacks(model: str) -> list:
+    return [EventCallbackHandler(), UsageCallbackHandler(model), TracingCallbackHandler()]
+
+
+# A copy of an injected chat model (e.g. a local stand-in) with get_llm's callbacks
+# and retries, so its calls are streamed, charged to budgets and traced like real ones
+def instrument_llm(llm, retry_policy=DEFAULT_RETRY_POLICY):
+    if isinstance(llm, ResilientChatModel):
+        return llm
+    model = str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or llm._llm_type)
+    callbacks = llm.callbacks or []
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.handlers
+    callbacks = list(callbacks)
+    present = {type(handler) for handler in callbacks}
+    callbacks += [handler for handler in llm_callbacks(model) if type(handler) not in present]
+    return with_retries(llm.model_copy(update={"callbacks": callbacks}), "openai", retry_policy)
+
+
+# Shared ChatOpenAI per (api key, model config, rate limiter, retry policy); streams
+# tokens as run events, charges token usage to the current run's usage tracker and
+# traces each call. Retries happen in the resilience layer, not the OpenAI SDK.
+def get_llm(openai_api_key: str, model: str = DEFAULT_MODEL, temperature: float = 0.7,
+            max_tokens: int = 4000, rate_limiter=None, retry_policy=DEFAULT_RETRY_POLICY):
+    key = ("llm", _fingerprint(openai_api_key), model, temperature, max_tokens, id(rate_limiter),
+           retry_policy.key())
+    return _get_or_create(key, lambda: with_retries(ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=openai_api_key,
+        rate_limiter=rate_limiter,
+        timeout=retry_policy.call_timeout,
+        max_retries=0,
+        streaming=True,
+        stream_usage=True,
+        callbacks=llm_callbacks(model)
+    ), "openai", retry_policy))
+
+
+# Shared cached Tavily tool per (api key, search config, rate limiter, retry policy)
+def get_search_tool(tavily_api_key: str, max_results: int = 8, search_depth: str = "advanced",
+                    use_cache: bool = True, cache_path: str = DEFAULT_CACHE_PATH,
+                    rate_limiter=None, retry_policy=DEFAULT_RETRY_POLICY) -> CachedTavilySearchResults:
+    key = ("search", _fingerprint(tavily_api_key), max_results, search_depth, use_cache, cache_path,
+           id(rate_limiter), retry_policy.key())
+    return _get_or_create(key, lambda: CachedTavilySearchResults(
+        api_wrapper=PooledTavilySearchAPIWrapper(tavily_api_key=tavily_api_key, timeout=retry_policy.call_timeout),
+        max_results=max_results,
+        search_depth=search_depth,
+        use_cache=use_cache,
+        cache_path=cache_path,
+        rate_limiter=rate_limiter,
+        retry_policy=retry_policy
+    ))
+
+
+# Drop every registered client, e.g. after rotating API keys
+def clear_clients():
+    global _http_session
+    with _clients_lock:
+        _clients.clear()
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
@@ -0,0 +1,276 @@
+# Context compaction between tasks.
+# Instead of forwarding an upstream task's full output (reasoning, search dumps and
+# all) into the next task's prompt, the structured facts are extracted into a
+# compact schema of use cases with their resource and dataset links, rendered as
+# short text and trimmed to a token ceiling for that hop.
+from events import emit
+from urllib.parse import urlparse
+import re
+import threading
+
+DEFAULT_CONTEXT_TOKEN_LIMIT = 1500
+DESCRIPTION_CHARS = 240
+DATASET_HOSTS = ("kaggle.com", "huggingface.co", "github.com", "gitlab.com", "paperswithcode.com",
+                 "data.gov", "zenodo.org", "archive.ics.uci.edu")
+
+MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+BARE_URL = re.compile(r"(?<!\()https?://[^\s)<>\]|]+")
+USE_CASE_LINE = re.compile(
+    r"^\s*(?:#{1,6}\s*)?(?:\d+[.)]\s*|[-*•]\s*)?(?:\*\*)?(?:Use Case\s*\d*\s*[:.-]\s*)?(?:\*\*)?"
+    r"(?P<name>[A-Z][^:*|\n]{2,80}?)(?:\*\*)?\s*(?::|\s-\s|\s—\s|$)\s*(?P<rest>.*)$"
+)
+NUMBERED_LINE = re.compile(r"^\d+[.)]\s")
+# Lines indented at least this much are nested under the line above them
+NESTED_INDENT = 2
+# Labels of a use case's attributes; lines named like this never start a use case
+FIELD_LABELS = {
+    "problem", "problems", "benefit", "benefits", "key benefits", "description", "impact", "challenge",
+    "challenges", "solution", "outcome", "outcomes", "example", "examples", "implementation", "resources",
+    "implementation resources", "datasets", "datasets & code", "dataset", "source", "sources", "details",
+    "value", "roi", "risks", "requirements", "cost", "costs", "timeline", "metrics", "kpis", "status", "why",
+    "how", "data", "code", "links", "references", "tools", "technologies"
+}
+# Headings that group use cases rather than name one
+SECTION_TITLES = ("overview", "summary", "executive summary", "conclusion", "introduction", "recommendation",
+                  "references", "next steps", "key findings", "sources", "resources", "datasets", "notes")
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+# Token count with the OpenAI tokenizer when its encoding is available locally,
+# otherwise the usual four-characters-per-token estimate
+def count_tokens(text: str) -> int:
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4) if text else 0
+
+
+def hop_name(upstream: str, downstream: str) -> str:
+    return f"{upstream} -> {downstream}"
+
+
+def is_dataset_url(url: str) -> bool:
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    return any(host == known or host.endswith("." + known) for known in DATASET_HOSTS) \
+        or "dataset" in parsed.path.lower()
+
+
+def _clean(text: str) -> str:
+    text = MARKDOWN_LINK.sub(r"\1", text)
+    text = re.sub(r"<br\s*/?>|[*_`#]", " ", text)
+    return " ".join(text.split())
+
+
+def _links(text: str) -> list:
+    links = [(title.strip(), url.rstrip(".,;")) for title, url in MARKDOWN_LINK.findall(text)]
+    linked = {url for _, url in links}
+    links += [("", url.rstrip(".,;")) for url in BARE_URL.findall(text) if url.rstrip(".,;") not in linked]
+    return links
+
+
+# How a line could start a use case: ("heading", level), ("labelled", None) for
+# "Use Case N: ...", ("numbered", None) for top-level numbering, ("section", level)
+# for headings that only group use cases; None for detail lines. Indented lines,
+# bullets and attribute labels ("Problem", "Benefit") are always details.
+def _line_kind(line: str, stripped: str):
+    if len(line) - len(line.lstrip()) >= NESTED_INDENT or stripped.lower().startswith(("http", "source", "url")):
+        return None, None
+    match = USE_CASE_LINE.match(stripped)
+    if not match or MARKDOWN_LINK.match(match.group("name")):
+        return None, None
+    name = _clean(match.group("name")).lower().rstrip(":. ")
+    if name in FIELD_LABELS:
+        return None, None
+
+    if stripped.startswith("#"):
+        level = len(stripped) - len(stripped.lstrip("#"))
+        if "use cases" in name or name.startswith(SECTION_TITLES):
+            return "section", level
+        return "heading", level
+    if re.sub(r"^\d+[.)]\s*", "", stripped).lstrip("*").lower().startswith("use case"):
+        return "labelled", None
+    if NUMBERED_LINE.match(stripped):
+        return "numbered", None
+    return None, None
+
+
+# Heading level that names use cases: the shallowest one used at least twice.
+# Shallower headings are titles; deeper ones are details of a use case
+def _use_case_level(kinds: list):
+    levels = [level for kind, level in kinds if kind == "heading"]
+    repeated = [level for level in set(levels) if levels.count(level) > 1]
+    if repeated:
+        return min(repeated)
+    # A lone top-level heading is the document title
+    return levels[0] if levels and levels[0] > 1 else None
+
+
+# Structured facts in one task output: use cases (name, description and the links
+# mentioned under them) plus links that could not be tied to a use case.
+# A use case starts at a heading, a "Use Case N:" line or top-level numbering;
+# numbered lines under a heading or "Use Case" line are its details
+def extract_facts(text: str) -> dict:
+    use_cases = []
+    unassigned = {"resources": [], "datasets": []}
+    seen = set()
+    current = None
+    # Whether current was opened by a heading or "Use Case" line
+    anchored = False
+
+    def add_link(title, url, owner):
+        key = (owner["name"] if owner else None, url)
+        if key in seen:
+            return
+        seen.add(key)
+        bucket = "datasets" if is_dataset_url(url) else "resources"
+        (owner or unassigned)[bucket].append({"title": _clean(title) or urlparse(url).netloc, "url": url})
+
+    def new_use_case(name, description):
+        use_case = {"name": name, "description": description[:DESCRIPTION_CHARS], "resources": [], "datasets": []}
+        use_cases.append(use_case)
+        return use_case
+
+    lines = [(line, line.strip()) for line in text.splitlines() if line.strip()]
+    kinds = [_line_kind(line, stripped) for line, stripped in lines]
+    level = _use_case_level(kinds)
+
+    for (line, stripped), (kind, heading_level) in zip(lines, kinds):
+        # Markdown table row: first cell names the use case, the rest describe it
+        if stripped.startswith("|"):
+            cells = [cell.strip() for cell in stripped.strip("|").split("|")]
+            if all(set(cell) <= set("-: ") for cell in cells) or cells[0].lower() in ("use case", "use cases"):
+                continue
+            row = new_use_case(_clean(cells[0]), _clean(cells[1]) if len(cells) > 1 else "")
+            for title, url in _links(stripped):
+                add_link(title, url, row)
+            continue
+
+        links = _links(stripped)
+        if kind == "heading" and (level is None or heading_level < level):
+            kind = "section"
+        elif kind == "heading" and heading_level > level:
+            kind = None
+
+        if kind == "section":
+            current, anchored = None, False
+        elif kind in ("heading", "labelled") or (kind == "numbered" and not anchored):
+            match = USE_CASE_LINE.match(stripped)
+            current = new_use_case(_clean(match.group("name")), _clean(match.group("rest")))
+            anchored = kind != "numbered"
+            for title, url in links:
+                add_link(title, url, current)
+            continue
+
+        for title, url in links:
+            add_link(title, url, current)
+        if current is not None and not current["description"] and not links:
+            current["description"] = _clean(stripped)[:DESCRIPTION_CHARS]
+
+    return {"use_cases": use_cases, **unassigned}
+
+
+def render_facts(facts: dict) -> str:
+    def link_list(links):
+        return "; ".join(f"{link['title']}: {link['url']}" for link in links)
+
+    lines = []
+    for use_case in facts["use_cases"]:
+        lines.append(f"USE CASE: {use_case['name']}" + (f" - {use_case['description']}" if use_case["description"] else ""))
+        if use_case["resources"]:
+            lines.append(f"  RESOURCES: {link_list(use_case['resources'])}")
+        if use_case["datasets"]:
+            lines.append(f"  DATASETS & CODE: {link_list(use_case['datasets'])}")
+    if facts["resources"]:
+        lines.append(f"OTHER RESOURCES: {link_list(facts['resources'])}")
+    if facts["datasets"]:
+        lines.append(f"OTHER DATASETS & CODE: {link_list(facts['datasets'])}")
+    return "\n".join(lines)
+
+
+# Drop the least essential facts until the rendering fits: unassigned links first,
+# then the last link of the longest per-use-case list, then shorter descriptions
+def _trim(facts: dict, max_tokens: int) -> tuple:
+    rendered = render_facts(facts)
+    truncated = False
+    while count_tokens(rendered) > max_tokens:
+        truncated = True
+        lists = [facts["resources"], facts["datasets"]]
+        if not any(lists):
+            lists = [use_case[bucket] for use_case in facts["use_cases"] for bucket in ("resources", "datasets")]
+        longest = max(lists, key=len, default=[])
+        if longest:
+            longest.pop()
+        else:
+            descriptions = [use_case for use_case in facts["use_cases"] if len(use_case["description"]) > 64]
+            if not descriptions:
+                break
+            for use_case in descriptions:
+                use_case["description"] = use_case["description"][:60].rsplit(" ", 1)[0] + "..."
+        rendered = render_facts(facts)
+
+    if count_tokens(rendered) > max_tokens:
+        rendered = rendered[:max_tokens * 4]
+    return rendered, truncated
+
+
+# Compacts upstream outputs per hop and records before/after token counts.
+# hop_limits maps hop names ("Upstream Role -> Downstream Role") to token ceilings;
+# other hops use default_limit.
+class ContextCompactor:
+    def __init__(self, default_limit: int = DEFAULT_CONTEXT_TOKEN_LIMIT, hop_limits: dict = None):
+        self.default_limit = default_limit
+        self.hop_limits = hop_limits or {}
+        self.hops = []
+        self._lock = threading.Lock()
+
+    def limit(self, upstream: str, downstream: str) -> int:
+        return self.hop_limits.get(hop_name(upstream, downstream), self.default_limit)
+
+    def compact(self, output: str, upstream: str, downstream: str) -> str:
+        limit = self.limit(upstream, downstream)
+        facts = extract_facts(output)
+        links = sum(len(use_case["resources"]) + len(use_case["datasets"]) for use_case in facts["use_cases"]) \
+            + len(facts["resources"]) + len(facts["datasets"])
+
+        if facts["use_cases"] or links:
+            compacted, truncated = _trim(facts, limit)
+        else:
+            # Nothing structured to extract; forward the text cut to the ceiling
+            compacted = output[:limit * 4]
+            truncated = len(compacted) < len(output)
+
+        tokens_before = count_tokens(output)
+        # Short outputs can render longer than they are; forward those as they are
+        if tokens_before <= min(limit, count_tokens(compacted)):
+            compacted, truncated = output, False
+
+        hop = {
+            "hop": hop_name(upstream, downstream),
+            "tokens_before": tokens_before,
+            "tokens_after": count_tokens(compacted),
+            "limit": limit,
+            "use_cases": len(facts["use_cases"]),
+            "links": links,
+            "truncated": truncated
+        }
+        with self._lock:
+            self.hops.append(hop)
+        emit("context_compacted", **hop)
+        return compacted
+
+    def summary(self) -> dict:
+        with self._lock:
+            hops = list(self.hops)
+        before = sum(hop["tokens_before"] for hop in hops)
+        after = sum(hop["tokens_after"] for hop in hops)
+        return {"hops": hops, "tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
@@ -0,0 +1,314 @@
+# Comparative analysis of several companies in one industry.
+# The industry-wide research (the industry's AI landscape and the datasets and code
+# behind it) runs once. Each company then runs only its company-specific stages,
+# concurrently on one event loop and through one shared search broker, and the
+# per-company tables are merged into a single comparison report.
+from crewai import Agent, Task
+from clients import get_llm, get_search_tool, instrument_llm
+from market_research_system import MarketResearchSystem
+from scheduler import arun_task_graph
+from checkpoints import CheckpointStore
+from compaction import ContextCompactor, DEFAULT_CONTEXT_TOKEN_LIMIT
+from search_broker import SearchBroker, BrokeredSearchTool, SharedEvidenceTool
+from evidence_index import LocalEvidenceTool, get_evidence_index, indexed_search_tool
+from renderer import ReportRenderer, slugify
+from crew_adapters import crew_tools, crew_llm
+from events import emit, listening, current_task
+from usage import UsageTracker, tracking
+from dotenv import load_dotenv
+from datetime import datetime
+import argparse
+import asyncio
+import os
+
+INDUSTRY_SCOPE = "industry"
+
+
+# A literal pipe would end the table cell early
+def _escape(text: str) -> str:
+    return text.replace("|", "/")
+
+
+def _link_cell(links) -> str:
+    return "<br>".join(
+        f"• [{_escape(link.title)}]({link.url.replace('|', '%7C')})" + (f" - {_escape(link.note)}" if link.note else "")
+        for link in links
+    ) or "-"
+
+
+# One markdown table row per (company, use case)
+def comparison_table(results: dict) -> str:
+    lines = [
+        "| Company | Use Case | Description | Implementation Resources | Datasets & Code |",
+        "|---------|----------|-------------|-------------------------|-----------------|"
+    ]
+    for company, result in results.items():
+        for use_case in result.use_cases:
+            lines.append(f"| {_escape(company)} | {_escape(use_case.name)} | {_escape(use_case.description)} | "
+                         f"{_link_cell(use_case.resources)} | {_link_cell(use_case.datasets)} |")
+    return "\n".join(lines)
+
+
+class ComparativeAnalysis:
+    def __init__(self, companies: list, industry: str, openai_api_key: str, tavily_api_key: str,
+                 max_parallel: int = 4, execution_strategy: str = "dag", use_search_cache: bool = True,
+                 use_checkpoints: bool = True, context_token_limit: int = DEFAULT_CONTEXT_TOKEN_LIMIT,
+                 search_concurrency: int = 8, llm=None, search_tool=None):
+        self.companies = companies
+        self.industry = industry
+        self.openai_api_key = openai_api_key
+        self.tavily_api_key = tavily_api_key
+        self.max_parallel = max_parallel
+        self.execution_strategy = execution_strategy
+        self.use_checkpoints = use_checkpoints
+        self.context_token_limit = context_token_limit
+        self.search_concurrency = search_concurrency
+
+        # One search tool for the shared stage and every company; LLM clients are pooled
+        # per model route, and an explicit llm replaces all of them
+        self.custom_llm = llm
+        self.llm = instrument_llm(llm) if llm is not None else get_llm(openai_api_key)
+        self.search_tool = search_tool if search_tool is not None else get_search_tool(
+            tavily_api_key,
+            max_results=8,
+            search_depth="advanced",
+            use_cache=use_search_cache
+        )
+
+        # Every search is indexed for later runs, and all agents (industry and company)
+        # look in the local index before searching the web; evidence_stats has the
+        # local-hit ratio across the whole comparison
+        self.evidence_index = get_evidence_index()
+        self.local_evidence = None
+        self.evidence_stats = {}
+        self.broker = None
+        self.industry_research = {}
+        self.compaction = None
+        self.systems = {}
+        self.results = {}
+        self.failures = {}
+        self.usage = {}
+        self.search_stats = {}
+        self.rendered = None
+
+    def industry_tools(self):
+        return [self.local_evidence,
+                BrokeredSearchTool(broker=self.broker, scope=INDUSTRY_SCOPE), SharedEvidenceTool(broker=self.broker)]
+
+    # Industry-level agents; their output is shared by every company
+    def create_industry_agents(self):
+        industry_analyst = Agent(
+            role='Industry Analyst',
+            goal=f'Map how AI is being adopted across the {self.industry} industry',
+            backstory=f"""Senior industry analyst covering {self.industry}...""",
+            tools=crew_tools(self.industry_tools()),
+            llm=crew_llm(self.llm),
+            verbose=True
+        )
+
+        industry_data_specialist = Agent(
+            role='Industry Data Specialist',
+            goal=f'Find datasets and code that serve common {self.industry} AI use cases',
+            backstory="""Data scientist specializing...""",
+            tools=crew_tools(self.industry_tools()),
+            llm=crew_llm(self.llm),
+            verbose=True
+        )
+
+        return [industry_analyst, industry_data_specialist]
+
+    def create_industry_tasks(self, agents):
+        industry_analyst, industry_data_specialist = agents
+
+        map_landscape = Task(
+            description=f"""Identify the most common high-impact AI use cases in {self.industry}...""",
+            expected_output=f"The most common high-impact AI use cases in {self.industry}, with sources",
+            agent=industry_analyst
+        )
+
+        find_industry_datasets = Task(
+            description="""Find REAL DATASETS AND CODE for each industry use case...""",
+            expected_output="Real datasets and code repositories with URLs for each industry use case",
+            agent=industry_data_specialist,
+            context=[map_landscape]
+        )
+
+        return [map_landscape, find_industry_datasets]
+
+    # Run the shared stage once and compact its outputs for the company prompts
+    async def research_industry(self, force_refresh: bool = False) -> dict:
+        tasks = self.create_industry_tasks(self.create_industry_agents())
+        with current_task("Industry Research"):
+            emit("industry_research_started", industry=self.industry)
+        graph = await arun_task_graph(
+            tasks,
+            max_workers=1,
+            checkpoints=CheckpointStore() if self.use_checkpoints else None,
+            checkpoint_salt={"industry": self.industry, "llm": getattr(self.llm, "model_name", None)},
+            refresh=force_refresh
+        )
+        landscape, datasets = graph["outputs"]
+
+        compactor = ContextCompactor(self.context_token_limit)
+        self.compaction = compactor
+        return {
+            "landscape": compactor.compact(landscape, "Industry Analyst", "companies"),
+            "datasets": compactor.compact(datasets, "Industry Data Specialist", "companies"),
+            "raw_landscape": landscape
+        }
+
+    async def _run_company(self, system, semaphore, callback, force_refresh: bool):
+        def on_event(event):
+            if callback is not None:
+                callback(dict(event, company=system.company))
+
+        async with semaphore:
+            try:
+                return await system.arun(
+                    execution_strategy=self.execution_strategy,
+                    callback=on_event,
+                    force_refresh=force_refresh
+                )
+            except Exception as e:
+                return e
+
+    async def arun(self, callback=None, force_refresh: bool = False):
+        tracker = UsageTracker()
+        self.local_evidence = LocalEvidenceTool(index=self.evidence_index)
+        self.broker = SearchBroker(indexed_search_tool(self.search_tool, self.evidence_index),
+                                   max_workers=self.search_concurrency)
+        try:
+            with listening(callback), tracking(tracker):
+                self.industry_research = await self.research_industry(force_refresh)
+            shared_searches = self.broker.summary()["searches"]
+
+            research = {key: self.industry_research[key] for key in ("landscape", "datasets")}
+            self.systems = {
+                company: MarketResearchSystem(
+                    company=company,
+                    industry=self.industry,
+                    openai_api_key=self.openai_api_key,
+                    tavily_api_key=self.tavily_api_key,
+                    use_checkpoints=self.use_checkpoints,
+                    context_token_limit=self.context_token_limit,
+                    llm=self.custom_llm,
+                    search_tool=self.search_tool,
+                    industry_research=research,
+                    search_broker=self.broker,
+                    local_evidence=self.local_evidence
+                )
+                for company in self.companies
+            }
+
+            semaphore = asyncio.Semaphore(self.max_parallel)
+            outcomes = await asyncio.gather(*(
+                self._run_company(system, semaphore, callback, force_refresh)
+                for system in self.systems.values()
+            ))
+        finally:
+            self.broker.close()
+            self.search_stats = self.broker.summary()
+
+        for company, outcome in zip(self.systems, outcomes):
+            system = self.systems[company]
+            if isinstance(outcome, Exception) or not outcome or not outcome[0]:
+                self.failures[company] = str(outcome) if isinstance(outcome, Exception) else "Analysis generation failed"
+            elif system.result is None:
+                self.failures[company] = "No use case table in the final output"
+            else:
+                self.results[company] = system.result
+
+        self.usage = self.usage_summary(tracker)
+        self.search_stats["shared_stage_searches"] = shared_searches
+        self.evidence_stats = self.local_evidence.summary(web_searches=self.search_stats["queries"])
+        print(f"{len(self.results)} of {len(self.companies)} companies analyzed; "
+              f"{self.search_stats['searches']} searches ({shared_searches} shared), "
+              f"{self.usage['totals']['calls']} LLM calls")
+        if self.evidence_stats["lookups"]:
+            print(f"Local evidence: {self.evidence_stats['hits']} of {self.evidence_stats['lookups']} lookups "
+                  f"answered locally, local-hit ratio {self.evidence_stats['local_hit_ratio']:.0%}")
+
+        if not self.results:
+            return None, None, None
+        report, md_file, html_file = await asyncio.to_thread(self.generate_report)
+        return report, md_file, html_file
+
+    # Starts its own event loop; await arun() from inside a running one
+    def run(self, callback=None, force_refresh: bool = False):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("ComparativeAnalysis.run() cannot be called from a running event loop; "
+                               "await ComparativeAnalysis.arun() instead")
+        return asyncio.run(self.arun(callback=callback, force_refresh=force_refresh))
+
+    # Shared stage plus every company's usage
+    def usage_summary(self, tracker: UsageTracker) -> dict:
+        shared = tracker.summary()["totals"]
+        companies = {company: system.usage.get("totals", {}) for company, system in self.systems.items()}
+        totals = dict(shared)
+        for company_totals in companies.values():
+            for name, value in company_totals.items():
+                totals[name] = totals.get(name, 0) + value
+        return {"shared": shared, "companies": companies, "totals": totals}
+
+    def generate_report(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        renderer = ReportRenderer(
+            f"reports/comparison_{slugify(self.industry)}_{timestamp}",
+            title=f"Comparative AI Implementation Analysis: {self.industry}"
+        )
+
+        renderer.add_section(f"""# Comparative AI Implementation Analysis: {self.industry}
+Generated on: {datetime.now().strftime("%Y-%m-%d")}
+
+## Overview
+AI use cases, implementation resources and datasets for {", ".join(self.results)}, built on one shared {self.industry} industry research pass.""")
+        renderer.add_section(f"## Industry Landscape\n\n{self.industry_research['raw_landscape']}")
+        renderer.add_section(f"## Comparison\n\n{comparison_table(self.results)}")
+        for company, result in self.results.items():
+            renderer.add_section(f"## {company}\n\n{comparison_table({company: result})}", result=result)
+        if self.failures:
+            renderer.add_section("## Not Analyzed\n\n" + "\n".join(
+                f"- {company}: {error}" for company, error in self.failures.items()
+            ))
+
+        self.rendered = renderer.finish()
+        return self.rendered.markdown, self.rendered.files["md"], self.rendered.files["html"]
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Compare AI opportunities across companies in one industry")
+    parser.add_argument("industry", help="Industry shared by every company")
+    parser.add_argument("companies", nargs="+", help="Companies to compare, e.g. Nvidia AMD Intel")
+    parser.add_argument("--parallel", type=int, default=4, help="Companies analyzed at the same time")
+    parser.add_argument("--strategy", choices=["sequential", "dag"], default="dag", help="Task execution strategy")
+    parser.add_argument("--no-search-cache", action="store_true", help="Bypass the search cache")
+    parser.add_argument("--force-refresh", action="store_true", help="Recompute every stage instead of reusing unchanged stage outputs")
+    args = parser.parse_args()
+
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    if not openai_api_key or not tavily_api_key:
+        parser.error("OPENAI_API_KEY and TAVILY_API_KEY must be set in the environment or a .env file")
+
+    analysis = ComparativeAnalysis(
+        companies=args.companies,
+        industry=args.industry,
+        openai_api_key=openai_api_key,
+        tavily_api_key=tavily_api_key,
+        max_parallel=args.parallel,
+        execution_strategy=args.strategy,
+        use_search_cache=not args.no_search_cache
+    )
+    report, md_file, html_file = analysis.run(force_refresh=args.force_refresh)
+    if report:
+        print(f"Comparison written to {md_file} and {html_file}")
+
+
+if __name__ == "__main__":
+    main()
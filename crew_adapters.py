@@ -0,0 +1,66 @@
+# CrewAI agents only accept CrewAI tools and LLMs. The clients and tools in this
+# repo are LangChain objects (their callbacks stream events, charge usage and trace,
+# and the resilience layer retries them), so agents get thin CrewAI wrappers that
+# call straight through to them. Agents are built with crew_tools() and crew_llm().
+from crewai.llms.base_llm import BaseLLM
+from crewai.tools import BaseTool as CrewBaseTool
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from typing import Any
+
+MESSAGE_CLASSES = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+
+
+# A LangChain tool as a CrewAI tool, with the same name, description and arguments
+class LangChainTool(CrewBaseTool):
+    tool: Any = None
+
+    def _run(self, **kwargs) -> Any:
+        return self.tool.invoke(kwargs)
+
+    async def _arun(self, **kwargs) -> Any:
+        return await self.tool.ainvoke(kwargs)
+
+
+def crew_tool(tool):
+    if isinstance(tool, CrewBaseTool):
+        return tool
+    return LangChainTool(name=tool.name, description=tool.description, args_schema=tool.args_schema, tool=tool)
+
+
+def crew_tools(tools: list) -> list:
+    return [crew_tool(tool) for tool in tools]
+
+
+def _messages(messages) -> list:
+    if isinstance(messages, str):
+        return [HumanMessage(content=messages)]
+    return [MESSAGE_CLASSES.get(message.get("role"), HumanMessage)(content=message.get("content") or "")
+            for message in messages]
+
+
+# A LangChain chat model as a CrewAI LLM. Agents use the ReAct text format, so
+# native function calling is off and the stop words CrewAI sets are passed on
+class LangChainLLM(BaseLLM):
+    llm: Any = None
+    llm_type: str = "langchain"
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None,
+             from_agent=None, response_model=None) -> str:
+        return str(self.llm.invoke(_messages(messages), stop=self.stop or None).content)
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None,
+                    from_agent=None, response_model=None) -> str:
+        return str((await self.llm.ainvoke(_messages(messages), stop=self.stop or None)).content)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+
+def crew_llm(llm):
+    if llm is None or isinstance(llm, BaseLLM):
+        return llm
+    model = str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or llm._llm_type)
+    return LangChainLLM(model=model, llm=llm)
@@ -0,0 +1,69 @@
+# Progress events for MarketResearchSystem.run.
+# The listener and the task being executed live in context variables, so clients
+# shared between concurrent analyses still report to the run that invoked them.
+from langchain_core.callbacks import BaseCallbackHandler
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+_listener = ContextVar("market_research_event_listener", default=None)
+_current_task = ContextVar("market_research_current_task", default=None)
+
+
+# Send an event to the listener of the current run, if any
+def emit(event_type: str, **data):
+    listener = _listener.get()
+    if listener is None:
+        return
+    event = {"type": event_type, "time": time.time(), "task": _current_task.get()}
+    event.update(data)
+    try:
+        listener(event)
+    except Exception as e:
+        # A broken UI callback must never abort a paid analysis
+        print(f"Error in event listener: {str(e)}")
+
+
+# Route events emitted in this context to listener(event)
+@contextmanager
+def listening(listener):
+    token = _listener.set(listener)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+# Attribute events emitted in this context to the given task label
+@contextmanager
+def current_task(label: str):
+    token = _current_task.set(label)
+    try:
+        yield
+    finally:
+        _current_task.reset(token)
+
+
+# Label of the task executing in this context, if any
+def get_current_task():
+    return _current_task.get()
+
+
+# Same as current_task, for callbacks that cannot wrap the whole task in a with block
+def set_current_task(label: str):
+    _current_task.set(label)
+
+
+# LangChain callback forwarding LLM activity and streamed tokens as events
+class EventCallbackHandler(BaseCallbackHandler):
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        emit("llm_started")
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        emit("llm_started")
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        emit("token", text=token)
+
+    def on_llm_end(self, response, **kwargs):
+        emit("llm_finished")
@@ -0,0 +1,263 @@
+# Local evidence index over every web search result seen by any run.
+# Result pages (URL, title, snippet and the query that found them) are kept in a
+# SQLite table with an FTS5 index and ranked by BM25, in-process and on disk, so
+# agents can answer from the local corpus first and only search the web on a miss.
+# A lookup is a hit when enough indexed pages cover most of the query's terms.
+# Results get indexed by wrapping the web search tool (indexed_search_tool), so
+# brokered and direct searches alike feed the index.
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+from search_broker import STOPWORDS
+from tracing import span
+from typing import Any, Type
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_EVIDENCE_INDEX_PATH = os.path.join(".cache", "evidence.sqlite")
+DEFAULT_MAX_DOCUMENTS = 50000
+
+
+def query_terms(text: str) -> list:
+    terms = []
+    for term in re.findall(r"[a-z0-9]+", str(text).lower()):
+        if term not in STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+class EvidenceIndex:
+    def __init__(self, path: str = DEFAULT_EVIDENCE_INDEX_PATH, max_documents: int = DEFAULT_MAX_DOCUMENTS):
+        self.path = path
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE,
+                    title TEXT,
+                    content TEXT,
+                    score REAL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_last_seen ON documents (last_seen)")
+            # rowid matches documents.id
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, content, queries, tokenize = 'porter unicode61'
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # Index one search's results; a page found again keeps its longest snippet and
+    # collects every query that found it
+    def add(self, results: list, query: str) -> int:
+        now = time.time()
+        added = 0
+        with self._lock, self._connect() as conn:
+            # Another process may index the same page between the lookup and the insert
+            conn.execute("BEGIN IMMEDIATE")
+            for result in results:
+                url = result.get("url")
+                if not url:
+                    continue
+                title, content = result.get("title") or "", result.get("content") or ""
+                row = conn.execute("SELECT id, content FROM documents WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    cursor = conn.execute(
+                        "INSERT INTO documents (url, title, content, score, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (url, title, content, result.get("score"), now, now)
+                    )
+                    conn.execute(
+                        "INSERT INTO documents_fts (rowid, title, content, queries) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, title, content, query)
+                    )
+                    added += 1
+                    continue
+
+                document_id, indexed_content = row
+                queries = conn.execute("SELECT queries FROM documents_fts WHERE rowid = ?", (document_id,)).fetchone()
+                queries = queries[0] if queries else ""
+                if query not in queries.split("\n"):
+                    queries = f"{queries}\n{query}" if queries else query
+                if len(content) > len(indexed_content or ""):
+                    conn.execute("UPDATE documents SET title = ?, content = ? WHERE id = ?", (title, content, document_id))
+                else:
+                    title, content = conn.execute(
+                        "SELECT title, content FROM documents WHERE id = ?", (document_id,)
+                    ).fetchone()
+                conn.execute("UPDATE documents SET last_seen = ? WHERE id = ?", (now, document_id))
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (document_id,))
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, title, content, queries) VALUES (?, ?, ?, ?)",
+                    (document_id, title, content, queries)
+                )
+            self._evict(conn)
+        return added
+
+    # Drop the least recently seen pages once the index grows past max_documents
+    def _evict(self, conn):
+        if not self.max_documents:
+            return
+        overflow = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] - self.max_documents
+        if overflow > 0:
+            stale = [row[0] for row in conn.execute(
+                "SELECT id FROM documents ORDER BY last_seen ASC LIMIT ?", (overflow,)
+            )]
+            conn.executemany("DELETE FROM documents_fts WHERE rowid = ?", [(i,) for i in stale])
+            conn.executemany("DELETE FROM documents WHERE id = ?", [(i,) for i in stale])
+
+    # Pages ranked by BM25 (title weighted above snippet and queries), each with the
+    # share of query terms it covers
+    def search(self, query: str, limit: int = 8) -> list:
+        terms = query_terms(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT d.url, d.title, d.content, d.score, bm25(documents_fts, 2.0, 1.0, 0.5) AS rank "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit * 4)
+            ).fetchall()
+
+        documents = []
+        for url, title, content, score, rank in rows:
+            words = set(re.findall(r"[a-z0-9]+", f"{title} {content}".lower()))
+            covered = sum(1 for term in terms if any(word.startswith(term[:5]) for word in words))
+            documents.append({
+                "url": url,
+                "title": title,
+                "content": content,
+                "score": score,
+                "bm25": -rank,
+                "coverage": covered / len(terms)
+            })
+        documents.sort(key=lambda document: (document["coverage"], document["bm25"]), reverse=True)
+        return documents[:limit]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM documents_fts")
+            conn.execute("DELETE FROM documents")
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+# One EvidenceIndex per file per process
+def get_evidence_index(path: str = DEFAULT_EVIDENCE_INDEX_PATH, **kwargs) -> EvidenceIndex:
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = EvidenceIndex(path=path, **kwargs)
+        return _indexes[path]
+
+
+class LocalEvidenceInput(BaseModel):
+    query: str = Field(description="What to look up in previously gathered web results")
+
+
+# Agent tool answering from the local index; one instance per run keeps the run's
+# hit/miss counts. A hit needs min_results pages covering min_coverage of the terms
+class LocalEvidenceTool(BaseTool):
+    name: str = "local_evidence_search"
+    description: str = (
+        "Searches web results already gathered by earlier searches and analyses. "
+        "Try it before searching the web; if it reports no local evidence, use the web search tool."
+    )
+    args_schema: Type[BaseModel] = LocalEvidenceInput
+    index: Any = None
+    limit: int = 8
+    min_results: int = 3
+    min_coverage: float = 0.6
+    stats: dict = Field(default_factory=lambda: {"lookups": 0, "hits": 0, "results": 0})
+    lock: Any = Field(default_factory=threading.Lock)
+
+    def _run(self, query: str, run_manager=None):
+        with span(self.name, "tool_call", query_chars=len(query)) as attributes:
+            documents = [
+                document for document in self.index.search(query, limit=self.limit)
+                if document["coverage"] >= self.min_coverage
+            ]
+            hit = len(documents) >= self.min_results
+            attributes["hit"] = hit
+            with self.lock:
+                self.stats["lookups"] += 1
+                if hit:
+                    self.stats["hits"] += 1
+                    self.stats["results"] += len(documents)
+
+        if not hit:
+            return "No local evidence for this query; search the web instead."
+        return [
+            {"title": document["title"], "url": document["url"], "content": (document["content"] or "")[:500]}
+            for document in documents
+        ]
+
+    # web_searches: searches the run still sent to the web, for the share of all
+    # retrievals answered locally
+    def summary(self, web_searches: int = None) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+        stats["lookup_hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        if web_searches is not None:
+            stats["web_searches"] = web_searches
+            retrievals = stats["hits"] + web_searches
+            stats["local_hit_ratio"] = stats["hits"] / retrievals if retrievals else 0.0
+        return stats
+
+
+# Web search tool that adds every successful result list to the index and counts the
+# searches it sent; one instance per run. Failed searches come back as a string
+class IndexedSearchTool(BaseTool):
+    search_tool: Any = None
+    index: Any = None
+    stats: dict = Field(default_factory=lambda: {"searches": 0, "new_documents": 0})
+    lock: Any = Field(default_factory=threading.Lock)
+
+    def _index(self, result, query: str):
+        indexed = 0
+        if isinstance(result, list) and result:
+            try:
+                indexed = self.index.add(result, query)
+            except Exception as e:
+                print(f"Could not index results for '{query}': {str(e)}")
+        with self.lock:
+            self.stats["searches"] += 1
+            self.stats["new_documents"] += indexed
+        return result
+
+    def _run(self, query: str, run_manager=None):
+        return self._index(self.search_tool.invoke({"query": query}), query)
+
+    async def _arun(self, query: str, run_manager=None):
+        result = await self.search_tool.ainvoke({"query": query})
+        return await asyncio.to_thread(self._index, result, query)
+
+
+# Wrap search_tool so its results are indexed; agents see the same name and schema
+def indexed_search_tool(search_tool, index: EvidenceIndex) -> IndexedSearchTool:
+    return IndexedSearchTool(name=search_tool.name, description=search_tool.description,
+                             args_schema=search_tool.args_schema, search_tool=search_tool, index=index)
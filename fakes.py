@@ -0,0 +1,273 @@
+# Deterministic local stand-ins for OpenAI and Tavily.
+# They inject configurable latency and return canned responses, so the agent
+# pipeline can be benchmarked and exercised offline without API keys or cost.
+# A FaultInjector makes them fail or stall like the real APIs do under load.
+# FakeLinkServer is a local HTTP server standing in for the sites reports link to.
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
+from search_cache import CachedTavilySearchResults
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+
+SEARCH_TOOL_NAME = CachedTavilySearchResults.model_fields["name"].default
+
+FAKE_TABLE = """| Use Case | Description | Implementation Resources | Datasets & Code |
+|----------|-------------|-------------------------|-----------------|
+| Predictive Maintenance | Detects equipment failures early from sensor data, reducing downtime. | • [Maintenance Guide](https://example.com/maintenance) - Implementation guide | • [Sensor Dataset](https://www.kaggle.com/datasets/example/sensors) - Sensor readings<br>• [Maintenance Models](https://github.com/example/maintenance) - Python implementation |
+| Customer Support Assistant | Answers customer questions using product documentation, cutting response times. | • [Assistant Guide](https://example.com/assistant) - Deployment guide | • [Support Tickets](https://huggingface.co/datasets/example/tickets) - Labelled tickets<br>• [Assistant Code](https://github.com/example/assistant) - Reference bot |
+| Demand Forecasting | Forecasts product demand to optimize inventory and supply chain planning. | • [Forecasting Guide](https://example.com/forecasting) - Modelling guide | • [Sales Dataset](https://www.kaggle.com/datasets/example/sales) - Historical sales<br>• [Forecast Models](https://github.com/example/forecast) - Time-series models |
+| Generative Design | Accelerates R&D by generating and evaluating candidate product designs. | • [Design Guide](https://example.com/design) - Research overview | • [Design Dataset](https://huggingface.co/datasets/example/designs) - Design corpus<br>• [Design Code](https://github.com/example/design) - Generative models |"""
+
+
+# Error shaped like an HTTP failure from the real clients: a status code and headers
+class InjectedFault(Exception):
+    def __init__(self, status_code: int, retry_after: float = None):
+        super().__init__(f"Error {status_code}: injected fault")
+        self.status_code = status_code
+        self.headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+
+
+# Seeded fault schedule shared by the fakes: the first fail_first calls fail, then
+# each call fails with probability error_rate (as one of statuses), times out with
+# probability timeout_rate, or is slowed by slow_latency with probability slow_rate
+class FaultInjector:
+    def __init__(self, error_rate: float = 0.0, statuses: tuple = (429, 503), retry_after: float = None,
+                 timeout_rate: float = 0.0, slow_rate: float = 0.0, slow_latency: float = 2.0,
+                 fail_first: int = 0, seed: int = 0):
+        self.error_rate = error_rate
+        self.statuses = statuses
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.fail_first = fail_first
+        self.calls = 0
+        self.injected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # Raises the injected error, or returns extra latency for this call
+    def inject(self) -> float:
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            status = self._random.choice(self.statuses)
+            fail = self.calls <= self.fail_first or roll < self.error_rate
+            timeout = not fail and roll < self.error_rate + self.timeout_rate
+            slow = not fail and not timeout and self._random.random() < self.slow_rate
+            if fail or timeout:
+                self.injected += 1
+        if fail:
+            raise InjectedFault(status, self.retry_after)
+        if timeout:
+            raise TimeoutError("Injected timeout")
+        return self.slow_latency if slow else 0.0
+
+
+def _fault_delay(faults) -> float:
+    return faults.inject() if faults is not None else 0.0
+
+
+# Rough token count used for fake usage metadata
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# Chat model that answers in the ReAct format CrewAI agents parse: one search
+# action first, then a canned final answer once an observation is in the conversation
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.5
+    token_latency: float = 0.0
+    search_first: bool = True
+    final_answer: str = FAKE_TABLE
+    model_name: str = "fake-gpt"
+    faults: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "latency": self.latency}
+
+    def _respond(self, messages) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        # The system prompt explains the format, "Observation:" included; only a
+        # tool result in the conversation counts
+        conversation = "\n".join(str(message.content) for message in messages if not isinstance(message, SystemMessage))
+        if self.search_first and "Observation:" not in conversation:
+            # Derive a stable query from the prompt so identical runs search identically
+            query = "AI use cases " + hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+            return (
+                "Thought: I should search for relevant information.\n"
+                f"Action: {SEARCH_TOOL_NAME}\n"
+                f"Action Input: {json.dumps({'query': query})}"
+            )
+        return f"Thought: I now know the final answer\nFinal Answer: {self.final_answer}"
+
+    def _message(self, messages, text: str, message_class=AIMessage):
+        prompt_tokens = estimate_tokens("\n".join(str(message.content) for message in messages))
+        completion_tokens = estimate_tokens(text)
+        return message_class(content=text, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        })
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency + _fault_delay(self.faults))
+        text = self._respond(messages)
+        return ChatResult(
+            generations=[ChatGeneration(message=self._message(messages, text))],
+            llm_output={"model_name": self.model_name}
+        )
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None,
+                         **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency + _fault_delay(self.faults))
+        text = self._respond(messages)
+        return ChatResult(
+            generations=[ChatGeneration(message=self._message(messages, text))],
+            llm_output={"model_name": self.model_name}
+        )
+
+    def _stream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        time.sleep(self.latency + _fault_delay(self.faults))
+        words = self._respond(messages).split(" ")
+        for index, word in enumerate(words):
+            text = word if index == len(words) - 1 else word + " "
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+        # Final empty chunk carries usage, as OpenAI does with stream_usage
+        yield ChatGenerationChunk(message=self._message(messages, " ".join(words), AIMessageChunk).model_copy(
+            update={"content": ""}
+        ))
+
+
+# Tavily API wrapper returning canned results after a configurable delay; calls
+# counts the searches that reached it
+class FakeTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    latency: float = 0.3
+    faults: Any = None
+    calls: int = 0
+
+    def raw_results(self, query: str, max_results: Optional[int] = 5, *args, **kwargs) -> Dict:
+        time.sleep(self.latency + _fault_delay(self.faults))
+        return self._canned(query, max_results)
+
+    async def raw_results_async(self, query: str, max_results: Optional[int] = 5, *args, **kwargs) -> Dict:
+        await asyncio.sleep(self.latency + _fault_delay(self.faults))
+        return self._canned(query, max_results)
+
+    def _canned(self, query: str, max_results: Optional[int]) -> Dict:
+        self.calls += 1
+        digest = hashlib.sha256(query.encode("utf-8")).hexdigest()[:8]
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"Result {index} for {query}",
+                    "url": f"https://example.com/{digest}/{index}",
+                    "content": f"Canned content {index} about {query}.",
+                    "score": 1.0 - index / 10
+                }
+                for index in range(max_results or 5)
+            ]
+        }
+
+
+# Search tool identical to the production one except for its backend
+def fake_search_tool(latency: float = 0.3, max_results: int = 8, use_cache: bool = False,
+                     faults: FaultInjector = None, **kwargs) -> CachedTavilySearchResults:
+    return CachedTavilySearchResults(
+        api_wrapper=FakeTavilySearchAPIWrapper(tavily_api_key="tvly-fake", latency=latency, faults=faults),
+        max_results=max_results,
+        search_depth="advanced",
+        use_cache=use_cache,
+        **kwargs
+    )
+
+
+# Responses by the first path segment: /ok/..., /missing/... (404), /gone/... (410),
+# /no-head/... (405 for HEAD, 200 for GET), /redirect/... (301 to /ok/...),
+# /redirect-host/<host>/... (301 to /ok/... on host, same port), /limited/... (429), /error/... (500) and /slow/... (200 after the server's delay)
+class _FakeLinkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, head: bool):
+        kind = self.path.strip("/").split("/", 1)[0]
+        if kind == "slow":
+            time.sleep(self.server.slow_latency)
+        status = {"missing": 404, "gone": 410, "limited": 429, "error": 500}.get(kind, 200)
+        headers = {}
+        if kind == "no-head" and head:
+            status = 405
+        elif kind == "redirect":
+            status = 301
+            headers["Location"] = "/ok/" + self.path.strip("/").split("/", 1)[-1]
+        elif kind == "redirect-host":
+            status = 301
+            _, host, rest = self.path.strip("/").split("/", 2)
+            headers["Location"] = f"http://{host}:{self.server.server_address[1]}/ok/{rest}"
+
+        body = b"" if head else f"{status} {self.path}".encode("utf-8")
+        self.server.requests += 1
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out waiting for a slow response
+            self.close_connection = True
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Local stand-in for the linked sites, served from a background thread:
+#   with FakeLinkServer() as server: server.url("/missing/dataset")
+class FakeLinkServer:
+    def __init__(self, slow_latency: float = 2.0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FakeLinkHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.slow_latency = slow_latency
+        self.httpd.requests = 0
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    def url(self, path: str) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/{path.lstrip('/')}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,380 @@
+# Local background job queue for analyses.
+# Jobs run on a thread pool outside the Streamlit script thread and are recorded
+# in a SQLite table, so results survive reruns and page reloads. Identical
+# in-flight requests are de-duplicated onto one job.
+#
+# Several processes can share one jobs table (see service.py). Requests are then
+# enqueued unowned, and every process claims queued jobs as it has free threads.
+# De-duplication and claiming run in write transactions, so they hold across
+# processes, and each job records the worker running it.
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_JOBS_PATH = os.path.join(".cache", "jobs.sqlite")
+# Rendered outputs of this many recent jobs are kept in memory for downloads
+DOWNLOAD_CACHE_SIZE = 32
+DOWNLOAD_MIME_TYPES = {
+    "md": "text/markdown",
+    "html": "text/html",
+    "json": "application/json",
+    "csv": "text/csv"
+}
+ACTIVE_STATUSES = ("queued", "running")
+# Seconds an idle claiming thread waits before looking for queued jobs again
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+# Id recorded on the jobs a process runs; pid defaults to this process
+def default_worker_id(pid: int = None) -> str:
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+# Same company, industry and options means the same analysis, whoever asks for it
+def request_key(company: str, industry: str, options: dict) -> str:
+    payload = json.dumps({
+        "company": " ".join(company.lower().split()),
+        "industry": " ".join(industry.lower().split()),
+        "options": options
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Default job body: one MarketResearchSystem run reporting events to callback;
+# system_options are passed on to MarketResearchSystem (rate limiters, stand-in backends)
+def run_analysis(job: dict, openai_api_key: str, tavily_api_key: str, callback, **system_options) -> dict:
+    # Imported here so the UI can create a queue without loading CrewAI and LangChain
+    from market_research_system import MarketResearchSystem
+
+    options = job["options"]
+    system = MarketResearchSystem(
+        company=job["company"],
+        industry=job["industry"],
+        openai_api_key=openai_api_key,
+        tavily_api_key=tavily_api_key,
+        use_search_cache=options.get("use_search_cache", True),
+        pipeline=options.get("pipeline", "multi_agent"),
+        **system_options
+    )
+    report, md_file, html_file = system.run(
+        execution_strategy=options.get("execution_strategy"),
+        callback=callback,
+        force_refresh=options.get("force_refresh", False)
+    ) or (None, None, None)
+
+    if not report:
+        raise RuntimeError("Analysis generation failed")
+
+    # A cached report was not rendered in this run; its sibling exports may exist on disk
+    if system.rendered is not None:
+        files = system.rendered.files
+        downloads = {fmt: system.rendered.download(fmt) for fmt in system.rendered.outputs}
+    else:
+        base = os.path.splitext(md_file)[0]
+        files = {"md": md_file, "html": html_file}
+        files.update({fmt: f"{base}.{fmt}" for fmt in ("json", "csv") if os.path.exists(f"{base}.{fmt}")})
+        downloads = {}
+
+    return {
+        "report": report,
+        "md_file": md_file,
+        "html_file": html_file,
+        "task_timings": system.task_timings,
+        "timing_summary": system.timing_summary,
+        "from_cache": system.from_cache,
+        "usage": system.usage,
+        "trace_summary": system.trace_summary,
+        "resilience": system.resilience,
+        "compaction": system.compaction,
+        "link_check": system.link_check,
+        "routing": system.routing,
+        "result": system.result.model_dump(mode="json") if system.result else None,
+        "result_file": system.result_file,
+        "files": files,
+        "search_stats": system.search_stats,
+        "evidence_stats": system.evidence_stats,
+        # Held in memory by the queue, never written to the jobs table
+        "downloads": downloads
+    }
+
+
+# recover marks jobs left active by an earlier run of this queue as interrupted;
+# processes sharing a table leave that to whoever supervises them
+class JobQueue:
+    def __init__(self, path: str = DEFAULT_JOBS_PATH, max_workers: int = 2, runner=run_analysis,
+                 worker_id: str = None, recover: bool = True):
+        self.path = path
+        self.runner = runner
+        self.max_workers = max_workers
+        self.worker_id = worker_id or default_worker_id()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        # Live progress of jobs running in this process, including streamed output
+        self._progress = {}
+        self._downloads = OrderedDict()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    request_key TEXT NOT NULL,
+                    company TEXT NOT NULL,
+                    industry TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "worker" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN worker TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_request ON jobs (request_key, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            # API keys are never persisted, so jobs cut off by a restart cannot resume
+            if recover:
+                conn.execute(
+                    "UPDATE jobs SET status = 'interrupted', finished_at = ? WHERE status IN (?, ?)",
+                    (time.time(),) + ACTIVE_STATUSES
+                )
+
+    # Commits on success and always closes: a connection left for the garbage
+    # collector would still be open in processes forked from this one
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _update(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", tuple(fields.values()) + (job_id,))
+
+    # (job id, created): a new queued job, or an identical one already in flight in
+    # any process. The write transaction makes check-and-insert atomic across processes
+    def _insert(self, company: str, industry: str, options: dict, worker: str = None):
+        key = request_key(company, industry, options)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE request_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (key,) + ACTIVE_STATUSES
+            ).fetchone()
+            if row is not None:
+                return row["id"], False
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, request_key, company, industry, options, status, stage, worker, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', 'Waiting for a free worker...', ?, ?)",
+                (job_id, key, company, industry, json.dumps(options), worker, time.time())
+            )
+        return job_id, True
+
+    # Queue an analysis on this process's pool, or return the id of an identical one already in flight
+    def submit(self, company: str, industry: str, openai_api_key: str, tavily_api_key: str,
+               options: dict = None) -> str:
+        with self._lock:
+            job_id, created = self._insert(company, industry, options or {}, worker=self.worker_id)
+            if not created:
+                return job_id
+            self._progress[job_id] = {"stage": "Waiting for a free worker...", "running": [], "outputs": {}}
+
+        self._pool.submit(self._execute, job_id, openai_api_key, tavily_api_key)
+        return job_id
+
+    # Queue an analysis for whichever claiming process is free first
+    def enqueue(self, company: str, industry: str, options: dict = None) -> str:
+        job_id, created = self._insert(company, industry, options or {})
+        if created:
+            self._wakeup.set()
+        return job_id
+
+    # Take the oldest unowned queued job for this process, if any
+    def _claim(self):
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' AND worker IS NULL LIMIT 1").fetchone() is None:
+                return None
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' AND worker IS NULL ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET worker = ? WHERE id = ?", (self.worker_id, row["id"]))
+        with self._lock:
+            self._progress[row["id"]] = {"stage": "Starting analysis...", "running": [], "outputs": {}}
+        return row["id"]
+
+    def _claim_loop(self, openai_api_key: str, tavily_api_key: str, poll_interval: float):
+        while not self._stopping.is_set():
+            job_id = self._claim()
+            if job_id is None:
+                self._wakeup.wait(poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(job_id, openai_api_key, tavily_api_key)
+
+    # Run enqueued jobs from the shared table on every thread of this process's pool
+    def start_claiming(self, openai_api_key: str, tavily_api_key: str,
+                       poll_interval: float = DEFAULT_POLL_INTERVAL):
+        for _ in range(self.max_workers):
+            self._pool.submit(self._claim_loop, openai_api_key, tavily_api_key, poll_interval)
+
+    # Claiming threads finish their current job and stop
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    # Mark the active jobs of a worker that exited as interrupted
+    def interrupt_worker(self, worker_id: str) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'interrupted', stage = 'Worker exited', finished_at = ? "
+                "WHERE worker = ? AND status IN (?, ?)",
+                (time.time(), worker_id) + ACTIVE_STATUSES
+            )
+            return cursor.rowcount
+
+    # Number of jobs per status, across every process sharing the table
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            return {row["status"]: row["jobs"] for row in conn.execute(
+                "SELECT status, COUNT(*) AS jobs FROM jobs GROUP BY status"
+            )}
+
+    # Jobs running in this process
+    def running(self) -> int:
+        with self._lock:
+            return len(self._progress)
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # Stage and per-task output streamed so far; falls back to the stored stage
+    def progress(self, job_id: str) -> dict:
+        with self._lock:
+            progress = self._progress.get(job_id)
+            if progress is not None:
+                return {
+                    "stage": progress["stage"],
+                    "running": list(progress["running"]),
+                    "outputs": dict(progress["outputs"])
+                }
+        job = self.get(job_id)
+        return {"stage": job["stage"] if job else None, "running": [], "outputs": {}}
+
+    def _set_stage(self, job_id: str, stage: str):
+        with self._lock:
+            self._progress[job_id]["stage"] = stage
+        self._update(job_id, stage=stage)
+
+    # Fold run events into the job's live progress
+    def _on_event(self, job_id: str, event: dict):
+        task = event.get("task")
+        with self._lock:
+            progress = self._progress[job_id]
+            outputs = progress["outputs"]
+            running = progress["running"]
+            if task and task not in outputs:
+                outputs[task] = ""
+
+            if event["type"] == "token" and task:
+                outputs[task] += event.get("text", "")
+                return
+            if event["type"] == "task_started":
+                running.append(task)
+                stage = f"{' and '.join(running)} working..."
+            elif event["type"] == "task_finished":
+                if task in running:
+                    running.remove(task)
+                # Replace streamed tokens with the task's final answer
+                outputs[task] = event.get("output", outputs[task])
+                stage = f"{' and '.join(running)} working..." if running else f"{task} finished"
+            elif event["type"] == "tool_call":
+                source = "cache" if event.get("cached") else "web"
+                stage = f"{task or 'Agent'} searching ({source}): {event.get('query')}"
+            elif event["type"] == "run_finished":
+                stage = "Generating report..."
+            else:
+                return
+
+        self._set_stage(job_id, stage)
+
+    def _remember_downloads(self, job_id: str, downloads: dict):
+        with self._lock:
+            self._downloads[job_id] = downloads
+            self._downloads.move_to_end(job_id)
+            while len(self._downloads) > DOWNLOAD_CACHE_SIZE:
+                self._downloads.popitem(last=False)
+
+    # format -> (file name, bytes, MIME type) for a finished job's outputs, served
+    # from memory; outputs not held in memory (older jobs, another process, cached
+    # reports) are read from disk once and then kept
+    def downloads(self, job_id: str) -> dict:
+        with self._lock:
+            downloads = dict(self._downloads.get(job_id, {}))
+
+        result = (self.get(job_id) or {}).get("result") or {}
+        files = result.get("files") or {"md": result.get("md_file"), "html": result.get("html_file")}
+        missing = {fmt: path for fmt, path in files.items() if fmt not in downloads and path and os.path.exists(path)}
+        if missing:
+            for fmt, path in missing.items():
+                with open(path, "rb") as f:
+                    downloads[fmt] = (os.path.basename(path), f.read(), DOWNLOAD_MIME_TYPES.get(fmt, "text/plain"))
+            self._remember_downloads(job_id, downloads)
+        return downloads
+
+    def _execute(self, job_id: str, openai_api_key: str, tavily_api_key: str):
+        self._update(job_id, status="running", started_at=time.time())
+        self._set_stage(job_id, "Starting analysis...")
+        job = self.get(job_id)
+
+        try:
+            result = self.runner(
+                job,
+                openai_api_key,
+                tavily_api_key,
+                lambda event: self._on_event(job_id, event)
+            )
+            self._remember_downloads(job_id, result.pop("downloads", None) or {})
+            self._update(job_id, status="done", stage="Analysis complete", result=json.dumps(result),
+                         finished_at=time.time())
+        except Exception as e:
+            print(f"Error during analysis job {job_id}: {str(e)}")
+            self._update(job_id, status="failed", stage="Analysis failed", error=str(e),
+                         finished_at=time.time())
+        finally:
+            with self._lock:
+                self._progress.pop(job_id, None)
@@ -0,0 +1,90 @@
+# Offline check and benchmark of link verification against FakeLinkServer.
+# Builds a report table citing dozens of local links of every kind (reachable,
+# missing, gone, redirected, HEAD-refusing, rate-limited, failing and too slow),
+# verifies it cold and again from the verdict cache, and exits non-zero when a
+# verdict, the flagged/dropped markdown or the time budget is wrong.
+from fakes import FakeLinkServer
+from link_checker import LinkCache, LinkChecker, annotate_links, extract_urls
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+# Expected verdict per kind of link
+EXPECTED = {
+    "ok": "ok",
+    "redirect": "ok",
+    "no-head": "ok",
+    "missing": "dead",
+    "gone": "dead",
+    "limited": "unverified",
+    "error": "unverified",
+    "slow": "unverified"
+}
+
+
+def build_report(server: FakeLinkServer, links: int) -> tuple:
+    kinds = list(EXPECTED)
+    expected = {}
+    rows = []
+    for index in range(links):
+        kind = kinds[index % len(kinds)]
+        resource = server.url(f"/{kind}/resource-{index}")
+        dataset = server.url(f"/{kind}/dataset-{index}")
+        expected[resource] = expected[dataset] = EXPECTED[kind]
+        rows.append(f"| Use Case {index} | Description {index} | • [Guide {index}]({resource}) - Guide | "
+                    f"• [Dataset {index}]({dataset}) - Data<br>• [Docs](https://example.invalid/{index}) |")
+    report = ("| Use Case | Description | Implementation Resources | Datasets & Code |\n"
+              "|----------|-------------|-------------------------|-----------------|\n" + "\n".join(rows))
+    return report, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify link checking against a local stand-in server")
+    parser.add_argument("--links", type=int, default=24, help="Table rows; each row cites three links")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Per-request timeout in seconds")
+    parser.add_argument("--budget", type=float, default=3.0, help="Maximum seconds for a cold verification")
+    args = parser.parse_args()
+
+    failures = []
+    with FakeLinkServer(slow_latency=args.timeout * 2) as server, tempfile.TemporaryDirectory() as directory:
+        report, expected = build_report(server, args.links)
+        # .invalid never resolves, so these links are dead
+        expected.update({url: "dead" for url in extract_urls(report) if ".invalid/" in url})
+
+        checker = LinkChecker(timeout=args.timeout, deadline=args.budget,
+                              cache=LinkCache(os.path.join(directory, "links.sqlite")), allow_private=True)
+        for label in ("cold", "cached"):
+            requests_before = server.requests
+            verdicts = asyncio.run(checker.averify(extract_urls(report)))
+            stats = checker.stats
+            print(f"{label}: {stats['links']} links in {stats['seconds']:.2f}s "
+                  f"({stats['ok']} ok, {stats['dead']} dead, {stats['unverified']} unverified, "
+                  f"{stats['cached']} cached, {server.requests - requests_before} requests)")
+
+            wrong = {url: v["status"] for url, v in verdicts.items() if v["status"] != expected[url]}
+            if wrong:
+                failures.append(f"{label}: unexpected verdicts {wrong}")
+            if label == "cold" and stats["seconds"] > args.budget + 0.5:
+                failures.append(f"cold verification took {stats['seconds']:.2f}s, over the {args.budget}s budget")
+
+        # Unverified links are cached too, so the second pass only re-checks nothing
+        if stats["checked"]:
+            failures.append(f"cached pass re-checked {stats['checked']} links")
+
+        dead = [url for url, status in expected.items() if status == "dead"]
+        flagged = annotate_links(report, verdicts)
+        if flagged.count("⚠️ *unreachable*") != len(dead):
+            failures.append("flagged report does not mark every dead link")
+        dropped = annotate_links(report, verdicts, drop_dead=True)
+        if any(url in dropped for url in dead) or dropped.count("\n") != report.count("\n"):
+            failures.append("dropping dead links left them in the report or broke the table")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
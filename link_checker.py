@@ -0,0 +1,281 @@
+# Verification of the resource and dataset URLs cited in a report.
+# Every link is checked concurrently over one pooled aiohttp session (HEAD, then GET
+# where HEAD is refused) within a per-report deadline, and verdicts are cached in
+# SQLite with a TTL per verdict, so repeat analyses only re-check links gone stale.
+# A link is "ok" (reachable), "dead" (404/410, unknown host or refused connection)
+# or "unverified" (timeouts, rate limits, auth walls, server errors, TLS problems and
+# transient DNS failures say nothing about whether the page exists).
+# Unless allowed, links (and redirects) to loopback, link-local and private addresses
+# are refused before connecting, so a report cannot make the checker probe the
+# network it runs in.
+from results import MARKDOWN_LINK, BARE_URL
+import aiohttp
+import asyncio
+import ipaddress
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from yarl import URL
+
+DEFAULT_LINK_CACHE_PATH = os.path.join(".cache", "link_cache.sqlite")
+
+# Seconds a verdict stays fresh
+VERDICT_TTLS = {
+    "ok": 7 * 24 * 60 * 60,
+    "dead": 24 * 60 * 60,
+    "unverified": 60 * 60
+}
+
+DEAD_STATUSES = {404, 410}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10
+# Servers that refuse HEAD (or answer it differently from GET) get a GET
+HEAD_REFUSED_STATUSES = {403, 405, 501}
+# Resolver answers meaning the host does not exist; others (EAI_AGAIN, ...) may pass
+DEAD_HOST_ERRNOS = {socket.EAI_NONAME} | ({socket.EAI_NODATA} if hasattr(socket, "EAI_NODATA") else set())
+
+USER_AGENT = "Mozilla/5.0 (compatible; market-research-link-checker/1.0)"
+
+
+# Every distinct http(s) URL in a report, in order of first appearance
+def extract_urls(report: str) -> list:
+    urls = []
+    for match in MARKDOWN_LINK.finditer(report):
+        if match.group(2) not in urls:
+            urls.append(match.group(2))
+    for match in BARE_URL.finditer(MARKDOWN_LINK.sub(" ", report)):
+        url = match.group(0).rstrip(".,;")
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def classify(status_code: int) -> str:
+    if status_code < 400:
+        return "ok"
+    if status_code in DEAD_STATUSES:
+        return "dead"
+    return "unverified"
+
+
+# Verdict for a failed connection: a refused connection or a host that does not
+# exist is dead; TLS and certificate errors, transient DNS failures and unreachable
+# networks leave the link unverified (and cached for less time)
+def connection_status(error: aiohttp.ClientConnectorError) -> str:
+    if isinstance(error, aiohttp.ClientSSLError):
+        return "unverified"
+    os_error = getattr(error, "os_error", None)
+    if isinstance(os_error, ConnectionRefusedError):
+        return "dead"
+    if isinstance(os_error, socket.gaierror):
+        return "dead" if os_error.errno in DEAD_HOST_ERRNOS else "unverified"
+    return "unverified"
+
+
+class NonPublicAddressError(OSError):
+    pass
+
+
+# Whether address is routable on the public internet (not loopback, link-local,
+# private, shared, reserved or multicast)
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if getattr(ip, "ipv4_mapped", None):
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+# Resolver refusing hostnames with any non-public address; checking the addresses
+# actually connected to also covers DNS answers that change between lookups
+class PublicResolver(aiohttp.ThreadedResolver):
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> list:
+        addresses = await super().resolve(host, port, family)
+        for address in addresses:
+            if not is_public_address(address["host"]):
+                raise NonPublicAddressError(f"{host} resolves to non-public address {address['host']}")
+        return addresses
+
+
+# IP literals skip the resolver, so each request's host is checked before it is sent
+def _refuse_non_public_ip(host: str):
+    try:
+        public = is_public_address(host)
+    except ValueError:
+        return
+    if not public:
+        raise NonPublicAddressError(f"{host} is not a public address")
+
+
+def verdict(url: str, status: str, status_code: int = None, final_url: str = None, error: str = None) -> dict:
+    return {"url": url, "status": status, "status_code": status_code, "final_url": final_url,
+            "error": error, "checked_at": time.time()}
+
+
+# Verdicts per URL, each expiring after its verdict's TTL
+class LinkCache:
+    def __init__(self, path: str = DEFAULT_LINK_CACHE_PATH, ttls: dict = None):
+        self.path = path
+        self.ttls = dict(VERDICT_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS link_cache (
+                    url TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get_many(self, urls: list) -> dict:
+        if not urls:
+            return {}
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT url, value FROM link_cache WHERE expires_at > ? AND url IN ({', '.join('?' * len(urls))})",
+                [now] + list(urls)
+            ).fetchall()
+        return {url: json.loads(value) for url, value in rows}
+
+    def set_many(self, verdicts: list):
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO link_cache (url, value, expires_at) VALUES (?, ?, ?)",
+                [(v["url"], json.dumps(v), v["checked_at"] + self.ttls[v["status"]]) for v in verdicts]
+            )
+            conn.execute("DELETE FROM link_cache WHERE expires_at <= ?", (time.time(),))
+
+
+class LinkChecker:
+    # timeout bounds one request, deadline the whole batch; links still pending at the
+    # deadline are reported unverified and not cached
+    # allow_private: also check loopback, link-local and private addresses (local
+    # test servers); refused links are reported unverified
+    def __init__(self, timeout: float = 5.0, deadline: float = 10.0, concurrency: int = 32,
+                 per_host: int = 8, cache: LinkCache = None, use_cache: bool = True,
+                 allow_private: bool = False):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.allow_private = allow_private
+        self.cache = (cache or LinkCache()) if use_cache else None
+        self.stats = {}
+
+    # Redirects are followed here rather than by aiohttp so every hop's host is checked
+    async def _request(self, session, method: str, url: str):
+        url = URL(url)
+        for _ in range(MAX_REDIRECTS + 1):
+            if not self.allow_private:
+                _refuse_non_public_ip(url.host)
+            async with session.request(method, url, allow_redirects=False) as response:
+                location = response.headers.get("Location")
+                if response.status not in REDIRECT_STATUSES or not location:
+                    return response.status, str(response.url)
+                url = response.url.join(URL(location))
+        raise aiohttp.TooManyRedirects(response.request_info, ())
+
+    async def _check(self, session, semaphore, url: str) -> dict:
+        async with semaphore:
+            try:
+                status_code, final_url = await self._request(session, "HEAD", url)
+                if status_code in HEAD_REFUSED_STATUSES:
+                    status_code, final_url = await self._request(session, "GET", url)
+                return verdict(url, classify(status_code), status_code, final_url)
+            except NonPublicAddressError as e:
+                return verdict(url, "unverified", error=str(e))
+            except aiohttp.ClientConnectorError as e:
+                if isinstance(e.os_error, NonPublicAddressError):
+                    return verdict(url, "unverified", error=str(e.os_error))
+                return verdict(url, connection_status(e), error=str(e) or type(e).__name__)
+            except aiohttp.InvalidURL as e:
+                return verdict(url, "dead", error=str(e) or type(e).__name__)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                return verdict(url, "unverified", error=str(e) or type(e).__name__)
+
+    async def averify(self, urls: list) -> dict:
+        started = time.perf_counter()
+        urls = list(dict.fromkeys(urls))
+        verdicts = self.cache.get_many(urls) if self.cache is not None else {}
+        cached = len(verdicts)
+        pending = [url for url in urls if url not in verdicts]
+
+        checked = []
+        if pending:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            resolver = None if self.allow_private else PublicResolver()
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300,
+                                             resolver=resolver)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers={"User-Agent": USER_AGENT}) as session:
+                checks = {url: asyncio.ensure_future(self._check(session, semaphore, url)) for url in pending}
+                done, not_done = await asyncio.wait(checks.values(), timeout=self.deadline)
+                for task in not_done:
+                    task.cancel()
+                if not_done:
+                    await asyncio.wait(not_done)
+            results = {url: task.result() for url, task in checks.items() if task in done}
+            # When no host answered at all, the checker is offline rather than every link dead
+            if results and all(v["error"] and v["status_code"] is None for v in results.values()):
+                results = {url: dict(v, status="unverified") for url, v in results.items()}
+            for url in pending:
+                if url in results:
+                    verdicts[url] = results[url]
+                    checked.append(results[url])
+                else:
+                    verdicts[url] = verdict(url, "unverified", error="Verification deadline exceeded")
+            if self.cache is not None:
+                self.cache.set_many(checked)
+
+        verdicts = {url: verdicts[url] for url in urls}
+        self.stats = dict(
+            {status: 0 for status in VERDICT_TTLS},
+            links=len(urls),
+            cached=cached,
+            checked=len(checked),
+            seconds=time.perf_counter() - started
+        )
+        for v in verdicts.values():
+            self.stats[v["status"]] += 1
+        return verdicts
+
+    # Blocking wrapper for callers without an event loop
+    def verify(self, urls: list) -> dict:
+        return asyncio.run(self.averify(urls))
+
+
+# A markdown link to url, or url written out bare (not the start of a longer URL)
+def _link_pattern(url: str) -> str:
+    escaped = re.escape(url)
+    return rf"(?:\[[^\]]+\]\({escaped}\)|(?<![\w/(]){escaped}(?=[.,;]*(?:[\s|<>)\]]|$)))"
+
+
+# Mark dead links (markdown or bare URLs) in the markdown after the link, or with
+# drop_dead remove the bullet items citing them from the table cells
+def annotate_links(report: str, verdicts: dict, drop_dead: bool = False) -> str:
+    for url, v in verdicts.items():
+        if v["status"] != "dead":
+            continue
+        link = _link_pattern(url)
+        if drop_dead:
+            report = re.sub(rf"(?:<br\s*/?>\s*)?•[^|<•\n]*?{link}[^|<•\n]*", "", report)
+            report = re.sub(rf"(?:<br\s*/?>\s*)?{link}[^|<•\n]*", "", report)
+            report = re.sub(r"\|\s*<br\s*/?>\s*", "| ", report)
+        else:
+            report = re.sub(rf"({link})", r"\1 ⚠️ *unreachable*", report)
+    return report
@@ -0,0 +1,168 @@
+# Load test for the multi-process service (service.py) using the fake LLM and search
+# backends in fakes.py. For each worker count it starts a fresh service in a scratch
+# directory and posts a burst of analyses. Each company is requested with both
+# execution strategies, plus a duplicate of the first request. Duplicates should
+# join the in-flight job, and both strategies' identical searches should reach the
+# fake Tavily once across all workers. Reports throughput, job latency, jobs per
+# worker and backend searches, and the speedup over the first worker count.
+from concurrent.futures import ThreadPoolExecutor
+from fakes import FakeChatModel, fake_search_tool
+from job_queue import run_analysis
+from service import Service
+import argparse
+import functools
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+FINISHED_STATUSES = ("done", "failed", "interrupted")
+
+
+# Job body for the service: a full run on the fake backends, with the search cache
+# (and its cross-process single-flight) shared by every worker
+def run_fake_analysis(job: dict, openai_api_key: str, tavily_api_key: str, callback, llm_latency: float = 0.5,
+                      search_latency: float = 0.3) -> dict:
+    search_tool = fake_search_tool(latency=search_latency, use_cache=job["options"].get("use_search_cache", True))
+    result = run_analysis(
+        job, openai_api_key, tavily_api_key, callback,
+        llm=FakeChatModel(latency=llm_latency),
+        search_tool=search_tool,
+        verify_links=False
+    )
+    result["backend_searches"] = search_tool.api_wrapper.calls
+    return result
+
+
+def _request(url: str, body: dict = None, timeout: float = 30) -> dict:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def wait_until_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return _request(f"{url}/health", timeout=2)
+        except (urllib.error.URLError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+# Requests of one burst: each company with both strategies, plus a duplicate of the
+# first request for every company. Cached reports and checkpoints are bypassed so
+# every job is a full run; the search cache stays shared
+def burst(companies: int, pipeline: str) -> list:
+    requests = []
+    for index in range(companies):
+        for strategy in ("sequential", "dag"):
+            requests.append({
+                "company": f"Company{index}",
+                "industry": "Semiconductors",
+                "options": {"pipeline": pipeline, "execution_strategy": strategy, "force_refresh": True}
+            })
+        requests.append(dict(requests[-2]))
+    return requests
+
+
+def load_scenario(workers: int, threads: int, companies: int, pipeline: str, llm_latency: float,
+                  search_latency: float, poll_interval: float = 0.2, timeout: float = 600) -> dict:
+    os.chdir(tempfile.mkdtemp(prefix="market_research_load_"))
+    service = Service(
+        port=0,
+        workers=workers,
+        threads=threads,
+        runner=functools.partial(run_fake_analysis, llm_latency=llm_latency, search_latency=search_latency),
+        openai_api_key="sk-fake",
+        tavily_api_key="tvly-fake"
+    ).start()
+
+    try:
+        wait_until_ready(service.url)
+        requests = burst(companies, pipeline)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+            submitted = list(pool.map(lambda body: _request(f"{service.url}/analyses", body), requests))
+        job_ids = list(dict.fromkeys(response["job_id"] for response in submitted))
+
+        jobs = {}
+        deadline = time.monotonic() + timeout
+        while len(jobs) < len(job_ids) and time.monotonic() < deadline:
+            for job_id in job_ids:
+                if job_id not in jobs:
+                    job = _request(f"{service.url}/analyses/{job_id}")
+                    if job["status"] in FINISHED_STATUSES:
+                        jobs[job_id] = job
+            time.sleep(poll_interval)
+        elapsed = time.perf_counter() - started
+    finally:
+        service.stop()
+
+    done = [job for job in jobs.values() if job["status"] == "done"]
+    latencies = sorted(job["finished_at"] - job["created_at"] for job in done) or [0.0]
+    per_worker = {}
+    for job in jobs.values():
+        per_worker[job["worker"]] = per_worker.get(job["worker"], 0) + 1
+    searches = sum((job["result"].get("search_stats") or {}).get("searches", 0) for job in done)
+
+    return {
+        "workers": workers,
+        "threads": threads,
+        "requests": len(requests),
+        "jobs": len(job_ids),
+        "done": len(done),
+        "failed": len(job_ids) - len(done),
+        "elapsed": elapsed,
+        "throughput_per_minute": len(done) / elapsed * 60,
+        "latency_mean": statistics.mean(latencies),
+        "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "jobs_per_worker": sorted(per_worker.values(), reverse=True),
+        "searches": searches,
+        "backend_searches": sum(job["result"].get("backend_searches", 0) for job in done)
+    }
+
+
+def print_scenario(result: dict, baseline: dict):
+    speedup = result["throughput_per_minute"] / baseline["throughput_per_minute"] \
+        if baseline["throughput_per_minute"] else 0.0
+    print(f"\n{result['workers']} workers x {result['threads']} threads: {result['requests']} requests -> "
+          f"{result['jobs']} jobs, {result['done']} done, {result['failed']} failed")
+    print(f"  elapsed {result['elapsed']:.1f}s, throughput {result['throughput_per_minute']:.1f} jobs/min "
+          f"({speedup:.2f}x)")
+    print(f"  job latency: mean {result['latency_mean']:.2f}s, p95 {result['latency_p95']:.2f}s")
+    print(f"  jobs per worker: {', '.join(str(count) for count in result['jobs_per_worker'])}")
+    print(f"  searches: {result['searches']} requested by runs, {result['backend_searches']} reached the backend")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the multi-process service against local fake backends")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker process counts")
+    parser.add_argument("--threads", type=int, default=2, help="Concurrent analyses per worker")
+    parser.add_argument("--companies", type=int, default=4,
+                        help="Companies per burst; each is requested three times")
+    parser.add_argument("--pipeline", default="multi_agent", help="Built-in pipeline to request")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per fake LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Seconds per fake search")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.json) if args.json else None
+    scenarios = []
+    for workers in (int(count) for count in args.workers.split(",")):
+        scenarios.append(load_scenario(workers, args.threads, args.companies, args.pipeline, args.llm_latency,
+                                       args.search_latency))
+        print_scenario(scenarios[-1], scenarios[0])
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(scenarios, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
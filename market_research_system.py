@@ -1,129 +1,520 @@
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search.tool import TavilySearchResults
+from crewai import Agent, Task
+from search_cache import get_search_cache
+from scheduler import arun_task_graph, task_label, check_cancelled
+from events import emit, listening
+from clients import get_search_tool
+from report_cache import ReportCache, prompt_fingerprint, DEFAULT_REPORT_MAX_AGE
+from report_store import ReportStore
+from checkpoints import CheckpointStore
+from usage import UsageTracker, tracking
+from search_broker import SearchBroker, BrokeredSearchTool, SharedEvidenceTool
+from tracing import Tracer, tracing, span, mark_iteration, DEFAULT_TRACE_PATH
+from compaction import ContextCompactor, DEFAULT_CONTEXT_TOKEN_LIMIT
+from results import AnalysisResult
+from link_checker import LinkChecker, extract_urls, annotate_links
+from evidence_index import LocalEvidenceTool, get_evidence_index, indexed_search_tool, DEFAULT_EVIDENCE_INDEX_PATH
+from pipelines import load_pipeline, active_tasks, render_text, DEFAULT_PIPELINE, DEFAULT_EXPECTED_OUTPUT
+from routing import ModelRouter, VALIDATORS, check_validators, route_summary
+from renderer import ReportRenderer, slugify
+from crew_adapters import crew_tools, crew_llm
+from resilience import ResilienceMetrics, recording, DEFAULT_RETRY_POLICY
 import os
-import markdown
+import asyncio
 from datetime import datetime
 
 # Core class that manages the market research system using multiple agents
 class MarketResearchSystem:
-    def __init__(self, company: str, industry: str, openai_api_key: str, tavily_api_key: str):
-        # Initialize environment variables for API access
-        os.environ["OPENAI_API_KEY"] = openai_api_key
-        os.environ["TAVILY_API_KEY"] = tavily_api_key
-        
+    def __init__(self, company: str, industry: str, openai_api_key: str, tavily_api_key: str,
+                 use_search_cache: bool = True, llm_rate_limiter=None, search_rate_limiter=None,
+                 report_max_age: float = DEFAULT_REPORT_MAX_AGE, use_checkpoints: bool = True,
+                 max_run_tokens: int = None, max_run_cost: float = None, max_agent_tokens=None,
+                 llm=None, search_tool=None, trace_path: str = DEFAULT_TRACE_PATH,
+                 otlp_trace_path: str = None, use_search_broker: bool = True, search_concurrency: int = 4,
+                 retry_policy=DEFAULT_RETRY_POLICY, search_hedge_delay: float = None,
+                 compact_context: bool = True, context_token_limit: int = DEFAULT_CONTEXT_TOKEN_LIMIT,
+                 context_token_limits: dict = None, industry_research: dict = None, search_broker=None,
+                 verify_links: bool = True, drop_dead_links: bool = False, link_checker=None,
+                 use_evidence_index: bool = True, evidence_index_path: str = DEFAULT_EVIDENCE_INDEX_PATH,
+                 pipeline=DEFAULT_PIPELINE, use_model_routing: bool = True, llms: dict = None,
+                 local_evidence=None):
         self.company = company
         self.industry = industry
         
-        # Initialize GPT-4 as the base LLM for agents
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.7,
-            max_tokens=4000
+        # Agents, tasks, search settings and default execution strategy come from the
+        # pipeline: a built-in name ("multi_agent", "single_agent"), a dict or a YAML/JSON file
+        self.pipeline = load_pipeline(pipeline)
+        self.task_timings = []
+        self.timing_summary = {}
+        self.from_cache = False
+        
+        # Token/cost budgets enforced before every LLM call; usage is recorded per agent
+        self.budgets = {
+            "max_run_tokens": max_run_tokens,
+            "max_run_cost": max_run_cost,
+            "max_agent_tokens": max_agent_tokens
+        }
+        self.usage = {}
+        
+        # Spans for every run are appended to trace_path (JSONL) and optionally
+        # to otlp_trace_path in OpenTelemetry's OTLP/JSON format
+        self.trace_path = trace_path
+        self.otlp_trace_path = otlp_trace_path
+        self.trace_summary = {}
+        
+        # Route all agents' searches through one per-run broker that runs query
+        # batches concurrently, collapses duplicates and pools the evidence
+        self.use_search_broker = use_search_broker
+        self.search_concurrency = search_concurrency
+        self.broker = None
+        self.search_stats = {}
+        
+        # Every search result from every run is indexed on disk (BM25), brokered or not,
+        # and agents get a tool to look there first; evidence_stats has the run's
+        # local-hit ratio
+        self.evidence_index = get_evidence_index(evidence_index_path) if use_evidence_index else None
+        self.local_evidence = None
+        self.web_search = None
+        self.evidence_stats = {}
+        
+        # Comparative mode: industry-wide research ("landscape" and "datasets") done once
+        # for several companies replaces the per-company dataset stage, and a broker and
+        # local evidence tool shared across those companies replace the per-run ones
+        # (their stats are reported by the comparative analysis)
+        self.industry_research = industry_research
+        self.shared_broker = search_broker
+        self.shared_local_evidence = local_evidence
+        
+        # Transient OpenAI/Tavily failures are retried per retry_policy; slow searches
+        # are hedged with a duplicate request after search_hedge_delay seconds
+        self.retry_policy = retry_policy
+        search_retry_policy = retry_policy.with_hedging(search_hedge_delay) if search_hedge_delay else retry_policy
+        self.resilience = {}
+        
+        # Forward only the extracted use cases and links between tasks, capped at
+        # context_token_limit tokens per hop (overridable per "Upstream -> Downstream" hop)
+        self.compact_context = compact_context
+        self.context_token_limit = context_token_limit
+        self.context_token_limits = context_token_limits
+        self.compaction = {}
+        
+        # Typed use cases/resources/datasets parsed from the final table, saved as
+        # compact JSON (and CSV) next to the markdown report
+        self.result = None
+        self.result_file = None
+        self.rendered = None
+        
+        # Every URL in the final report is checked before rendering; dead links are
+        # flagged (or dropped with drop_dead_links) and verdicts cached with a TTL
+        self.verify_links = verify_links
+        self.drop_dead_links = drop_dead_links
+        self.link_checker = link_checker
+        self.link_check = {}
+        
+        # Reuse reports younger than report_max_age seconds for identical analyses
+        self.report_cache = ReportCache()
+        
+        # Every new report is indexed (metadata and full text) for history and search
+        self.report_store = ReportStore()
+        self.report_max_age = report_max_age
+        
+        # Per-task output checkpoints so a failed run resumes where it stopped; they
+        # expire with the cached reports so a rerun never restores older stages
+        self.checkpoints = CheckpointStore(max_age=report_max_age) if use_checkpoints else None
+        
+        # One shared LLM client per model route of the pipeline, reused by other analyses
+        # with the same key and config; the key stays on the client rather than in
+        # os.environ. An explicit llm (e.g. a local stand-in for benchmarks) replaces
+        # every route, llms single routes. Without routing only the default route is built
+        check_validators(self.pipeline)
+        models = self.pipeline["models"] if use_model_routing else {"default": self.pipeline["models"]["default"]}
+        self.router = ModelRouter(
+            models,
+            openai_api_key,
+            rate_limiter=llm_rate_limiter,
+            retry_policy=retry_policy,
+            llm=llm,
+            llms=llms
         )
+        self.llm_config = self.pipeline["models"]["default"]
+        self.llm = self.router.llm("default")
+        
+        # Agents run on their pipeline route (e.g. a small model for the table assembly)
+        # and fall back to a larger one when output validation fails; without routing
+        # every agent uses the default route. routing has per-route usage after a run
+        self.use_model_routing = use_model_routing
+        self.agent_routes = {}
+        self.fallback_routes = {}
+        self.fallback_agents = {}
+        self.task_fallbacks = {}
+        self.final_task = None
+        self.routing = {}
         
-        # Initialize Tavily search tool for web research
-        self.search_tool = TavilySearchResults(
-            tavily_api_key=tavily_api_key,
-            max_results=8,
-            search_depth="advanced"
+        # Tavily search tool for web research, shared by all agents, pooled across
+        # analyses and backed by the on-disk search cache unless bypassed
+        self.search_tool = search_tool if search_tool is not None else get_search_tool(
+            tavily_api_key,
+            max_results=self.pipeline["search"].get("max_results", 8),
+            search_depth=self.pipeline["search"].get("search_depth", "advanced"),
+            use_cache=use_search_cache,
+            rate_limiter=search_rate_limiter,
+            retry_policy=search_retry_policy
         )
 
-    # Create four specialized agents for different aspects of research
-    def create_agents(self):
-        # Agent 1: Research Analyst - Identifies AI use cases
-        research_analyst = Agent(
-            role='Research Analyst',
-            goal=f'Identify optimal AI use cases for {self.company}',
-            backstory=f"""Senior industry analyst specializing in {self.industry}...""",
-            tools=[self.search_tool],
-            llm=self.llm,
-            verbose=True
-        )
+    # Search tools handed to every agent: the brokered search plus the shared
+    # evidence pool during a run, or the plain search tool without a broker, and
+    # the local evidence index when enabled
+    def agent_tools(self):
+        local = [self.local_evidence] if self.local_evidence is not None else []
+        if self.broker is None:
+            return local + [self.web_search]
+        return local + [BrokeredSearchTool(broker=self.broker, scope=self.company), SharedEvidenceTool(broker=self.broker)]
 
-        # Agent 2: Technical Architect - Finds implementation resources
-        tech_architect = Agent(
-            role='Technical Architect',
-            goal=f'Find official {self.company} implementation resources',
-            backstory=f"""Senior technical architect...""",
-            tools=[self.search_tool],
-            llm=self.llm,
-            verbose=True
-        )
+    # Called by CrewAI after every agent iteration; a stage that timed out or was
+    # cancelled stops here
+    def on_agent_step(self, step):
+        mark_iteration(output_chars=len(str(step)))
+        check_cancelled()
 
-        # Agent 3: Data Specialist - Finds relevant datasets and code
-        data_specialist = Agent(
-            role='Data & Training Specialist',
-            goal=f'Find relevant datasets and code for {self.company} use cases',
-            backstory="""Data scientist specializing...""",
-            tools=[self.search_tool],
-            llm=self.llm,
-            verbose=True
-        )
+    # Models behind every agent: the routes and whether routing is on
+    def model_config(self):
+        if not self.use_model_routing:
+            return self.llm_config
+        return {"routes": self.pipeline["models"], "routing": True}
+
+    # Run options outside the prompts that change the finished report
+    def report_options(self):
+        return {
+            "verify_links": self.verify_links,
+            "drop_dead_links": self.drop_dead_links,
+            "search": self.search_tool._cache_params()
+        }
 
-        # Agent 4: Integration Specialist - Creates final documentation
-        integration_specialist = Agent(
-            role='Integration Specialist',
-            goal='Create comprehensive implementation table with all use cases',
-            backstory="""Technical documentation expert...""",
-            tools=[self.search_tool],
-            llm=self.llm,
-            verbose=True
+    # Configuration outside the agent and task definitions that changes task outputs
+    def checkpoint_salt(self):
+        return {
+            "company": self.company,
+            "industry": self.industry,
+            "pipeline": self.pipeline["name"],
+            "llm": self.model_config(),
+            "search": self.search_tool._cache_params()
+        }
+
+    # Parse the report's use case table; a report without a valid table still counts
+    # as a finished run, it just has no structured result
+    def parse_result(self, report: str):
+        try:
+            self.result = AnalysisResult.from_report(self.company, self.industry, report)
+        except ValueError as e:
+            print(f"Could not parse structured results: {str(e)}")
+
+    # Check every URL in the report, record the verdicts on the parsed result and
+    # return the report with dead links flagged or dropped
+    async def check_links(self, report: str) -> str:
+        if self.link_checker is None:
+            self.link_checker = LinkChecker()
+        verdicts = await self.link_checker.averify(extract_urls(report))
+        dead = [url for url, verdict in verdicts.items() if verdict["status"] == "dead"]
+        self.link_check = dict(self.link_checker.stats, dead_links=dead, dropped=self.drop_dead_links)
+        emit("links_verified", **self.link_checker.stats)
+        print(f"Verified {len(verdicts)} links in {self.link_check['seconds']:.1f}s: "
+              f"{self.link_check['ok']} ok, {len(dead)} dead, {self.link_check['unverified']} unverified")
+        
+        if self.result is not None:
+            self.result = self.result.with_link_status(verdicts, drop_dead=self.drop_dead_links)
+        return annotate_links(report, verdicts, drop_dead=self.drop_dead_links)
+    
+    # Model behind the final task's output: its agent's route, or that agent's fallback
+    # route when the output failed validation
+    def final_model(self) -> str:
+        route = self.agent_routes.get(self.final_task, "default")
+        fell_back = any(timing["task"] == self.final_task and timing.get("fallback") for timing in self.task_timings)
+        if fell_back and self.final_task in self.fallback_routes:
+            route = self.fallback_routes[self.final_task]
+        return self.router.model_name(route)
+
+    def index_report(self, result, usage: dict):
+        report, md_file, html_file = result
+        self.report_store.add(
+            company=self.company,
+            industry=self.industry,
+            report=report,
+            md_file=md_file,
+            html_file=html_file,
+            result_file=self.result_file,
+            model=self.final_model(),
+            usage=usage,
+            use_cases=len(self.result.use_cases) if self.result else None
         )
 
-        return [research_analyst, tech_architect, data_specialist, integration_specialist]
+    # Hit/miss counters of the search cache shared across runs and sessions
+    def search_cache_stats(self):
+        return get_search_cache(self.search_tool.cache_path).stats()
+
+    # One agent per entry in the pipeline's agents, in order, on its model route;
+    # agents with a fallback route get a twin on that route for failed validations
+    def create_agents(self):
+        def agent(spec, route):
+            return Agent(
+                role=spec["role"],
+                goal=render_text(spec["goal"], self.company, self.industry),
+                backstory=render_text(spec["backstory"], self.company, self.industry),
+                tools=crew_tools(self.agent_tools()),
+                llm=crew_llm(self.router.llm(route)),
+                verbose=True,
+                step_callback=self.on_agent_step
+            )
+
+        agents = []
+        self.agent_routes, self.fallback_routes, self.fallback_agents = {}, {}, {}
+        for spec in self.pipeline["agents"]:
+            route = spec.get("route", "default") if self.use_model_routing else "default"
+            agents.append(agent(spec, route))
+            self.agent_routes[spec["role"]] = route
+            fallback_route = spec.get("fallback_route")
+            if self.use_model_routing and fallback_route and fallback_route != route:
+                self.fallback_agents[spec["name"]] = agent(spec, fallback_route)
+                self.fallback_routes[spec["role"]] = fallback_route
+        return agents
+
+    # Shared industry research appended to a task description in comparative mode
+    def shared_research(self, key: str) -> str:
+        if not self.industry_research or not self.industry_research.get(key):
+            return ""
+        return f"\n\nShared {self.industry} industry research ({key}):\n{self.industry_research[key]}"
 
-    # Create sequential tasks for each agent
+    # One task per entry in the pipeline's tasks; context declares which upstream
+    # outputs a task needs. Tasks covered by shared industry research are left out
     def create_tasks(self, agents):
-        research_analyst, tech_architect, data_specialist, integration_specialist = agents
+        agents = {spec["name"]: agent for spec, agent in zip(self.pipeline["agents"], agents)}
+        specs = active_tasks(self.pipeline, self.industry_research or {})
 
-        # Task 1: Identify use cases (Research Analyst)
-        identify_use_cases = Task(
-            description="""Identify EXACTLY 4 high-impact AI use cases...""",
-            agent=research_analyst
-        )
+        tasks = {}
+        self.task_fallbacks = {}
+        for spec in specs:
+            description = render_text(spec["description"], self.company, self.industry)
+            description += "".join(self.shared_research(key) for key in spec.get("shared_research", []))
+            options = {"expected_output": render_text(spec.get("expected_output") or DEFAULT_EXPECTED_OUTPUT,
+                                                      self.company, self.industry)}
+            
+            # Validated tasks of a routed agent are redone on its fallback route
+            if spec.get("validate") and spec["agent"] in self.fallback_agents:
+                fallback = Task(description=description, agent=self.fallback_agents[spec["agent"]], **options)
+                self.task_fallbacks[len(tasks)] = (VALIDATORS[spec["validate"]], fallback)
+            
+            context = [tasks[name] for name in spec.get("context", []) if name in tasks]
+            if context:
+                options["context"] = context
+            tasks[spec["name"]] = Task(description=description, agent=agents[spec["agent"]], **options)
 
-        # Task 2: Find implementation resources (Technical Architect)
-        define_implementation = Task(
-            description="""Find OFFICIAL company RESOURCES...""",
-            agent=tech_architect
-        )
+        self.final_task = task_label(tasks[specs[-1]["name"]])
+        return list(tasks.values())
 
-        # Task 3: Find datasets and code (Data Specialist)
-        find_datasets = Task(
-            description="""Find REAL DATASETS AND CODE...""",
-            agent=data_specialist
-        )
+    # Render the report to .md and .html plus JSON/CSV of the parsed table in one
+    # pass; the bytes of every output stay in memory in self.rendered
+    def generate_reports(self, results):
+        header = f"""# AI Implementation Analysis for {self.company}
+Generated on: {datetime.now().strftime("%Y-%m-%d")}
 
-        # Task 4: Create final output table (Integration Specialist)
-        create_final_output = Task(
-            description="""Create ONE TABLE combining ALL FINDINGS...""",
-            agent=integration_specialist
+## Overview
+This analysis provides implementation resources for {self.company}'s AI initiatives across different use cases, along with relevant datasets and implementation resources."""
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        renderer = ReportRenderer(
+            f"reports/{slugify(self.company)}_{timestamp}",
+            title=f"AI Implementation Analysis for {self.company}"
         )
-
-        return [identify_use_cases, define_implementation, find_datasets, create_final_output]
+        renderer.add_section(header)
+        renderer.add_section(str(results), result=self.result)
+        self.rendered = renderer.finish()
+        self.result_file = self.rendered.files.get("json")
+        
+        return self.rendered.markdown, self.rendered.files["md"], self.rendered.files["html"]
 
     # Main execution method
-    def run(self):
+    # execution_strategy: "sequential" runs the tasks in order, "dag" runs
+    # independent tasks (implementation resources and datasets) in parallel;
+    # both go through the task graph scheduler; None uses the pipeline's
+    # execution_strategy
+    # callback: optional callable receiving progress event dicts (run/task
+    # started and finished, tool calls and streamed LLM tokens)
+    # force_refresh: ignore a cached report for the same analysis
+    # stage_timeout / stage_timeouts: seconds allowed per task, overridable per
+    # task label. A timed-out task stops at its agent's next step, after the LLM
+    # or tool call in progress
+    # run() starts its own event loop, so it cannot be called from a running one
+    # (Jupyter, async web handlers); await arun() there instead
+    def run(self, execution_strategy: str = None, max_workers: int = 4, callback=None,
+            force_refresh: bool = False, stage_timeout: float = None, stage_timeouts: dict = None):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("MarketResearchSystem.run() cannot be called from a running event loop; "
+                               "await MarketResearchSystem.arun() instead")
+        return asyncio.run(self.arun(
+            execution_strategy=execution_strategy,
+            max_workers=max_workers,
+            callback=callback,
+            force_refresh=force_refresh,
+            stage_timeout=stage_timeout,
+            stage_timeouts=stage_timeouts
+        ))
+
+    # Async entry point for embedding in an event loop; many analyses can run
+    # concurrently on one loop, and cancelling the awaiting task cancels the run
+    async def arun(self, execution_strategy: str = None, max_workers: int = 4, callback=None,
+                   force_refresh: bool = False, stage_timeout: float = None, stage_timeouts: dict = None):
+        execution_strategy = execution_strategy or self.pipeline["execution_strategy"]
+        tracker = UsageTracker(**self.budgets)
+        tracer = Tracer(path=self.trace_path, otlp_path=self.otlp_trace_path)
+        metrics = ResilienceMetrics()
+        try:
+            with listening(callback), tracking(tracker), tracing(tracer), recording(metrics):
+                with span("run", "run", company=self.company, industry=self.industry,
+                          strategy=execution_strategy) as attributes:
+                    try:
+                        result = await self._arun(
+                            execution_strategy, max_workers, force_refresh, stage_timeout, stage_timeouts
+                        )
+                    except asyncio.CancelledError:
+                        emit("run_cancelled")
+                        raise
+                    attributes["succeeded"] = bool(result and result[0])
+                    attributes["from_cache"] = self.from_cache
+                    if attributes["succeeded"] and not self.from_cache:
+                        self.index_report(result, tracker.summary())
+                return result
+        finally:
+            if self.broker is not None and self.broker is not self.shared_broker:
+                self.search_stats = self.broker.summary()
+                self.broker.close()
+                print(f"Searches: {self.search_stats['searches']} issued for {self.search_stats['queries']} "
+                      f"queries, {self.search_stats['unique_urls']} unique URLs")
+            if self.local_evidence is not None and self.local_evidence is not self.shared_local_evidence:
+                # Brokered runs count the queries sent to the broker, others the direct searches
+                web_searches = self.search_stats["queries"] if self.broker is not None \
+                    else self.web_search.stats["searches"]
+                self.evidence_stats = self.local_evidence.summary(web_searches=web_searches)
+                if self.evidence_stats["lookups"]:
+                    print(f"Local evidence: {self.evidence_stats['hits']} of {self.evidence_stats['lookups']} "
+                          f"lookups answered locally")
+            self.broker = None
+            self.local_evidence = None
+            tracer.export()
+            self.trace_summary = tracer.summary()
+            self.resilience = metrics.summary()
+            retries = sum(stats["retries"] for stats in self.resilience["providers"].values())
+            if retries:
+                print(f"Retried {retries} transient API failures")
+            self.usage = tracker.summary()
+            totals = self.usage["totals"]
+            if totals["calls"]:
+                print(f"LLM usage: {totals['total_tokens']} tokens in {totals['calls']} calls, "
+                      f"${totals['cost']:.2f}")
+            self.routing = route_summary(self.router, self.usage, self.agent_routes, self.fallback_routes,
+                                         self.task_timings)
+            for route, stats in self.routing.items():
+                if stats["calls"]:
+                    print(f"Route {route} ({stats['model']}): {stats['calls']} calls, "
+                          f"{stats['mean_call_latency']:.1f}s per call, ${stats['cost']:.2f}"
+                          + (f", {stats['fallbacks']} fallbacks" if stats["fallbacks"] else ""))
+
+    async def _arun(self, execution_strategy: str, max_workers: int, force_refresh: bool,
+                    stage_timeout: float, stage_timeouts: dict):
         try:
+            emit("run_started", company=self.company, industry=self.industry, strategy=execution_strategy,
+                 pipeline=self.pipeline["name"])
+            
+            self.web_search = self.search_tool
+            if self.evidence_index is not None:
+                self.web_search = indexed_search_tool(self.search_tool, self.evidence_index)
+                self.local_evidence = self.shared_local_evidence or LocalEvidenceTool(index=self.evidence_index)
+            if self.shared_broker is not None:
+                self.broker = self.shared_broker
+            elif self.use_search_broker:
+                self.broker = SearchBroker(self.web_search, max_workers=self.search_concurrency)
+            
             # Create agents and tasks
             agents = self.create_agents()
             tasks = self.create_tasks(agents)
             
-            # Initialize crew with sequential process
-            crew = Crew(
-                agents=agents,
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True
+            # Return an identical, recent analysis without running the crew
+            cache_key = self.report_cache.make_key(
+                self.company, self.industry, self.model_config(), prompt_fingerprint(agents, tasks),
+                self.report_options()
             )
+            if not force_refresh:
+                cached = self.report_cache.get(cache_key, max_age=self.report_max_age)
+                if cached:
+                    self.from_cache = True
+                    self.parse_result(cached[0])
+                    result_file = os.path.splitext(cached[1])[0] + ".json"
+                    self.result_file = result_file if os.path.exists(result_file) else None
+                    emit("report_cached", md_file=cached[1], html_file=cached[2])
+                    emit("run_finished")
+                    return cached
+            
+            if execution_strategy not in ("sequential", "dag"):
+                raise ValueError(f"Unknown execution strategy: {execution_strategy}")
             
-            # Execute tasks and generate reports
-            results = crew.kickoff()
+            # Both strategies run on the task graph scheduler: tasks are scheduled by
+            # their declared dependencies (sequential runs use a single worker), run
+            # natively async, stop between agent steps on a timeout or cancellation,
+            # are restored from checkpoints when unchanged and validated when routed
+            compactor = None
+            if self.compact_context:
+                compactor = ContextCompactor(self.context_token_limit, self.context_token_limits)
+            graph = await arun_task_graph(
+                tasks,
+                max_workers=max_workers if execution_strategy == "dag" else 1,
+                checkpoints=self.checkpoints,
+                checkpoint_salt=self.checkpoint_salt(),
+                refresh=force_refresh,
+                stage_timeout=stage_timeout,
+                stage_timeouts=stage_timeouts,
+                compactor=compactor,
+                fallbacks=self.task_fallbacks
+            )
+            results = graph["outputs"][-1]
+            self.task_timings = graph["timings"]
+            self.timing_summary = graph["summary"]
+            
+            for timing in self.task_timings:
+                status = "restored from checkpoint" if timing["restored"] else f"started at +{timing['started']:.1f}s"
+                print(f"{timing['task']}: {timing['duration']:.1f}s ({status})")
+            print(f"Wall time {self.timing_summary['wall_time']:.1f}s vs "
+                  f"{self.timing_summary['sequential_time']:.1f}s sequential")
+            
+            if compactor is not None:
+                self.compaction = compactor.summary()
+                for hop in self.compaction["hops"]:
+                    print(f"Context {hop['hop']}: {hop['tokens_before']} -> {hop['tokens_after']} tokens")
+            if not results or not str(results).strip():
+                raise Exception("No results generated")
+            
+            emit("run_finished")
             
             # Generate formatted reports in MD and HTML
-            # [Report generation code...]
+            report = str(results)
+            self.parse_result(report)
+            
+            # Post-processing: flag or drop dead resource and dataset links
+            if self.verify_links:
+                with span("verify_links", "links") as attributes:
+                    report = await self.check_links(report)
+                    attributes["links"] = self.link_check["links"]
+                    attributes["dead_links"] = len(self.link_check["dead_links"])
+            
+            with span("generate_reports", "render") as attributes:
+                report, md_file, html_file = await asyncio.to_thread(self.generate_reports, report)
+                attributes["report_chars"] = len(report)
+                attributes["use_cases"] = len(self.result.use_cases) if self.result else 0
+            self.report_cache.set(cache_key, self.company, self.industry, md_file, html_file)
+            
+            return report, md_file, html_file
             
         except Exception as e:
+            emit("run_failed", error=str(e))
             print(f"Error during analysis: {str(e)}")
             return None, None, None
\ No newline at end of file
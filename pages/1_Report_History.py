@@ -0,0 +1,84 @@
+# Streamlit page for browsing and searching every indexed report
+import streamlit as st
+from report_store import ReportStore
+from datetime import datetime
+import os
+
+PAGE_SIZE = 25
+
+# One store per server process, shared by every session
+@st.cache_resource
+def get_report_store():
+    return ReportStore()
+
+def show_report(store, report_id: int):
+    report = store.get(report_id)
+    if report is None:
+        st.warning("This report is no longer in the index")
+        return
+    st.markdown(report["report"])
+    col1, col2 = st.columns(2)
+    for column, key, label, mime in ((col1, "md_file", "📄 Markdown", "text/markdown"),
+                                     (col2, "html_file", "🌐 HTML", "text/html")):
+        path = report.get(key)
+        if path and os.path.exists(path):
+            with column, open(path, "rb") as f:
+                st.download_button(label, f, file_name=os.path.basename(path), mime=mime,
+                                   key=f"{key}_{report_id}")
+
+def main():
+    st.set_page_config(page_title="Report History", layout="wide")
+    st.title("📚 Report History")
+
+    store = get_report_store()
+
+    # Reports written before the index existed
+    with st.sidebar:
+        if st.button("Index existing reports/ files"):
+            st.success(f"Indexed {store.import_directory('reports')} reports")
+
+    # Filters and full-text query
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        query = st.text_input("Search reports", placeholder="e.g. predictive maintenance, kaggle, forecast*")
+    with col2:
+        company = st.selectbox("Company", ["All"] + store.companies())
+    with col3:
+        industry = st.selectbox("Industry", ["All"] + store.industries())
+    company = None if company == "All" else company
+    industry = None if industry == "All" else industry
+
+    total = store.count(company, industry, query)
+    pages = max(1, -(-total // PAGE_SIZE))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+    offset = (page - 1) * PAGE_SIZE
+
+    if query.strip():
+        reports = store.search(query, company, industry, limit=PAGE_SIZE, offset=offset)
+        st.caption(f"{total} reports match '{query}', best matches first")
+    else:
+        reports = store.list(company, industry, limit=PAGE_SIZE, offset=offset)
+        st.caption(f"{total} reports, newest first")
+
+    if not reports:
+        st.info("No reports found. Reports are indexed as analyses finish.")
+
+    for report in reports:
+        created = datetime.fromtimestamp(report["created_at"]).strftime("%Y-%m-%d %H:%M")
+        title = f"{report['company']} · {report['industry'] or 'unknown industry'} · {created}"
+        with st.expander(title):
+            details = [f"Model: {report['model'] or 'unknown'}"]
+            if report["total_tokens"]:
+                details.append(f"{report['total_tokens']} tokens")
+            if report["cost"] is not None:
+                details.append(f"${report['cost']:.4f}")
+            if report["use_cases"]:
+                details.append(f"{report['use_cases']} use cases")
+            st.caption(" · ".join(details))
+            if report.get("snippet"):
+                st.markdown(f"…{report['snippet']}…")
+            if st.toggle("Show report", key=f"show_{report['id']}"):
+                show_report(store, report["id"])
+
+if __name__ == "__main__":
+    main()
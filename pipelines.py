@@ -0,0 +1,249 @@
+# Declarative pipeline definitions for MarketResearchSystem.
+# A pipeline names its agents and tasks, the search settings and the default execution
+# strategy, so the single-agent and multi-agent topologies run on the same engine and
+# are picked per request. Pipelines are plain dicts; load_pipeline also accepts the
+# name of a built-in pipeline or a path to a YAML or JSON file with the same keys:
+#
+#   name: two_agent
+#   execution_strategy: sequential
+#   search: {max_results: 5, search_depth: basic}
+#   agents:
+#     - {name: analyst, role: Research Analyst, goal: "Identify AI use cases for {company}",
+#        backstory: "Analyst covering {industry}"}
+#   tasks:
+#     - {name: use_cases, agent: analyst, description: "Identify 4 AI use cases for {company}"}
+#
+# Texts may use {company} and {industry}; a task's expected_output is optional. A task's context lists earlier tasks whose
+# outputs it needs; shared_research lists the keys of comparative mode's industry
+# research to append to its description, and a task with covered_by_shared_research
+# is skipped when that key is provided.
+#
+# models names the LLM routes; "default" is required and every agent uses it unless
+# it names another route. An agent with a fallback_route re-runs its tasks on that
+# route when a task's validate check (see routing.py) rejects the output.
+import copy
+import json
+import os
+import re
+
+EXECUTION_STRATEGIES = ("sequential", "dag")
+# CrewAI requires an expected output on every task; used when a task names none
+DEFAULT_EXPECTED_OUTPUT = "A complete, well-sourced answer to the task in markdown"
+
+DEFAULT_MODELS = {
+    "default": {"model": "gpt-4-turbo-preview", "temperature": 0.7, "max_tokens": 4000},
+    # Small, low-latency model for formatting and extraction stages
+    "fast": {"model": "gpt-4o-mini", "temperature": 0.2, "max_tokens": 4000}
+}
+
+MULTI_AGENT_PIPELINE = {
+    "name": "multi_agent",
+    "description": "Four specialist agents: use cases, implementation resources, datasets and the final table",
+    "execution_strategy": "sequential",
+    "search": {"max_results": 8, "search_depth": "advanced"},
+    "agents": [
+        {
+            "name": "research_analyst",
+            "role": "Research Analyst",
+            "goal": "Identify optimal AI use cases for {company}",
+            "backstory": """Senior industry analyst specializing in {industry}..."""
+        },
+        {
+            "name": "tech_architect",
+            "role": "Technical Architect",
+            "goal": "Find official {company} implementation resources",
+            "backstory": """Senior technical architect..."""
+        },
+        {
+            "name": "data_specialist",
+            "role": "Data & Training Specialist",
+            "goal": "Find relevant datasets and code for {company} use cases",
+            "backstory": """Data scientist specializing..."""
+        },
+        {
+            "name": "integration_specialist",
+            "role": "Integration Specialist",
+            "goal": "Create comprehensive implementation table with all use cases",
+            "backstory": """Technical documentation expert...""",
+            # Assembling the table from upstream findings is mechanical
+            "route": "fast",
+            "fallback_route": "default"
+        }
+    ],
+    "tasks": [
+        {
+            "name": "identify_use_cases",
+            "agent": "research_analyst",
+            "description": """Identify EXACTLY 4 high-impact AI use cases...""",
+            "expected_output": "Four high-impact AI use cases for {company}, each with its problem, benefit and sources",
+            "shared_research": ["landscape"]
+        },
+        {
+            "name": "define_implementation",
+            "agent": "tech_architect",
+            "description": """Find OFFICIAL company RESOURCES...""",
+            "expected_output": "Official implementation resources with URLs for each use case",
+            "context": ["identify_use_cases"]
+        },
+        {
+            "name": "find_datasets",
+            "agent": "data_specialist",
+            "description": """Find REAL DATASETS AND CODE...""",
+            "expected_output": "Real datasets and code repositories with URLs for each use case",
+            "context": ["identify_use_cases"],
+            # Datasets are researched once for the whole industry in comparative mode
+            "covered_by_shared_research": "datasets"
+        },
+        {
+            "name": "create_final_output",
+            "agent": "integration_specialist",
+            "description": """Create ONE TABLE combining ALL FINDINGS...""",
+            "expected_output": "One markdown table of the four use cases with their resources and datasets",
+            "context": ["identify_use_cases", "define_implementation", "find_datasets"],
+            "shared_research": ["datasets"],
+            "validate": "use_case_table"
+        }
+    ]
+}
+
+SINGLE_AGENT_PIPELINE = {
+    "name": "single_agent",
+    "description": "One resource specialist producing the final table in a single task",
+    "execution_strategy": "sequential",
+    "search": {"max_results": 5, "search_depth": "advanced"},
+    "agents": [
+        {
+            "name": "resource_specialist",
+            "role": "AI Implementation Resource Specialist",
+            "goal": "Find practical AI implementation resources for {company}",
+            "backstory": """Expert in identifying practical AI implementation resources and use cases.
+            Deep knowledge of {industry} industry and technical requirements.
+            Specializes in finding real-world examples, implementations, and relevant datasets."""
+        }
+    ],
+    "tasks": [
+        {
+            "name": "resources",
+            "agent": "resource_specialist",
+            "description": """Create a comprehensive AI implementation resource guide for {company}.
+
+YOUR TASK:
+Generate 4 practical AI use cases with implementation resources and datasets specifically tailored for {company}.
+
+FORMAT YOUR RESPONSE IN A MARKDOWN TABLE EXACTLY LIKE THIS:
+
+| Use Case | Description | Implementation Resources | Datasets & Code |
+|----------|-------------|-------------------------|-----------------|
+| [Use Case Name] | [2-3 sentences describing what problem this solves and its concrete benefits] | • [Resource Name](URL) - Brief description<br>• [Resource Name](URL) - Brief description | • [Dataset Name](Kaggle/GitHub URL) - Dataset description<br>• [Code Repository](GitHub URL) - Implementation details |
+
+REQUIRED USE CASES:
+1. One focused on {company}'s core business operations
+2. One focused on customer experience enhancement
+3. One focused on operational efficiency
+4. One focused on innovation/R&D
+
+EXAMPLE FORMAT:
+| Use Case | Description | Implementation Resources | Datasets & Code |
+|----------|-------------|-------------------------|-----------------|
+| Predictive Maintenance | Enables early detection of potential equipment failures through real-time sensor data analysis. This proactive approach reduces downtime, extends equipment life, and optimizes maintenance schedules. | • [NVIDIA AI-Powered Maintenance](https://developer.nvidia.com/blog/example) - Implementation guide<br>• [AWS Implementation](https://aws.com/example) - Cloud deployment guide | • [Industrial Maintenance Dataset](https://www.kaggle.com/datasets/example) - 10GB of sensor data<br>• [Maintenance ML Models](https://github.com/example/maintenance) - Python implementation |
+
+REQUIREMENTS:
+1. Make each use case highly specific to {company}'s industry and needs
+2. Focus on practical, implementable solutions
+3. Provide real, accessible resources (Kaggle/GitHub/HuggingFace)
+4. Include both implementation resources and datasets/code
+5. Keep descriptions natural and benefits concrete
+6. Ensure URLs are valid and resources are relevant
+
+GENERATE FOUR USE CASES NOW IN THE EXACT TABLE FORMAT SPECIFIED ABOVE.""",
+            "expected_output": "AI implementation resources table with four specific use cases, implementation guides, and datasets",
+            "shared_research": ["landscape", "datasets"]
+        }
+    ]
+}
+
+PIPELINES = {pipeline["name"]: pipeline for pipeline in (MULTI_AGENT_PIPELINE, SINGLE_AGENT_PIPELINE)}
+DEFAULT_PIPELINE = "multi_agent"
+
+
+# Fill {company} and {industry}; any other braces are left as written
+def render_text(text: str, company: str, industry: str) -> str:
+    values = {"company": company, "industry": industry}
+    return re.sub(r"\{(company|industry)\}", lambda match: values[match.group(1)], text)
+
+
+def _read_file(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML pipelines need the PyYAML package (pip install pyyaml); "
+                              "JSON pipeline files work without it")
+        return yaml.safe_load(f)
+
+
+# Check names and references; context may only point at earlier tasks, which is
+# also what the DAG scheduler expects
+def validate_pipeline(pipeline: dict) -> dict:
+    if not isinstance(pipeline, dict):
+        raise ValueError("A pipeline must be a mapping")
+    for key in ("name", "agents", "tasks"):
+        if not pipeline.get(key):
+            raise ValueError(f"Pipeline is missing '{key}'")
+    if pipeline.get("execution_strategy", "sequential") not in EXECUTION_STRATEGIES:
+        raise ValueError(f"Unknown execution strategy: {pipeline['execution_strategy']}")
+    models = pipeline.get("models", DEFAULT_MODELS)
+    if "default" not in models:
+        raise ValueError("Pipeline models need a 'default' route")
+
+    agents = set()
+    for agent in pipeline["agents"]:
+        for key in ("name", "role", "goal", "backstory"):
+            if not agent.get(key):
+                raise ValueError(f"Agent {agent.get('name', '?')} is missing '{key}'")
+        if agent["name"] in agents:
+            raise ValueError(f"Duplicate agent name: {agent['name']}")
+        for key in ("route", "fallback_route"):
+            if agent.get(key) and agent[key] not in models:
+                raise ValueError(f"Agent {agent['name']} uses unknown model route {agent[key]}")
+        agents.add(agent["name"])
+
+    tasks = set()
+    for task in pipeline["tasks"]:
+        for key in ("name", "agent", "description"):
+            if not task.get(key):
+                raise ValueError(f"Task {task.get('name', '?')} is missing '{key}'")
+        if task["name"] in tasks:
+            raise ValueError(f"Duplicate task name: {task['name']}")
+        if task["agent"] not in agents:
+            raise ValueError(f"Task {task['name']} uses unknown agent {task['agent']}")
+        for upstream in task.get("context", []):
+            if upstream not in tasks:
+                raise ValueError(f"Task {task['name']} needs {upstream}, which is not an earlier task")
+        tasks.add(task["name"])
+    if pipeline["tasks"][-1].get("covered_by_shared_research"):
+        raise ValueError("The last task produces the report and cannot be skipped")
+    return pipeline
+
+
+# A built-in pipeline name, a pipeline dict or a path to a .yaml/.yml/.json file
+def load_pipeline(spec=DEFAULT_PIPELINE) -> dict:
+    if isinstance(spec, dict):
+        pipeline = copy.deepcopy(spec)
+    elif spec in PIPELINES:
+        pipeline = copy.deepcopy(PIPELINES[spec])
+    elif isinstance(spec, str) and os.path.exists(spec):
+        pipeline = _read_file(spec)
+    else:
+        raise ValueError(f"Unknown pipeline: {spec} (built-in: {', '.join(PIPELINES)})")
+    pipeline.setdefault("execution_strategy", "sequential")
+    pipeline.setdefault("search", {})
+    pipeline.setdefault("models", copy.deepcopy(DEFAULT_MODELS))
+    return validate_pipeline(pipeline)
+
+
+# Tasks of the pipeline that run given the industry research keys already provided
+def active_tasks(pipeline: dict, shared_keys=()) -> list:
+    return [task for task in pipeline["tasks"] if task.get("covered_by_shared_research") not in shared_keys]
@@ -0,0 +1,139 @@
+# Report renderer.
+# The HTML page template is compiled once at import and the markdown converter
+# (with its table extensions) is built once per renderer, so each section is
+# converted on its own as it arrives and appended to the .md and .html files and to
+# in-memory buffers. Finishing writes the template tail plus JSON and CSV exports
+# of the parsed results in the same pass, and keeps every output's bytes in
+# memory for download buttons. Cost grows with each new section, never with
+# re-rendering the whole document.
+from string import Template
+import csv
+import html
+import io
+import json
+import markdown
+import os
+import re
+
+STYLESHEET = """
+body { font-family: Arial, sans-serif; line-height: 1.6; max-width: 1200px; margin: 0 auto; padding: 20px; }
+table { border-collapse: collapse; width: 100%; margin: 20px 0; }
+th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+th { background-color: #f5f5f5; }
+tr:nth-child(even) { background-color: #f9f9f9; }
+"""
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>$stylesheet</style>
+</head>
+<body>
+$$BODY
+</body>
+</html>
+""")
+# The page around its body, split before substitution so no title can add a split point
+PAGE_HEAD, PAGE_TAIL = (Template(part) for part in PAGE_TEMPLATE.template.split("$$BODY"))
+
+CSV_COLUMNS = ("company", "industry", "use_case", "kind", "title", "url", "note", "status")
+
+MIME_TYPES = {
+    "md": "text/markdown",
+    "html": "text/html",
+    "json": "application/json",
+    "csv": "text/csv"
+}
+
+
+# File-name-safe form of a company or industry name: no separators, dots or spaces
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_") or "report"
+
+
+# Head and tail of the page around the body, split once per title
+def page_parts(title: str) -> tuple:
+    values = {"title": html.escape(title), "stylesheet": STYLESHEET}
+    return PAGE_HEAD.substitute(values), PAGE_TAIL.substitute(values)
+
+
+class RenderedReport:
+    def __init__(self, outputs: dict, files: dict):
+        self.outputs = outputs
+        self.files = files
+
+    @property
+    def markdown(self) -> str:
+        return self.outputs["md"].decode("utf-8")
+
+    # (file name, bytes, MIME type) for a download button, straight from memory
+    def download(self, fmt: str) -> tuple:
+        return os.path.basename(self.files[fmt]), self.outputs[fmt], MIME_TYPES[fmt]
+
+
+class ReportRenderer:
+    # base_path is the output path without extension; formats selects the outputs
+    def __init__(self, base_path: str, title: str, formats: tuple = ("md", "html", "json", "csv")):
+        self.base_path = base_path
+        self.formats = formats
+        self.results = []
+        self._converter = markdown.Markdown(extensions=["tables", "nl2br"])
+        self._buffers = {fmt: io.StringIO() for fmt in ("md", "html") if fmt in formats}
+        self._files = {}
+
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for fmt in self._buffers:
+            self._files[fmt] = open(f"{base_path}.{fmt}", "w", encoding="utf-8")
+
+        self._head, self._tail = page_parts(title)
+        self._write("html", self._head)
+
+    def _write(self, fmt: str, text: str):
+        if fmt in self._buffers:
+            self._buffers[fmt].write(text)
+            self._files[fmt].write(text)
+
+    # Append one markdown section; result is the section's parsed AnalysisResult, if any
+    def add_section(self, text: str, result=None):
+        separator = "\n\n" if self._buffers.get("md") and self._buffers["md"].tell() else ""
+        self._write("md", separator + text)
+        if "html" in self._buffers:
+            self._converter.reset()
+            self._write("html", self._converter.convert(text) + "\n")
+        if result is not None:
+            self.results.append(result)
+
+    def _exports(self) -> dict:
+        outputs = {}
+        if "json" in self.formats and self.results:
+            payload = [result.model_dump(mode="json", exclude_none=True) for result in self.results]
+            outputs["json"] = json.dumps(payload[0] if len(payload) == 1 else payload,
+                                         separators=(",", ":")).encode("utf-8")
+        if "csv" in self.formats and self.results:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            for result in self.results:
+                writer.writerows(result.to_rows())
+            outputs["csv"] = buffer.getvalue().encode("utf-8")
+        return outputs
+
+    def finish(self) -> RenderedReport:
+        self._write("html", self._tail)
+        files = {}
+        for fmt, f in self._files.items():
+            f.close()
+            files[fmt] = f.name
+
+        outputs = {fmt: buffer.getvalue().encode("utf-8") for fmt, buffer in self._buffers.items()}
+        for fmt, data in self._exports().items():
+            path = f"{self.base_path}.{fmt}"
+            with open(path, "wb") as f:
+                f.write(data)
+            outputs[fmt] = data
+            files[fmt] = path
+        return RenderedReport(outputs, files)
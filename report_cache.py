@@ -0,0 +1,103 @@
+# Report-level cache: maps an analysis request to the report files already in reports/.
+# Keys cover everything that changes the output: normalized company and industry,
+# the LLM model and parameters, a hash of the agent and task prompt definitions, and
+# the run options that shape the report (link verification, search settings).
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_REPORT_CACHE_PATH = os.path.join(".cache", "report_cache.sqlite")
+DEFAULT_REPORT_MAX_AGE = 24 * 60 * 60
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+# Hash of every prompt-bearing field of the agents and tasks
+def prompt_fingerprint(agents: list, tasks: list) -> str:
+    definition = {
+        "agents": [
+            {"role": agent.role, "goal": agent.goal, "backstory": agent.backstory}
+            for agent in agents
+        ],
+        "tasks": [
+            {
+                "description": task.description,
+                "expected_output": getattr(task, "expected_output", None),
+                "agent": task.agent.role if task.agent else None
+            }
+            for task in tasks
+        ]
+    }
+    payload = json.dumps(definition, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, path: str = DEFAULT_REPORT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS report_cache (
+                    key TEXT PRIMARY KEY,
+                    company TEXT NOT NULL,
+                    industry TEXT NOT NULL,
+                    md_file TEXT NOT NULL,
+                    html_file TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def make_key(self, company: str, industry: str, llm_config: dict, prompt_hash: str,
+                 options: dict = None) -> str:
+        payload = json.dumps({
+            "company": _normalize(company),
+            "industry": _normalize(industry),
+            "llm": llm_config,
+            "prompts": prompt_hash,
+            "options": options or {}
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # (report, md_file, html_file) if a fresh report exists on disk, else None
+    def get(self, key: str, max_age: float = DEFAULT_REPORT_MAX_AGE):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT md_file, html_file, created_at FROM report_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        md_file, html_file, created_at = row
+        if max_age is not None and time.time() - created_at > max_age:
+            return None
+        if not (os.path.exists(md_file) and os.path.exists(html_file)):
+            return None
+
+        with open(md_file, encoding="utf-8") as f:
+            report = f.read()
+        return report, md_file, html_file
+
+    def set(self, key: str, company: str, industry: str, md_file: str, html_file: str):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO report_cache (key, company, industry, md_file, html_file, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, company, industry, md_file, html_file, time.time())
+            )
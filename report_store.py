@@ -0,0 +1,205 @@
+# Indexed store of every generated report.
+# Metadata (company, industry, model, time, tokens, cost, file paths) lives in a
+# SQLite table with indexes for "latest for a company" and "all for an industry",
+# and the full report text in an FTS5 index for ranked keyword search, so the
+# history page never has to scan or parse the reports/ directory.
+from datetime import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_REPORT_STORE_PATH = os.path.join(".cache", "reports.sqlite")
+
+COLUMNS = ("id", "company", "industry", "model", "created_at", "total_tokens", "cost", "use_cases",
+           "md_file", "html_file", "result_file")
+
+
+def _row(row) -> dict:
+    return dict(zip(COLUMNS, row))
+
+
+# Quote each word so user input is never parsed as FTS5 query syntax; words
+# ending in * stay prefix queries
+def fts_query(text: str) -> str:
+    terms = []
+    for word in re.findall(r"[\w*]+", text):
+        prefix = word.endswith("*")
+        word = word.strip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class ReportStore:
+    def __init__(self, path: str = DEFAULT_REPORT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY,
+                    company TEXT NOT NULL,
+                    industry TEXT NOT NULL,
+                    model TEXT,
+                    created_at REAL NOT NULL,
+                    total_tokens INTEGER,
+                    cost REAL,
+                    use_cases INTEGER,
+                    md_file TEXT NOT NULL UNIQUE,
+                    html_file TEXT,
+                    result_file TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_company ON reports (company COLLATE NOCASE, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_industry ON reports (industry COLLATE NOCASE, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports (created_at)")
+            # rowid matches reports.id
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+                    company, industry, body, tokenize = 'porter unicode61'
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add(self, company: str, industry: str, report: str, md_file: str, html_file: str = None,
+            result_file: str = None, model: str = None, usage: dict = None, use_cases: int = None,
+            created_at: float = None) -> int:
+        totals = (usage or {}).get("totals", {})
+        with self._lock, self._connect() as conn:
+            # Replacing an entry must not interleave with another process adding the same file
+            conn.execute("BEGIN IMMEDIATE")
+            existing = conn.execute("SELECT id FROM reports WHERE md_file = ?", (md_file,)).fetchone()
+            if existing:
+                conn.execute("DELETE FROM reports_fts WHERE rowid = ?", existing)
+                conn.execute("DELETE FROM reports WHERE id = ?", existing)
+            cursor = conn.execute(
+                "INSERT INTO reports (company, industry, model, created_at, total_tokens, cost, use_cases, "
+                "md_file, html_file, result_file) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (company, industry, model, created_at or time.time(), totals.get("total_tokens"),
+                 totals.get("cost"), use_cases, md_file, html_file, result_file)
+            )
+            report_id = cursor.lastrowid
+            conn.execute(
+                "INSERT INTO reports_fts (rowid, company, industry, body) VALUES (?, ?, ?, ?)",
+                (report_id, company, industry, report)
+            )
+            return report_id
+
+    def get(self, report_id: int):
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM reports WHERE id = ?", (report_id,)).fetchone()
+            if row is None:
+                return None
+            body = conn.execute("SELECT body FROM reports_fts WHERE rowid = ?", (report_id,)).fetchone()
+        return dict(_row(row), report=body[0] if body else "")
+
+    def latest(self, company: str):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM reports WHERE company = ? COLLATE NOCASE ORDER BY created_at DESC LIMIT 1",
+                (company,)
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def _filters(self, company: str, industry: str) -> tuple:
+        clauses, params = [], []
+        if company:
+            clauses.append("company = ? COLLATE NOCASE")
+            params.append(company)
+        if industry:
+            clauses.append("industry = ? COLLATE NOCASE")
+            params.append(industry)
+        return clauses, params
+
+    # Newest first, one page at a time
+    def list(self, company: str = None, industry: str = None, limit: int = 50, offset: int = 0) -> list:
+        clauses, params = self._filters(company, industry)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM reports {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [_row(row) for row in rows]
+
+    # Reports matching the filters, and the full-text query when one is given
+    def count(self, company: str = None, industry: str = None, query: str = None) -> int:
+        clauses, params = self._filters(company, industry)
+        match = fts_query(query or "")
+        with self._connect() as conn:
+            if not match:
+                where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+                return conn.execute(f"SELECT COUNT(*) FROM reports {where}", params).fetchone()[0]
+            where = "".join(f" AND r.{clause}" for clause in clauses)
+            return conn.execute(
+                f"SELECT COUNT(*) FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid "
+                f"WHERE reports_fts MATCH ?{where}",
+                [match] + params
+            ).fetchone()[0]
+
+    # Full-text search ranked by BM25, with a highlighted snippet per match
+    def search(self, query: str, company: str = None, industry: str = None, limit: int = 50,
+               offset: int = 0) -> list:
+        match = fts_query(query)
+        if not match:
+            return self.list(company, industry, limit, offset)
+
+        clauses, params = self._filters(company, industry)
+        clauses = [f"r.{clause}" for clause in clauses]
+        where = "".join(f" AND {clause}" for clause in clauses)
+        columns = ", ".join(f"r.{column}" for column in COLUMNS)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {columns}, snippet(reports_fts, 2, '**', '**', ' … ', 12) "
+                f"FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid "
+                f"WHERE reports_fts MATCH ?{where} ORDER BY bm25(reports_fts) LIMIT ? OFFSET ?",
+                [match] + params + [limit, offset]
+            ).fetchall()
+        return [dict(_row(row[:-1]), snippet=row[-1]) for row in rows]
+
+    def companies(self) -> list:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT company FROM reports ORDER BY company")]
+
+    def industries(self) -> list:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT industry FROM reports ORDER BY industry")]
+
+    # Index markdown reports written before the store existed; the company comes from
+    # the report title and the time from the file name, the industry is unknown
+    def import_directory(self, directory: str = "reports") -> int:
+        imported = 0
+        if not os.path.isdir(directory):
+            return imported
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".md"):
+                continue
+            md_file = os.path.join(directory, name)
+            with open(md_file, encoding="utf-8") as f:
+                report = f.read()
+            title = re.search(r"^# AI Implementation Analysis for (.+)$", report, re.MULTILINE)
+            stamp = re.search(r"_(\d{8}_\d{6})\.md$", name)
+            created_at = datetime.strptime(stamp.group(1), "%Y%m%d_%H%M%S").timestamp() if stamp \
+                else os.path.getmtime(md_file)
+            html_file = md_file[:-3] + ".html"
+            self.add(
+                company=title.group(1).strip() if title else name.rsplit("_", 2)[0],
+                industry="",
+                report=report,
+                md_file=md_file,
+                html_file=html_file if os.path.exists(html_file) else None,
+                created_at=created_at
+            )
+            imported += 1
+        return imported
@@ -0,0 +1,387 @@
+# Retries, deadlines, circuit breaking and hedging for OpenAI and Tavily calls.
+# Transient failures (429s, 5xx responses, timeouts, dropped connections) are
+# retried with jittered exponential backoff that honours Retry-After, within an
+# overall deadline. Each provider has a process-wide circuit breaker so a failing
+# API is not hammered by every worker, and searches can be hedged with a
+# duplicate request when the first one is slow.
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatResult
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from email.utils import parsedate_to_datetime
+from events import emit
+from typing import Any
+import asyncio
+import openai
+import random
+import re
+import requests
+import threading
+import time
+
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    requests.Timeout,
+    requests.ConnectionError,
+    openai.APITimeoutError,
+    openai.APIConnectionError
+)
+
+_metrics = ContextVar("market_research_resilience_metrics", default=None)
+_breakers = {}
+_breakers_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"Circuit for {provider} is open; retry in {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class RetryPolicy:
+    # deadline bounds all attempts of one call, call_timeout a single attempt;
+    # hedge_delay (searches only) sends a duplicate request after that many seconds
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 deadline: float = 120.0, call_timeout: float = 60.0, hedge_delay: float = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.call_timeout = call_timeout
+        self.hedge_delay = hedge_delay
+
+    def with_hedging(self, hedge_delay: float):
+        return RetryPolicy(self.max_attempts, self.base_delay, self.max_delay, self.deadline,
+                           self.call_timeout, hedge_delay)
+
+    # Value identity, so registry keys are stable across equal policies
+    def key(self) -> tuple:
+        return (self.max_attempts, self.base_delay, self.max_delay, self.deadline, self.call_timeout,
+                self.hedge_delay)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def status_code(error):
+    for source in (error, getattr(error, "response", None)):
+        code = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if isinstance(code, int):
+            return code
+    # Tavily's aiohttp path raises a bare Exception("Error 429: ...")
+    match = re.search(r"\bError (\d{3})\b", str(error))
+    return int(match.group(1)) if match else None
+
+
+# Seconds the server asked us to wait, from Retry-After(-Ms) headers
+def retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    return status_code(error) in TRANSIENT_STATUSES
+
+
+# Full-jitter exponential backoff, never shorter than the server's Retry-After
+def backoff_delay(policy: RetryPolicy, attempt: int, error: Exception) -> float:
+    delay = random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1)))
+    hinted = retry_after(error)
+    return max(delay, hinted) if hinted is not None else delay
+
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive transient failures; after reset_timeout
+    # one trial call is let through (half-open) and its outcome closes or reopens it
+    def __init__(self, provider: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            waited = time.monotonic() - self.opened_at
+            if self.state == "open" and waited >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return
+            raise CircuitOpenError(self.provider, max(0.0, self.reset_timeout - waited))
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    # A non-transient error or a cancelled call says nothing about provider health
+    def release(self):
+        with self._lock:
+            self._trial_running = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.opened}
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(provider)
+            _breakers[provider] = breaker
+        return breaker
+
+
+def breaker_states() -> dict:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {provider: breaker.snapshot() for provider, breaker in breakers.items()}
+
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+# Per-run counters: calls, attempts, retries, retry_wait, failures,
+# circuit_rejections, hedges and hedge_wins per provider
+class ResilienceMetrics:
+    def __init__(self):
+        self.providers = {}
+        self._lock = threading.Lock()
+
+    def increment(self, provider: str, counter: str, amount=1):
+        with self._lock:
+            stats = self.providers.setdefault(provider, {
+                "calls": 0, "attempts": 0, "retries": 0, "retry_wait": 0.0, "failures": 0,
+                "circuit_rejections": 0, "hedges": 0, "hedge_wins": 0
+            })
+            stats[counter] += amount
+
+    def summary(self) -> dict:
+        with self._lock:
+            providers = {provider: dict(stats) for provider, stats in self.providers.items()}
+        return {"providers": providers, "circuits": breaker_states()}
+
+
+# Count retries for calls made in this context into metrics
+@contextmanager
+def recording(metrics: ResilienceMetrics):
+    token = _metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _metrics.reset(token)
+
+
+def _count(provider: str, counter: str, amount=1):
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.increment(provider, counter, amount)
+
+
+class Resilience:
+    def __init__(self, provider: str, policy: RetryPolicy = None):
+        self.provider = provider
+        self.policy = policy or DEFAULT_RETRY_POLICY
+        self.breaker = get_breaker(provider)
+
+    def _before_attempt(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            _count(self.provider, "circuit_rejections")
+            raise
+        _count(self.provider, "attempts")
+
+    # Returns the delay before the next attempt, or None when the error is final
+    def _after_failure(self, error: Exception, attempt: int, deadline) -> float:
+        transient = is_transient(error)
+        if transient:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+        delay = backoff_delay(self.policy, attempt, error)
+        out_of_time = deadline is not None and time.monotonic() + delay > deadline
+        if not transient or attempt >= self.policy.max_attempts or out_of_time:
+            _count(self.provider, "failures")
+            return None
+
+        _count(self.provider, "retries")
+        _count(self.provider, "retry_wait", delay)
+        emit("retry", provider=self.provider, attempt=attempt, delay=delay, error=str(error))
+        return delay
+
+    def _deadline(self):
+        return time.monotonic() + self.policy.deadline if self.policy.deadline else None
+
+    def call(self, fn, hedge: bool = False):
+        _count(self.provider, "calls")
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._before_attempt()
+            try:
+                result = self._hedged(fn) if hedge and self.policy.hedge_delay else fn()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    # fn is a zero-argument coroutine function
+    async def acall(self, fn, hedge: bool = False):
+        _count(self.provider, "calls")
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._before_attempt()
+            try:
+                pending = self._ahedged(fn) if hedge and self.policy.hedge_delay else fn()
+                result = await asyncio.wait_for(pending, self.policy.call_timeout)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (stage timeout, lost hedge, shutdown): free the half-open
+                # trial, or the process-wide breaker would reject every later call
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    # Send a duplicate request if the first is still running after hedge_delay;
+    # the first success wins and the slower request is abandoned
+    def _hedged(self, fn):
+        primary = _hedge_pool.submit(copy_context().run, fn)
+        done, _ = wait([primary], timeout=self.policy.hedge_delay)
+        if done:
+            return primary.result()
+
+        _count(self.provider, "hedges")
+        backup = _hedge_pool.submit(copy_context().run, fn)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        _count(self.provider, "hedge_wins")
+                    return future.result()
+        return primary.result()
+
+    async def _ahedged(self, fn):
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({primary}, timeout=self.policy.hedge_delay)
+        if done:
+            return primary.result()
+
+        _count(self.provider, "hedges")
+        backup = asyncio.ensure_future(fn())
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            _count(self.provider, "hedge_wins")
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+# Chat model wrapper retrying the wrapped model's calls; the wrapped model keeps its
+# own callbacks, so token streaming, usage and tracing still see every attempt
+class ResilientChatModel(BaseChatModel):
+    llm: BaseChatModel
+    provider: str = "openai"
+    policy: Any = None
+    model_name: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return f"resilient-{self.llm._llm_type}"
+
+    def _result(self, message) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"model_name": self.model_name}
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        resilience = Resilience(self.provider, self.policy)
+        return self._result(resilience.call(lambda: self.llm.invoke(messages, stop=stop, **kwargs)))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        resilience = Resilience(self.provider, self.policy)
+        return self._result(await resilience.acall(lambda: self.llm.ainvoke(messages, stop=stop, **kwargs)))
+
+
+def with_retries(llm: BaseChatModel, provider: str = "openai", policy: RetryPolicy = None) -> BaseChatModel:
+    if isinstance(llm, ResilientChatModel):
+        return llm
+    model_name = getattr(llm, "model_name", None) or getattr(llm, "model", None) or llm._llm_type
+    return ResilientChatModel(llm=llm, provider=provider, policy=policy, model_name=str(model_name))
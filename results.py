@@ -0,0 +1,247 @@
+# Typed analysis results parsed from the final task's markdown table.
+# An AnalysisResult holds the use cases with their implementation resources and
+# datasets (each a titled source URL), validates them, and serializes to compact
+# JSON or MessagePack. A portfolio of results can be saved to and loaded from
+# JSONL, MessagePack or Parquet files and filtered by company or industry.
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Optional
+import json
+import os
+import re
+
+MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+BARE_URL = re.compile(r"https?://[^\s)<>\]|]+")
+
+
+class Link(BaseModel):
+    title: str
+    url: str
+    note: Optional[str] = None
+    # Verdict of the link check: "ok", "dead" or "unverified"; None when not checked
+    status: Optional[str] = None
+
+    @field_validator("url")
+    @classmethod
+    def check_url(cls, url: str) -> str:
+        if not re.match(r"^https?://[^\s/]+", url):
+            raise ValueError(f"Not an http(s) URL: {url}")
+        return url
+
+
+class UseCase(BaseModel):
+    name: str = Field(min_length=1)
+    description: str = ""
+    resources: list[Link] = []
+    datasets: list[Link] = []
+
+
+class AnalysisResult(BaseModel):
+    company: str
+    industry: str
+    generated_at: datetime = Field(default_factory=datetime.now)
+    use_cases: list[UseCase] = Field(min_length=1)
+
+    # Every distinct source URL cited in the analysis
+    @property
+    def sources(self) -> list:
+        urls = []
+        for use_case in self.use_cases:
+            for link in use_case.resources + use_case.datasets:
+                if link.url not in urls:
+                    urls.append(link.url)
+        return urls
+
+    @classmethod
+    def from_report(cls, company: str, industry: str, report: str, generated_at: datetime = None):
+        use_cases = parse_use_case_table(report)
+        if not use_cases:
+            raise ValueError("No use case table found in the report")
+        return cls(company=company, industry=industry, use_cases=use_cases,
+                   generated_at=generated_at or datetime.now())
+
+    # Copy with each link's verdict from the link checker; drop_dead leaves dead links out
+    def with_link_status(self, verdicts: dict, drop_dead: bool = False):
+        def checked(links):
+            links = [link.model_copy(update={"status": verdicts[link.url]["status"]}) if link.url in verdicts else link
+                     for link in links]
+            return [link for link in links if not (drop_dead and link.status == "dead")]
+
+        use_cases = [use_case.model_copy(update={"resources": checked(use_case.resources),
+                                                 "datasets": checked(use_case.datasets)})
+                     for use_case in self.use_cases]
+        return self.model_copy(update={"use_cases": use_cases})
+
+    def to_json(self) -> str:
+        return self.model_dump_json(exclude_none=True)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.model_validate_json(data)
+
+    def to_msgpack(self) -> bytes:
+        return _msgpack().packb(self.model_dump(mode="json", exclude_none=True))
+
+    @classmethod
+    def from_msgpack(cls, data: bytes):
+        return cls.model_validate(_msgpack().unpackb(data))
+
+    # One flat row per cited source, for tables and dataframes
+    def to_rows(self) -> list:
+        rows = []
+        for use_case in self.use_cases:
+            for kind, links in (("resource", use_case.resources), ("dataset", use_case.datasets)):
+                for link in links:
+                    rows.append({
+                        "company": self.company,
+                        "industry": self.industry,
+                        "use_case": use_case.name,
+                        "kind": kind,
+                        "title": link.title,
+                        "url": link.url,
+                        "note": link.note,
+                        "status": link.status
+                    })
+        return rows
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("MessagePack serialization needs the msgpack package: pip install msgpack")
+    return msgpack
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet serialization needs the pyarrow package: pip install pyarrow")
+    return pyarrow
+
+
+def _split_row(line: str) -> list:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+# Bullet items of a table cell ("• [Title](url) - note<br>• ...") as links
+def parse_links(cell: str) -> list:
+    links = []
+    for item in re.split(r"<br\s*/?>|\n|•", cell):
+        item = item.strip(" -*\t")
+        if not item:
+            continue
+        match = MARKDOWN_LINK.search(item)
+        if match:
+            title, url = match.group(1).strip(), match.group(2)
+            note = item[match.end():].strip(" -–—:") or None
+        else:
+            bare = BARE_URL.search(item)
+            if not bare:
+                continue
+            url = bare.group(0).rstrip(".,;")
+            title = item[:bare.start()].strip(" -–—:") or url
+            note = None
+        links.append(Link(title=title, url=url, note=note))
+    return links
+
+
+# Columns are matched by header name, falling back to the report's column order:
+# use case, description, implementation resources, datasets & code
+def _columns(header: list) -> dict:
+    columns = {"name": 0, "description": 1, "resources": 2, "datasets": 3}
+    for index, title in enumerate(cell.lower() for cell in header):
+        if "use case" in title:
+            columns["name"] = index
+        elif "description" in title:
+            columns["description"] = index
+        elif "dataset" in title or "code" in title:
+            columns["datasets"] = index
+        elif "resource" in title:
+            columns["resources"] = index
+    return columns
+
+
+# Use cases from the first markdown table with a "Use Case" column (or the first table)
+def parse_use_case_table(markdown_text: str) -> list:
+    tables = []
+    lines = markdown_text.splitlines()
+    for index in range(len(lines) - 1):
+        separator = _split_row(lines[index + 1])
+        if lines[index].strip().startswith("|") and all(re.fullmatch(r":?-{2,}:?", cell) for cell in separator):
+            rows = []
+            for line in lines[index + 2:]:
+                if not line.strip().startswith("|"):
+                    break
+                rows.append(_split_row(line))
+            tables.append((_split_row(lines[index]), rows))
+
+    if not tables:
+        return []
+    header, rows = next(((header, rows) for header, rows in tables
+                         if any("use case" in cell.lower() for cell in header)), tables[0])
+
+    columns = _columns(header)
+
+    def cell(row, column):
+        index = columns[column]
+        return row[index] if index < len(row) else ""
+
+    use_cases = []
+    for row in rows:
+        name = re.sub(r"[*_`]", "", cell(row, "name")).strip()
+        if not name:
+            continue
+        use_cases.append(UseCase(
+            name=name,
+            description=" ".join(re.sub(r"<br\s*/?>", " ", cell(row, "description")).split()),
+            resources=parse_links(cell(row, "resources")),
+            datasets=parse_links(cell(row, "datasets"))
+        ))
+    return use_cases
+
+
+# Write a portfolio of results; the format follows the extension (.jsonl, .msgpack, .parquet)
+def save_portfolio(results: list, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.endswith(".parquet"):
+        pyarrow = _pyarrow()
+        table = pyarrow.Table.from_pylist([result.model_dump() for result in results])
+        pyarrow.parquet.write_table(table, path, compression="zstd")
+    elif path.endswith(".msgpack"):
+        with open(path, "wb") as f:
+            f.write(_msgpack().packb([result.model_dump(mode="json", exclude_none=True) for result in results]))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(result.to_json() + "\n")
+
+
+# Load a saved portfolio, optionally only some companies or industries; Parquet
+# filters are pushed down so unmatched row groups are never decoded
+def load_portfolio(path: str, companies: list = None, industries: list = None) -> list:
+    if path.endswith(".parquet"):
+        pyarrow = _pyarrow()
+        filters = []
+        if companies:
+            filters.append(("company", "in", list(companies)))
+        if industries:
+            filters.append(("industry", "in", list(industries)))
+        records = pyarrow.parquet.read_table(path, filters=filters or None).to_pylist()
+    elif path.endswith(".msgpack"):
+        with open(path, "rb") as f:
+            records = _msgpack().unpackb(f.read())
+    else:
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    results = [AnalysisResult.model_validate(record) for record in records]
+    return [
+        result for result in results
+        if (not companies or result.company in companies) and (not industries or result.industry in industries)
+    ]
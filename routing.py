@@ -0,0 +1,100 @@
+# Per-agent model routing.
+# A pipeline declares named model routes ("default", "fast", ...) and assigns one to
+# each agent, so mechanical stages such as assembling the final table run on a small,
+# low-latency model. When a task has a validator and its agent a fallback_route, an
+# output that fails validation is produced again on the fallback model. Route stats
+# add up the LLM calls, tokens, cost and latency of every agent on each route.
+from clients import get_llm, instrument_llm
+from resilience import DEFAULT_RETRY_POLICY
+from results import parse_use_case_table
+from scheduler import FALLBACK_SUFFIX
+from typing import Optional
+
+MIN_USE_CASES = 4
+
+
+# None when the output holds a table of at least MIN_USE_CASES use cases that all
+# cite a source, otherwise what is wrong with it
+def validate_use_case_table(output: str) -> Optional[str]:
+    try:
+        use_cases = parse_use_case_table(output)
+    except ValueError as e:
+        return f"Invalid use case table: {str(e)}"
+    if len(use_cases) < MIN_USE_CASES:
+        return f"Expected {MIN_USE_CASES} use cases, found {len(use_cases)}"
+    unsourced = [use_case.name for use_case in use_cases if not use_case.resources and not use_case.datasets]
+    if unsourced:
+        return f"No resources or datasets for: {', '.join(unsourced)}"
+    return None
+
+
+VALIDATORS = {
+    "use_case_table": validate_use_case_table
+}
+
+
+def check_validators(pipeline: dict):
+    for task in pipeline["tasks"]:
+        if task.get("validate") and task["validate"] not in VALIDATORS:
+            raise ValueError(f"Task {task['name']} uses unknown validator {task['validate']} "
+                             f"(available: {', '.join(VALIDATORS)})")
+
+
+# One shared client per route. An explicit llm (e.g. a local stand-in) serves every
+# route unless llms overrides single routes; both get the same callbacks as get_llm's
+# clients, so usage, budgets, tracing and route stats cover them
+class ModelRouter:
+    def __init__(self, models: dict, openai_api_key: str, rate_limiter=None, retry_policy=DEFAULT_RETRY_POLICY,
+                 llm=None, llms: dict = None):
+        self.models = models
+        self._llms = {}
+        for route, config in models.items():
+            if llms and route in llms:
+                self._llms[route] = instrument_llm(llms[route], retry_policy)
+            elif llm is not None:
+                self._llms[route] = instrument_llm(llm, retry_policy)
+            else:
+                self._llms[route] = get_llm(openai_api_key, rate_limiter=rate_limiter, retry_policy=retry_policy,
+                                            **config)
+
+    def llm(self, route: str = "default"):
+        return self._llms[route]
+
+    def model_name(self, route: str) -> str:
+        return getattr(self._llms[route], "model_name", None) or self.models[route].get("model")
+
+
+# Usage per route from the run's per-agent usage; agent_routes and fallback_routes map
+# task labels to routes, and timings carry the validation failures of each task
+def route_summary(router: ModelRouter, usage: dict, agent_routes: dict, fallback_routes: dict,
+                  timings: list) -> dict:
+    routes = {}
+
+    def entry(route):
+        if route not in routes:
+            routes[route] = {"model": router.model_name(route), "agents": [], "calls": 0, "prompt_tokens": 0,
+                             "completion_tokens": 0, "total_tokens": 0, "cost": 0.0, "latency": 0.0,
+                             "validation_failures": 0, "fallbacks": 0}
+        return routes[route]
+
+    for label, route in agent_routes.items():
+        entry(route)["agents"].append(label)
+    for label, stats in (usage.get("agents") or {}).items():
+        if label.endswith(FALLBACK_SUFFIX):
+            route = fallback_routes.get(label[:-len(FALLBACK_SUFFIX)])
+        else:
+            route = agent_routes.get(label)
+        if route is None:
+            continue
+        totals = entry(route)
+        for name in ("calls", "prompt_tokens", "completion_tokens", "total_tokens", "cost", "latency"):
+            totals[name] += stats[name]
+
+    for timing in timings:
+        if timing.get("fallback") and timing["task"] in fallback_routes:
+            entry(agent_routes[timing["task"]])["validation_failures"] += 1
+            entry(fallback_routes[timing["task"]])["fallbacks"] += 1
+
+    for totals in routes.values():
+        totals["mean_call_latency"] = totals["latency"] / totals["calls"] if totals["calls"] else 0.0
+    return routes
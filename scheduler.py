@@ -0,0 +1,216 @@
+from events import emit, current_task
+from checkpoints import task_fingerprint, checkpoint_key
+from tracing import span
+import asyncio
+import contextvars
+import threading
+import time
+
+# Separator CrewAI itself uses when joining upstream outputs into a task's context
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+# Appended to a task's label while its fallback runs, so usage is charged separately
+FALLBACK_SUFFIX = " (fallback)"
+
+
+# Set once the stage a task runs for is cancelled or times out
+_stage_cancelled = contextvars.ContextVar("stage_cancelled", default=None)
+
+
+# A BaseException, like asyncio.CancelledError, so CrewAI does not retry the task
+class StageCancelled(BaseException):
+    pass
+
+
+# Called between agent steps (see MarketResearchSystem.on_agent_step). A task on a
+# worker thread cannot be interrupted, so a timed-out or cancelled stage stops at
+# its agent's next step instead of running on unobserved
+def check_cancelled():
+    cancelled = _stage_cancelled.get()
+    if cancelled is not None and cancelled.is_set():
+        raise StageCancelled("Stage cancelled")
+
+
+# Human-readable label for a task in timing breakdowns
+def task_label(task) -> str:
+    name = getattr(task, "name", None)
+    if name:
+        return name
+    return task.agent.role if task.agent else "task"
+
+
+# Upstream tasks declared through Task(context=[...]); CrewAI uses a sentinel when unset
+def task_dependencies(task, tasks) -> list:
+    context = getattr(task, "context", None)
+    if not isinstance(context, list):
+        return []
+    return [tasks.index(upstream) for upstream in context if upstream in tasks]
+
+
+# Run a single task with its upstream outputs as context, across CrewAI versions
+def execute_task(task, context: str = None) -> str:
+    if hasattr(task, "execute_sync"):
+        output = task.execute_sync(agent=task.agent, context=context)
+    else:
+        output = task.execute(agent=task.agent, context=context)
+    return str(getattr(output, "raw", output))
+
+
+# Async counterpart: native async execution where CrewAI offers it, otherwise
+# the blocking call runs on a worker thread (which copies the current context).
+# Cancelling it raises the stage's cancellation flag for check_cancelled()
+async def execute_task_async(task, context: str = None) -> str:
+    cancelled = threading.Event()
+    token = _stage_cancelled.set(cancelled)
+    try:
+        if hasattr(task, "aexecute_sync"):
+            output = await task.aexecute_sync(agent=task.agent, context=context)
+            return str(getattr(output, "raw", output))
+        return await asyncio.to_thread(execute_task, task, context)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+    finally:
+        _stage_cancelled.reset(token)
+
+
+# Longest chain of dependent task durations; the lower bound on DAG wall time
+def critical_path(timings: list) -> tuple:
+    finish = {}
+    previous = {}
+    for index, timing in enumerate(timings):
+        best = None
+        for dep in timing["depends_on"]:
+            if best is None or finish[dep] > finish[best]:
+                best = dep
+        finish[index] = timing["duration"] + (finish[best] if best is not None else 0.0)
+        previous[index] = best
+
+    if not finish:
+        return [], 0.0
+
+    node = max(finish, key=finish.get)
+    length = finish[node]
+    path = []
+    while node is not None:
+        path.append(timings[node]["task"])
+        node = previous[node]
+    return list(reversed(path)), length
+
+
+# Execute tasks as a dependency graph on the running event loop: every task
+# starts as soon as its upstream tasks finish, and at most max_workers run at once.
+# With a CheckpointStore, tasks whose prompt, agent config (plus checkpoint_salt)
+# and upstream outputs are unchanged are restored instead of re-executed;
+# refresh=True recomputes every task but still records new checkpoints. Checkpoints
+# outlive the run (until the store expires them), so after a prompt edit a rerun
+# recomputes only the edited task and its descendants, and a failed run resumes
+# from its completed tasks.
+# stage_timeouts maps task labels to seconds, stage_timeout applies to the rest. A
+# timed-out task keeps running until its agent's next step checks check_cancelled(),
+# so the LLM call or tool call in progress still completes (and is paid for).
+# A compactor (see compaction.py) shrinks each upstream output before it is
+# forwarded as context; checkpoints are keyed on the forwarded context.
+# fallbacks maps a task's index to (validate, fallback_task): when validate(output)
+# reports a problem, fallback_task runs on the same context and its output is used.
+async def arun_task_graph(tasks: list, max_workers: int = 4, checkpoints=None, checkpoint_salt: dict = None,
+                          refresh: bool = False, stage_timeout: float = None, stage_timeouts: dict = None,
+                          compactor=None, fallbacks: dict = None) -> dict:
+    dependencies = [task_dependencies(task, tasks) for task in tasks]
+    for index, deps in enumerate(dependencies):
+        if any(dep >= index for dep in deps):
+            raise ValueError(f"Task '{task_label(tasks[index])}' depends on a task declared after it")
+
+    stage_timeouts = stage_timeouts or {}
+    fallbacks = fallbacks or {}
+    semaphore = asyncio.Semaphore(max_workers)
+    run_started = time.perf_counter()
+
+    async def run_one(index):
+        upstream = [(await runs[dep])[0] for dep in dependencies[index]]
+        label = task_label(tasks[index])
+        if compactor is not None:
+            upstream = [
+                compactor.compact(output, task_label(tasks[dep]), label)
+                for dep, output in zip(dependencies[index], upstream)
+            ]
+        context = CONTEXT_SEPARATOR.join(upstream) or None
+        timeout = stage_timeouts.get(label, stage_timeout)
+
+        key = None
+        if checkpoints is not None:
+            key = checkpoint_key(task_fingerprint(tasks[index], checkpoint_salt), upstream)
+
+        async with semaphore:
+            with current_task(label), span(label, "task", context_chars=len(context or "")) as attributes:
+                emit("task_started")
+                started = time.perf_counter()
+                output = checkpoints.get(key) if key and not refresh else None
+                restored = output is not None
+                problem = None
+                if not restored:
+                    try:
+                        output = await asyncio.wait_for(execute_task_async(tasks[index], context), timeout)
+                        if index in fallbacks:
+                            validate, fallback_task = fallbacks[index]
+                            problem = validate(output)
+                            if problem:
+                                emit("task_fallback", reason=problem)
+                                with current_task(label + FALLBACK_SUFFIX):
+                                    output = await asyncio.wait_for(execute_task_async(fallback_task, context), timeout)
+                    except asyncio.TimeoutError:
+                        raise TimeoutError(f"Stage '{label}' timed out after {timeout}s")
+                    if key:
+                        checkpoints.set(key, label, output)
+                finished = time.perf_counter()
+                attributes.update(output_chars=len(output), restored=restored, fallback=problem)
+                emit("task_finished", output=output, duration=finished - started, restored=restored)
+        return output, started - run_started, finished - run_started, restored, problem
+
+    # Dependencies are declared earlier in the list, so their runs already exist
+    runs = []
+    for index in range(len(tasks)):
+        runs.append(asyncio.ensure_future(run_one(index)))
+
+    try:
+        results = await asyncio.gather(*runs)
+    except BaseException:
+        # A failed, timed-out or cancelled stage stops everything still running
+        for run in runs:
+            run.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+        raise
+
+    timings = [
+        {
+            "task": task_label(tasks[index]),
+            "depends_on": dependencies[index],
+            "started": started,
+            "finished": finished,
+            "duration": finished - started,
+            "restored": restored,
+            "fallback": problem
+        }
+        for index, (_, started, finished, restored, problem) in enumerate(results)
+    ]
+
+    wall_time = time.perf_counter() - run_started
+    path, path_length = critical_path(timings)
+    sequential_time = sum(timing["duration"] for timing in timings)
+
+    return {
+        "outputs": [output for output, _, _, _, _ in results],
+        "timings": timings,
+        "summary": {
+            "wall_time": wall_time,
+            "sequential_time": sequential_time,
+            "critical_path": path,
+            "critical_path_time": path_length,
+            "parallel_savings": sequential_time - wall_time,
+            "restored_tasks": [timing["task"] for timing in timings if timing["restored"]]
+        }
+    }
+
+
+# Blocking wrapper around arun_task_graph for callers without an event loop
+def run_task_graph(tasks: list, max_workers: int = 4, **kwargs) -> dict:
+    return asyncio.run(arun_task_graph(tasks, max_workers=max_workers, **kwargs))
@@ -0,0 +1,193 @@
+# Per-run search broker shared by all agents.
+# Queries run concurrently on a bounded pool, duplicate and near-duplicate
+# queries collapse onto one in-flight search (single-flight), and every result
+# is folded into a URL-de-duplicated evidence pool ranked across agents.
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+from contextvars import copy_context
+from events import get_current_task
+from typing import Any, Optional, Type
+import asyncio
+import re
+import threading
+
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "by", "for", "from", "how", "in", "is", "of", "on",
+    "or", "the", "to", "what", "which", "with"
+}
+
+
+# Order- and filler-insensitive signature: "AI use cases for Nvidia" == "nvidia AI use-cases"
+def query_signature(query: str) -> str:
+    tokens = re.findall(r"[a-z0-9]+", str(query).lower())
+    return " ".join(sorted(set(tokens) - STOPWORDS))
+
+
+# Split one tool input into a batch: one query per line or ';'
+def split_queries(text: str) -> list:
+    return [query.strip() for query in re.split(r"[\n;]+", str(text)) if query.strip()]
+
+
+class SearchBroker:
+    def __init__(self, search_tool, max_workers: int = 4):
+        self.search_tool = search_tool
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._evidence = {}
+        self._delivered = {}
+        self.stats = {"queries": 0, "collapsed": 0, "searches": 0, "failed": 0, "results": 0, "duplicate_urls": 0}
+
+    def _fetch(self, query: str) -> list:
+        try:
+            result = self.search_tool.invoke({"query": query})
+        except Exception as e:
+            result = e
+        # The Tavily tool reports failed searches as a string rather than raising
+        if not isinstance(result, list):
+            print(f"Error during search for '{query}': {str(result)}")
+            # Only successful results are shared; a later identical query searches again
+            with self._lock:
+                self.stats["failed"] += 1
+                self._flights.pop(query_signature(query), None)
+            return []
+        return result
+
+    # Single-flight: the first caller for a signature searches, the rest share its future
+    def _flight(self, query: str):
+        signature = query_signature(query)
+        with self._lock:
+            self.stats["queries"] += 1
+            future = self._flights.get(signature)
+            if future is not None:
+                self.stats["collapsed"] += 1
+                return future
+            self.stats["searches"] += 1
+            future = self._pool.submit(copy_context().run, self._fetch, query)
+            self._flights[signature] = future
+            return future
+
+    def _collect(self, query: str, results: list, agent: str):
+        with self._lock:
+            for result in results:
+                url = result.get("url")
+                if not url:
+                    continue
+                self.stats["results"] += 1
+                entry = self._evidence.get(url)
+                if entry is None:
+                    entry = dict(result, queries=[], agents=[])
+                    self._evidence[url] = entry
+                else:
+                    self.stats["duplicate_urls"] += 1
+                    entry["score"] = max(entry.get("score") or 0, result.get("score") or 0)
+                if query not in entry["queries"]:
+                    entry["queries"].append(query)
+                if agent and agent not in entry["agents"]:
+                    entry["agents"].append(agent)
+
+    # Run a batch of queries concurrently; returns URL-de-duplicated results ranked
+    # by score, skipping URLs this agent has already been given
+    def search_many(self, queries: list, agent: str = None) -> list:
+        agent = agent or get_current_task()
+        flights = [(query, self._flight(query)) for query in queries]
+
+        merged = {}
+        for query, future in flights:
+            results = future.result()
+            self._collect(query, results, agent)
+            for result in results:
+                url = result.get("url")
+                if url and (url not in merged or (result.get("score") or 0) > (merged[url].get("score") or 0)):
+                    merged[url] = result
+
+        with self._lock:
+            delivered = self._delivered.setdefault(agent, set())
+            fresh = [result for url, result in merged.items() if url not in delivered]
+            delivered.update(result["url"] for result in fresh)
+
+        return sorted(fresh, key=lambda result: result.get("score") or 0, reverse=True)
+
+    def search(self, query: str, agent: str = None) -> list:
+        return self.search_many([query], agent=agent)
+
+    # Evidence gathered by every agent so far, ranked by how many agents and
+    # queries found it and by its best relevance score
+    def evidence(self, limit: int = 15, topic: str = None) -> list:
+        with self._lock:
+            entries = [dict(entry) for entry in self._evidence.values()]
+
+        if topic:
+            words = set(query_signature(topic).split())
+            entries = [
+                entry for entry in entries
+                if words & set(query_signature(f"{entry.get('title', '')} {entry.get('content', '')}").split())
+            ]
+
+        entries.sort(
+            key=lambda entry: (len(entry["agents"]), len(entry["queries"]), entry.get("score") or 0),
+            reverse=True
+        )
+        return entries[:limit]
+
+    def summary(self) -> dict:
+        with self._lock:
+            return dict(self.stats, unique_urls=len(self._evidence))
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+class BrokeredSearchInput(BaseModel):
+    query: str = Field(description="Search query. Put several related queries on separate lines to run them in parallel")
+
+
+# Drop-in replacement for the Tavily tool that routes every search through the broker
+class BrokeredSearchTool(BaseTool):
+    name: str = "tavily_search_results_json"
+    description: str = (
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Input should be a search query; several queries on separate lines are searched in parallel. "
+        "Results you have already been given are not repeated."
+    )
+    args_schema: Type[BaseModel] = BrokeredSearchInput
+    broker: Any = None
+    # Keeps per-agent URL de-duplication separate when several companies share a broker
+    scope: Optional[str] = None
+
+    def _run(self, query: str, run_manager=None) -> list:
+        agent = get_current_task()
+        if self.scope:
+            agent = f"{self.scope}: {agent}"
+        return self.broker.search_many(split_queries(query) or [query], agent=agent)
+
+    # The broker's pool does the waiting; keep the event loop free meanwhile
+    async def _arun(self, query: str, run_manager=None) -> list:
+        return await asyncio.to_thread(self._run, query)
+
+
+class SharedEvidenceInput(BaseModel):
+    topic: Optional[str] = Field(default=None, description="Optional keywords to filter the evidence by")
+
+
+# Lets an agent read what the other agents already found before searching again
+class SharedEvidenceTool(BaseTool):
+    name: str = "shared_evidence"
+    description: str = (
+        "Returns the ranked pool of web results all agents in this analysis have found so far, "
+        "optionally filtered by topic keywords. Check it before searching the web again."
+    )
+    args_schema: Type[BaseModel] = SharedEvidenceInput
+    broker: Any = None
+
+    def _run(self, topic: Optional[str] = None, run_manager=None) -> list:
+        return [
+            {
+                "title": entry.get("title"),
+                "url": entry.get("url"),
+                "content": (entry.get("content") or "")[:500],
+                "found_by": entry["agents"]
+            }
+            for entry in self.broker.evidence(topic=topic)
+        ]
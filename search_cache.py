@@ -0,0 +1,280 @@
+from langchain_community.tools.tavily_search.tool import TavilySearchResults
+from langchain_core.rate_limiters import BaseRateLimiter
+from resilience import Resilience, DEFAULT_RETRY_POLICY
+from events import emit
+from tracing import span
+from shared_locks import SharedLock
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "search_cache.sqlite")
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+
+
+# Collapse case and whitespace so trivially different queries share an entry
+def normalize_query(query) -> str:
+    return " ".join(str(query).lower().split())
+
+
+# On-disk LRU cache for search results, shared by every agent, run and session
+class SearchCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache (accessed_at)")
+
+    def _connect(self):
+        # WAL lets concurrent Streamlit sessions read while another one writes
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # Content address: normalized query plus every parameter that changes the response
+    def make_key(self, query, params: dict) -> str:
+        payload = json.dumps({"query": normalize_query(query), "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # record=False re-reads an entry without counting a second lookup
+    def get(self, key: str, record: bool = True):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                if record:
+                    self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                if record:
+                    self.misses += 1
+                return None
+
+            conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            if record:
+                self.hits += 1
+            return json.loads(value)
+
+    def set(self, key: str, query, value):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, str(query), json.dumps(value, default=str), now, now)
+            )
+            self._evict(conn)
+
+    # Drop least recently used entries once the cache grows past max_entries
+    def _evict(self, conn):
+        if not self.max_entries:
+            return
+        count = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM search_cache")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock, self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# One SearchCache per file per process so hit/miss counters are shared too
+def get_search_cache(path: str = DEFAULT_CACHE_PATH, **kwargs) -> SearchCache:
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = SearchCache(path=path, **kwargs)
+        return _caches[path]
+
+
+# Drop-in TavilySearchResults that answers repeated queries from the cache
+class CachedTavilySearchResults(TavilySearchResults):
+    use_cache: bool = True
+    cache_path: str = DEFAULT_CACHE_PATH
+    # Optional limiter shared across tools to cap Tavily requests process-wide
+    rate_limiter: Optional[BaseRateLimiter] = None
+    # Backoff, deadline and optional hedging for Tavily calls
+    retry_policy: Any = DEFAULT_RETRY_POLICY
+
+    def _cache_params(self) -> dict:
+        return {
+            "max_results": self.max_results,
+            "search_depth": self.search_depth,
+            "include_domains": self.include_domains,
+            "exclude_domains": self.exclude_domains,
+            "include_answer": self.include_answer,
+            "include_raw_content": self.include_raw_content,
+            "include_images": self.include_images
+        }
+
+    def _raw_results(self, query: str) -> dict:
+        return self.api_wrapper.raw_results(
+            query,
+            self.max_results,
+            self.search_depth,
+            self.include_domains,
+            self.exclude_domains,
+            self.include_answer,
+            self.include_raw_content,
+            self.include_images
+        )
+
+    # Network call, throttled by the shared rate limiter when one is set and retried
+    # on transient errors; returns the same (content, artifact) pair as the base tool
+    def _search(self, query: str, run_manager=None):
+        def attempt():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(blocking=True)
+            return self._raw_results(query)
+
+        try:
+            raw_results = Resilience("tavily", self.retry_policy).call(attempt, hedge=True)
+        except Exception as e:
+            return repr(e), {}
+        return self.api_wrapper.clean_results(raw_results["results"]), raw_results
+
+    def _run(self, query: str, run_manager=None):
+        with span(self.name, "tool_call", query_chars=len(str(query))) as attributes:
+            result, cached = self._cached_run(query, run_manager=run_manager)
+            attributes["cached"] = cached
+            attributes["result_chars"] = len(json.dumps(result, default=str))
+            return result
+
+    async def _asearch(self, query: str, run_manager=None):
+        async def attempt():
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(blocking=True)
+            return await self.api_wrapper.raw_results_async(
+                query,
+                self.max_results,
+                self.search_depth,
+                self.include_domains,
+                self.exclude_domains,
+                self.include_answer,
+                self.include_raw_content,
+                self.include_images
+            )
+
+        try:
+            raw_results = await Resilience("tavily", self.retry_policy).acall(attempt, hedge=True)
+        except Exception as e:
+            return repr(e), {}
+        return self.api_wrapper.clean_results(raw_results["results"]), raw_results
+
+    async def _arun(self, query: str, run_manager=None):
+        with span(self.name, "tool_call", query_chars=len(str(query))) as attributes:
+            key, result = self._lookup(query)
+            attributes["cached"] = result is not None
+            if result is None and key is None:
+                result = await self._asearch(query, run_manager=run_manager)
+            elif result is None:
+                lock = self._flight_lock(key)
+                await lock.aacquire()
+                try:
+                    result = self._reread(key) if lock.waited else None
+                    attributes["cached"] = result is not None
+                    if result is None:
+                        result = await self._asearch(query, run_manager=run_manager)
+                        self._store(key, query, result)
+                finally:
+                    lock.release()
+            attributes["result_chars"] = len(json.dumps(result, default=str))
+            return result
+
+    # Returns (result, served from cache). A miss searches under the key's shared
+    # lock, so an identical search already running in any process is waited for
+    # and read from the cache instead of being repeated
+    def _cached_run(self, query: str, run_manager=None):
+        key, result = self._lookup(query)
+        if result is not None:
+            return result, True
+        if key is None:
+            return self._search(query, run_manager=run_manager), False
+
+        with self._flight_lock(key) as lock:
+            result = self._reread(key) if lock.waited else None
+            if result is not None:
+                return result, True
+            result = self._search(query, run_manager=run_manager)
+            self._store(key, query, result)
+        return result, False
+
+    def _flight_lock(self, key: str) -> SharedLock:
+        return SharedLock(key, os.path.join(os.path.dirname(self.cache_path), "locks"))
+
+    # The entry written by the search this one waited for, if it succeeded
+    def _reread(self, key: str):
+        cached = get_search_cache(self.cache_path).get(key, record=False)
+        if cached is None:
+            return None
+        return tuple(cached["value"]) if cached["is_tuple"] else cached["value"]
+
+    # Returns (cache key, cached result); the key is None when caching is off
+    def _lookup(self, query: str):
+        if not self.use_cache:
+            emit("tool_call", tool=self.name, query=query, cached=False)
+            return None, None
+
+        cache = get_search_cache(self.cache_path)
+        key = cache.make_key(query, self._cache_params())
+        cached = cache.get(key)
+        emit("tool_call", tool=self.name, query=query, cached=cached is not None)
+        if cached is None:
+            return key, None
+        return key, (tuple(cached["value"]) if cached["is_tuple"] else cached["value"])
+
+    def _store(self, key, query: str, result):
+        if key is None:
+            return
+        # Errors come back as a repr string; never cache those
+        content = result[0] if isinstance(result, tuple) else result
+        if not isinstance(content, str):
+            get_search_cache(self.cache_path).set(key, query, {"is_tuple": isinstance(result, tuple), "value": result})
@@ -0,0 +1,295 @@
+# Headless HTTP service for analyses, served by N worker processes.
+# The supervisor binds the port once and forks the workers, which all accept on
+# that socket. A request is only enqueued in the shared jobs table. Every worker
+# claims queued jobs as it has free threads, so adding workers adds capacity
+# whichever worker accepted the request. Identical requests to any worker join the
+# job already in flight. Search results, evidence, checkpoints, link verdicts and
+# the report cache are SQLite files under .cache/ that every worker shares.
+# Identical search cache misses are single-flighted across processes
+# (shared_locks.py). API keys come from the service's environment, never from requests.
+#
+#   POST /analyses            {"company", "industry", "options"} -> 202 {"job_id", "status"}
+#   GET  /analyses/<id>       job status, stage and result
+#   GET  /analyses/<id>/<fmt> report download (md, html, json, csv)
+#   GET  /health              worker id, its running jobs and job counts
+#
+# Workers are forked, so the service runs on Linux and macOS.
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from job_queue import JobQueue, default_worker_id, run_analysis
+from pipelines import EXECUTION_STRATEGIES, PIPELINES
+from dotenv import load_dotenv
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+DEFAULT_SERVICE_JOBS_PATH = os.path.join(".cache", "service_jobs.sqlite")
+DEFAULT_PORT = 8100
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+# Longest company or industry name accepted
+MAX_NAME_LENGTH = 200
+# Options a request may set, with a check for each value
+REQUEST_OPTIONS = {
+    "pipeline": lambda value: value in PIPELINES,
+    "execution_strategy": lambda value: value is None or value in EXECUTION_STRATEGIES,
+    "use_search_cache": lambda value: isinstance(value, bool),
+    "force_refresh": lambda value: isinstance(value, bool)
+}
+
+
+# The request's company, industry and options, or raises ValueError
+def parse_analysis_request(body: dict) -> tuple:
+    if not isinstance(body, dict):
+        raise ValueError("Expected a JSON object")
+    for name in ("company", "industry"):
+        value = body.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"'{name}' is required")
+        if len(value) > MAX_NAME_LENGTH:
+            raise ValueError(f"'{name}' is longer than {MAX_NAME_LENGTH} characters")
+        # Names end up in prompts and report titles; output paths use a slug of them
+        if any(ord(char) < 32 or ord(char) == 127 for char in value):
+            raise ValueError(f"'{name}' contains control characters")
+    company, industry = body["company"], body["industry"]
+    options = body.get("options")
+    if options is None:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be an object")
+    for name, value in options.items():
+        check = REQUEST_OPTIONS.get(name)
+        if check is None:
+            raise ValueError(f"Unknown option {name} (available: {', '.join(REQUEST_OPTIONS)})")
+        if not check(value):
+            raise ValueError(f"Invalid value for {name}: {value!r}")
+    return company.strip(), industry.strip(), options
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict = None):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _send_json(self, status: int, payload):
+        self._send(status, json.dumps(payload, default=str).encode("utf-8"))
+
+    def _error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/analyses":
+            return self._error(404, "Not found")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError("Invalid Content-Length")
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True
+                return self._error(413, "Request body too large")
+            company, industry, options = parse_analysis_request(json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, UnicodeDecodeError) as e:
+            # The body may be unread; do not parse it as the next request
+            self.close_connection = True
+            return self._error(400, str(e))
+
+        queue = self.server.queue
+        job_id = queue.enqueue(company, industry, options)
+        job = queue.get(job_id)
+        self._send_json(202, {"job_id": job_id, "status": job["status"]})
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+        queue = self.server.queue
+        if parts == ["health"]:
+            return self._send_json(200, {
+                "status": "ok",
+                "worker": queue.worker_id,
+                "running": queue.running(),
+                "jobs": queue.counts()
+            })
+        if len(parts) not in (2, 3) or parts[0] != "analyses":
+            return self._error(404, "Not found")
+
+        job = queue.get(parts[1])
+        if job is None:
+            return self._error(404, f"Unknown job {parts[1]}")
+        if len(parts) == 2:
+            return self._send_json(200, job)
+
+        download = queue.downloads(parts[1]).get(parts[2])
+        if download is None:
+            return self._error(404, f"No {parts[2]} output for job {parts[1]}")
+        name, data, mime_type = download
+        self._send(200, data, mime_type, {"Content-Disposition": f'attachment; filename="{name}"'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+# Body of one worker process: claim jobs from the shared table and answer HTTP
+# requests on the inherited listening socket until SIGTERM
+def _serve_worker(sock: socket.socket, jobs_path: str, threads: int, runner, openai_api_key: str,
+                  tavily_api_key: str):
+    # Ctrl+C reaches the whole process group; the supervisor stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    queue = JobQueue(jobs_path, max_workers=threads, runner=runner, recover=False)
+    httpd = ServiceServer(sock.getsockname()[:2], ServiceHandler, bind_and_activate=False)
+    httpd.socket = sock
+    httpd.queue = queue
+
+    def stop(*_):
+        queue.stop()
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    queue.start_claiming(openai_api_key, tavily_api_key)
+    httpd.serve_forever()
+
+
+# Supervisor of the worker processes; workers that exit are replaced and their
+# running jobs marked as interrupted. runner is the job body (see job_queue.run_analysis)
+class Service:
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = 2, threads: int = 2,
+                 jobs_path: str = DEFAULT_SERVICE_JOBS_PATH, runner=run_analysis, openai_api_key: str = None,
+                 tavily_api_key: str = None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.jobs_path = jobs_path
+        self.runner = runner
+        self.openai_api_key = openai_api_key
+        self.tavily_api_key = tavily_api_key
+        self.socket = None
+        self.processes = []
+        self._context = multiprocessing.get_context("fork")
+        self._stopping = False
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _spawn(self) -> multiprocessing.Process:
+        process = self._context.Process(
+            target=_serve_worker,
+            args=(self.socket, self.jobs_path, self.threads, self.runner, self.openai_api_key, self.tavily_api_key),
+            daemon=True
+        )
+        process.start()
+        return process
+
+    # Bind, recover the jobs table and fork the workers; returns once they are started
+    def start(self):
+        # The supervisor's queue only recovers and bookkeeps; it never runs jobs
+        self.queue = JobQueue(self.jobs_path, max_workers=1, recover=True)
+        self.socket = socket.create_server((self.host, self.port), backlog=256)
+        # Idle workers all wake for a new connection; the losers must not block in accept()
+        self.socket.setblocking(False)
+        self.port = self.socket.getsockname()[1]
+        self.processes = [self._spawn() for _ in range(self.workers)]
+        return self
+
+    # Replace workers that exited, until stop()
+    def supervise(self, interval: float = 1.0):
+        while not self._stopping:
+            for index, process in enumerate(self.processes):
+                if process.is_alive() or self._stopping:
+                    continue
+                interrupted = self.queue.interrupt_worker(default_worker_id(process.pid))
+                print(f"Worker {process.pid} exited with code {process.exitcode}; "
+                      f"{interrupted} jobs interrupted, starting a replacement")
+                self.processes[index] = self._spawn()
+            time.sleep(interval)
+
+    # Workers stop accepting and finish their running jobs within timeout seconds;
+    # jobs still running after that are killed and marked as interrupted
+    def stop(self, timeout: float = 30.0):
+        self._stopping = True
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+                self.queue.interrupt_worker(default_worker_id(process.pid))
+        if self.socket is not None:
+            self.socket.close()
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Serve market research analyses over HTTP from worker processes")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=2, help="Concurrent analyses per worker")
+    parser.add_argument("--jobs", default=DEFAULT_SERVICE_JOBS_PATH, help="Jobs table shared by the workers")
+    parser.add_argument("--openai-rpm", type=float, default=0,
+                        help="OpenAI requests per minute across all workers (0 = unlimited)")
+    parser.add_argument("--tavily-rpm", type=float, default=0,
+                        help="Tavily requests per minute across all workers (0 = unlimited)")
+    args = parser.parse_args()
+
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    if not openai_api_key or not tavily_api_key:
+        parser.error("OPENAI_API_KEY and TAVILY_API_KEY must be set in the environment or a .env file")
+
+    # Limiters are per process, so each worker gets an even share of the global rate
+    system_options = {}
+    if args.openai_rpm or args.tavily_rpm:
+        from langchain_core.rate_limiters import InMemoryRateLimiter
+        if args.openai_rpm:
+            system_options["llm_rate_limiter"] = InMemoryRateLimiter(
+                requests_per_second=args.openai_rpm / 60 / args.workers, max_bucket_size=1)
+        if args.tavily_rpm:
+            system_options["search_rate_limiter"] = InMemoryRateLimiter(
+                requests_per_second=args.tavily_rpm / 60 / args.workers, max_bucket_size=1)
+
+    service = Service(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        threads=args.threads,
+        jobs_path=args.jobs,
+        runner=functools.partial(run_analysis, **system_options),
+        openai_api_key=openai_api_key,
+        tavily_api_key=tavily_api_key
+    ).start()
+    print(f"Serving on {service.url} with {args.workers} workers x {args.threads} threads")
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        service.supervise()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Cross-process single-flight locks.
+# Every process working in the same directory (service workers, the app, batch runs)
+# shares the SQLite caches under .cache/. Whoever holds a key's lock fills the cache
+# entry; other processes wanting the same key wait, then read that entry instead of
+# making the same call again. Locks are advisory flock()s on a fixed set of striped
+# lock files. The files never need cleaning up, and the kernel releases a lock when
+# the process holding it dies. Without fcntl (Windows), locks only exclude threads
+# of the same process.
+import asyncio
+import hashlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_LOCK_DIR = os.path.join(".cache", "locks")
+# Unrelated keys share a stripe with probability 1/LOCK_STRIPES
+LOCK_STRIPES = 256
+
+_thread_locks = {}
+_thread_locks_lock = threading.Lock()
+
+
+def _stripe(key) -> int:
+    return int(hashlib.sha256(str(key).encode("utf-8")).hexdigest()[:8], 16) % LOCK_STRIPES
+
+
+# Exclusive lock on one key, not reentrant; hold at most one at a time per thread:
+#   with SharedLock(cache_key) as lock:
+#       if lock.waited: ...re-read the cache...
+# Coroutines await lock.aacquire() and release() in a finally block
+class SharedLock:
+    def __init__(self, key, lock_dir: str = DEFAULT_LOCK_DIR):
+        self.lock_dir = lock_dir
+        self.stripe = _stripe(key)
+        self.path = os.path.join(lock_dir, f"{self.stripe:03d}.lock")
+        self.waited = False
+        self._file = None
+        self._thread_lock = None
+
+    # Blocks until held; True when another holder had to be waited for
+    def acquire(self) -> bool:
+        if fcntl is None:
+            with _thread_locks_lock:
+                lock = _thread_locks.setdefault((self.lock_dir, self.stripe), threading.Lock())
+            self.waited = not lock.acquire(blocking=False)
+            if self.waited:
+                lock.acquire()
+            self._thread_lock = lock
+            return self.waited
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.waited = False
+            except BlockingIOError:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+                self.waited = True
+        except BaseException:
+            self._file.close()
+            self._file = None
+            raise
+        return self.waited
+
+    # acquire() for coroutines, waiting in a worker thread. The thread cannot be
+    # interrupted, so when the awaiting task is cancelled the lock is released as
+    # soon as the thread gets it
+    async def aacquire(self) -> bool:
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self.acquire))
+        try:
+            return await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            acquiring.add_done_callback(
+                lambda done: self.release() if not done.cancelled() and done.exception() is None else None
+            )
+            raise
+
+    def release(self):
+        if self._thread_lock is not None:
+            self._thread_lock.release()
+            self._thread_lock = None
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
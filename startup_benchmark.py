@@ -0,0 +1,96 @@
+# Cold-start benchmark for the Streamlit app.
+# Every sample runs in a fresh interpreter: the import time of streamlit_app (and of
+# the analysis engine for comparison), whether importing the app pulled in CrewAI or
+# LangChain, and first paint, i.e. one full script run rendering the form via
+# Streamlit's AppTest harness. --importtime lists the slowest imports.
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("crewai", "langchain_openai", "langchain_community")
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+FIRST_PAINT_PROBE = """
+import json, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("streamlit_app.py", default_timeout=120)
+app.run()
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "exceptions": [str(e.value) for e in app.exception]}))
+"""
+
+
+def probe(code: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# Slowest modules by cumulative import time, from python -X importtime
+def slowest_imports(module: str, top: int = 10) -> list:
+    completed = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            imports.append((int(match.group(1)) / 1e6, match.group(3).strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def summarize(samples: list) -> dict:
+    seconds = sorted(sample["seconds"] for sample in samples)
+    return {"mean": statistics.mean(seconds), "min": seconds[0], "max": seconds[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start and first-paint latency of the Streamlit app")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter samples per measurement")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports of the app")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, module in (("app_import", "streamlit_app"), ("engine_import", "market_research_system")):
+        samples = [probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)) for _ in range(args.repeat)]
+        results[name] = dict(summarize(samples), heavy_modules=samples[-1]["heavy"])
+
+    samples = [probe(FIRST_PAINT_PROBE) for _ in range(args.repeat)]
+    results["first_paint"] = dict(summarize(samples), exceptions=samples[-1]["exceptions"])
+
+    for name, stats in results.items():
+        print(f"{name}: mean {stats['mean']:.2f}s (min {stats['min']:.2f}s, max {stats['max']:.2f}s)")
+    heavy = results["app_import"]["heavy_modules"]
+    print(f"heavy modules loaded by the app import: {', '.join(heavy) if heavy else 'none'}")
+    if results["first_paint"]["exceptions"]:
+        print(f"first paint raised: {results['first_paint']['exceptions']}")
+
+    if args.importtime:
+        print("\nslowest imports of streamlit_app (cumulative):")
+        for seconds, module in slowest_imports("streamlit_app"):
+            print(f"  {seconds:.3f}s  {module}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
-# Streamlit UI implementation for Market Research System
+# Streamlit UI implementation for Market Research System.
+# Only light modules load at the top: CrewAI and LangChain are imported by the job
+# worker when the first analysis runs, so rendering the form stays fast.
 import streamlit as st
-from market_research_system import MarketResearchSystem
+from job_queue import JobQueue, ACTIVE_STATUSES
+from pipelines import PIPELINES
+import time
+
+DOWNLOAD_FORMATS = (
+    ("md", "📄 Download Markdown Report", "Download the report in Markdown format for easy editing"),
+    ("html", "🌐 Download HTML Report", "Download the report in HTML format for web viewing"),
+    ("json", "🧾 Download JSON", "Download the use cases and sources as structured JSON"),
+    ("csv", "📊 Download CSV", "Download one row per use case source as CSV")
+)
 
 # Validate API key formats
 def validate_api_keys(openai_key: str, tavily_key: str) -> bool:
@@ -14,6 +25,56 @@ def validate_api_keys(openai_key: str, tavily_key: str) -> bool:
         return False
     return True
 
+LINK_STATUS_MARKS = {"dead": " ⚠️ *unreachable*", "unverified": " *(not verified)*"}
+
+def link_list(links) -> str:
+    return "\n".join(
+        f"- [{link.title}]({link.url})" + LINK_STATUS_MARKS.get(link.status, "")
+        + (f" - {link.note}" if link.note else "")
+        for link in links
+    ) or "_None found_"
+
+# Structured view of a parsed analysis: one section per use case with its sources
+def show_result(result):
+    for use_case in result.use_cases:
+        st.subheader(use_case.name)
+        st.write(use_case.description)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Implementation Resources**")
+            st.markdown(link_list(use_case.resources))
+        with col2:
+            st.markdown("**Datasets & Code**")
+            st.markdown(link_list(use_case.datasets))
+    with st.expander(f"All sources ({len(result.sources)})"):
+        st.dataframe(result.to_rows(), use_container_width=True)
+
+# One job queue per server process, shared by every session
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+# Poll a running job, showing the current stage and each agent's output as it streams in
+def watch_job(jobs, job_id: str) -> dict:
+    progress_container = st.empty()
+    panels = {}
+    
+    job = jobs.get(job_id)
+    while job["status"] in ACTIVE_STATUSES:
+        progress = jobs.progress(job_id)
+        progress_container.info(f"Current Stage: {progress['stage']}")
+        
+        for task, text in progress["outputs"].items():
+            if task not in panels:
+                panels[task] = st.expander(task, expanded=True).empty()
+            panels[task].markdown(text)
+        
+        time.sleep(0.5)
+        job = jobs.get(job_id)
+    
+    progress_container.empty()
+    return job
+
 def main():
     # Configure Streamlit page settings
     st.set_page_config(
@@ -54,6 +115,27 @@ def main():
                 type="password",
                 help="Enter your Tavily API key (starts with 'tvly-')"
             )
+            use_search_cache = st.checkbox(
+                "Use cached search results",
+                value=True,
+                help="Reuse web search results from previous analyses instead of searching again"
+            )
+            pipeline = st.selectbox(
+                "Pipeline",
+                options=list(PIPELINES),
+                format_func=lambda name: f"{name.replace('_', ' ').title()} - {PIPELINES[name]['description']}",
+                help="Multi-agent runs four specialists; single-agent is one agent and one task, cheaper and faster"
+            )
+            run_parallel = st.checkbox(
+                "Run independent agents in parallel",
+                value=True,
+                help="Find implementation resources and datasets concurrently once use cases are identified"
+            )
+            force_refresh = st.checkbox(
+                "Force refresh",
+                value=False,
+                help="Run a new analysis even if a recent report for this company and industry exists"
+            )
         
         # Expandable section explaining the analysis process    
         with st.expander("Analysis Process"):
@@ -99,99 +181,256 @@ def main():
         if not validate_api_keys(openai_api_key, tavily_api_key):
             return
 
+        # Queue the analysis off the script thread; identical in-flight
+        # requests from other sessions are attached to the same job
+        job_id = get_job_queue().submit(
+            company=company,
+            industry=industry,
+            openai_api_key=openai_api_key,
+            tavily_api_key=tavily_api_key,
+            options={
+                "use_search_cache": use_search_cache,
+                "pipeline": pipeline,
+                "execution_strategy": "dag" if run_parallel else "sequential",
+                "force_refresh": force_refresh
+            }
+        )
+        st.session_state["job_id"] = job_id
+        st.query_params["job_id"] = job_id
+
+    # Follow the current job across reruns and page reloads
+    job_id = st.session_state.get("job_id") or st.query_params.get("job_id")
+    if job_id:
         try:
+            jobs = get_job_queue()
+            job = jobs.get(job_id)
+            if job is None:
+                st.error("Analysis job not found")
+                return
+            
             # Show analysis progress
-            with st.spinner("Generating comprehensive analysis..."):
-                progress_container = st.empty()
+            if job["status"] in ACTIVE_STATUSES:
+                with st.spinner("Generating comprehensive analysis..."):
+                    job = watch_job(jobs, job_id)
+            
+            company = job["company"]
+            result = job["result"] or {}
+            report = result.get("report")
+            md_file = result.get("md_file")
+            html_file = result.get("html_file")
+            task_timings = result.get("task_timings")
+            timing_summary = result.get("timing_summary")
+            usage = result.get("usage")
+            trace_summary = result.get("trace_summary")
+            resilience = result.get("resilience")
+            compaction = result.get("compaction")
+            link_check = result.get("link_check")
+            evidence_stats = result.get("evidence_stats")
+            routing = result.get("routing")
+            
+            # Display results if generation successful
+            if report and md_file and html_file:
+                st.success("✅ Analysis completed successfully!")
+                if result.get("from_cache"):
+                    st.info("Showing a recent cached analysis. Tick 'Force refresh' to run a new one.")
+                
+                # Per-task timing breakdown for parallel runs
+                if task_timings:
+                    with st.expander("Task Timings"):
+                        st.table([
+                            {
+                                "Task": timing["task"],
+                                "Started (s)": round(timing["started"], 1),
+                                "Duration (s)": round(timing["duration"], 1),
+                                "Restored": "✓" if timing.get("restored") else ""
+                            }
+                            for timing in task_timings
+                        ])
+                        st.write(
+                            f"Wall time: {timing_summary['wall_time']:.1f}s "
+                            f"(sequential would take {timing_summary['sequential_time']:.1f}s, "
+                            f"critical path: {' → '.join(timing_summary['critical_path'])})"
+                        )
+                
+                # Per-agent token, cost and latency accounting
+                if usage and usage["totals"]["calls"]:
+                    with st.expander("Token Usage"):
+                        st.table([
+                            {
+                                "Agent": agent,
+                                "Calls": stats["calls"],
+                                "Prompt Tokens": stats["prompt_tokens"],
+                                "Completion Tokens": stats["completion_tokens"],
+                                "Cost ($)": round(stats["cost"], 4),
+                                "LLM Latency (s)": round(stats["latency"], 1)
+                            }
+                            for agent, stats in usage["agents"].items()
+                        ])
+                        st.write(
+                            f"Total: {usage['totals']['total_tokens']} tokens, "
+                            f"${usage['totals']['cost']:.4f}"
+                        )
+                
+                # Where the run's time went, by span kind
+                if trace_summary and trace_summary["kinds"]:
+                    with st.expander("Trace Summary"):
+                        st.table([
+                            {
+                                "Span": kind,
+                                "Count": stats["count"],
+                                "Total (s)": round(stats["total_duration"], 2),
+                                "Max (s)": round(stats["max_duration"], 2)
+                            }
+                            for kind, stats in trace_summary["kinds"].items()
+                        ])
+                        st.caption(f"Trace {trace_summary['trace_id']} written to .cache/traces.jsonl")
                 
-                def update_progress(stage):
-                    progress_container.info(f"Current Stage: {stage}")
+                # Prompt tokens saved by forwarding compacted context between tasks
+                if compaction and compaction["hops"]:
+                    with st.expander("Context Compaction"):
+                        st.table([
+                            {
+                                "Hop": hop["hop"],
+                                "Tokens Before": hop["tokens_before"],
+                                "Tokens After": hop["tokens_after"],
+                                "Ceiling": hop["limit"],
+                                "Use Cases": hop["use_cases"],
+                                "Links": hop["links"],
+                                "Trimmed": "✓" if hop["truncated"] else ""
+                            }
+                            for hop in compaction["hops"]
+                        ])
+                        st.write(
+                            f"Forwarded {compaction['tokens_after']} of {compaction['tokens_before']} "
+                            f"context tokens ({compaction['tokens_saved']} saved)"
+                        )
                 
-                update_progress("Identifying optimal use cases...")
+                # Latency and cost per model route, and outputs redone on a larger model
+                if routing and any(stats["calls"] for stats in routing.values()):
+                    with st.expander("Model Routes"):
+                        st.table([
+                            {
+                                "Route": route,
+                                "Model": stats["model"],
+                                "Agents": ", ".join(stats["agents"]),
+                                "Calls": stats["calls"],
+                                "Tokens": stats["total_tokens"],
+                                "Cost ($)": round(stats["cost"], 4),
+                                "Latency per Call (s)": round(stats["mean_call_latency"], 2),
+                                "Failed Validation": stats["validation_failures"],
+                                "Fallbacks": stats["fallbacks"]
+                            }
+                            for route, stats in routing.items()
+                        ])
                 
-                # Initialize and run market research system
-                system = MarketResearchSystem(
-                    company=company,
-                    industry=industry,
-                    openai_api_key=openai_api_key,
-                    tavily_api_key=tavily_api_key
-                )
+                # Retrievals answered from the local evidence index instead of the web
+                if evidence_stats and evidence_stats["lookups"]:
+                    with st.expander("Local Evidence"):
+                        col1, col2, col3 = st.columns(3)
+                        col1.metric("Local Lookups", evidence_stats["lookups"])
+                        col2.metric("Answered Locally", evidence_stats["hits"])
+                        if "local_hit_ratio" in evidence_stats:
+                            col3.metric("Local-Hit Ratio", f"{evidence_stats['local_hit_ratio']:.0%}")
+                            st.caption(f"{evidence_stats['web_searches']} searches still went to the web")
                 
-                # Generate reports
-                report, md_file, html_file = system.run()
+                # Reachability of every resource and dataset link in the report
+                if link_check and link_check["links"]:
+                    with st.expander("Link Check"):
+                        col1, col2, col3, col4 = st.columns(4)
+                        col1.metric("Links", link_check["links"])
+                        col2.metric("Reachable", link_check["ok"])
+                        col3.metric("Dead", link_check["dead"])
+                        col4.metric("Unverified", link_check["unverified"])
+                        st.caption(f"Checked in {link_check['seconds']:.1f}s, "
+                                   f"{link_check['cached']} verdicts from cache")
+                        if link_check["dead_links"]:
+                            action = "Dropped" if link_check["dropped"] else "Flagged"
+                            st.markdown(f"{action} dead links:\n" + "\n".join(
+                                f"- {url}" for url in link_check["dead_links"]
+                            ))
                 
-                # Display results if generation successful
-                if report and md_file and html_file:
-                    st.success("✅ Analysis completed successfully!")
+                # Transient API failures absorbed by retries and hedged searches
+                if resilience and resilience["providers"]:
+                    with st.expander("Retries"):
+                        st.table([
+                            {
+                                "Provider": provider,
+                                "Calls": stats["calls"],
+                                "Retries": stats["retries"],
+                                "Retry Wait (s)": round(stats["retry_wait"], 1),
+                                "Failures": stats["failures"],
+                                "Hedged": stats["hedges"],
+                                "Circuit": resilience["circuits"].get(provider, {}).get("state", "closed")
+                            }
+                            for provider, stats in resilience["providers"].items()
+                        ])
+                
+                # Create three tabs for different views
+                tab1, tab2, tab3 = st.tabs([
+                    "📊 Analysis Report",
+                    "⬇️ Download Options",
+                    "ℹ️ Implementation Guide"
+                ])
+                
+                # Tab 1: Display analysis report
+                with tab1:
+                    if result.get("result"):
+                        from results import AnalysisResult
+                        show_result(AnalysisResult.model_validate(result["result"]))
+                    else:
+                        st.markdown(report)
+                
+                # Tab 2: Download options
+                with tab2:
+                    st.write("### Download Analysis Report")
+                    downloads = jobs.downloads(job_id)
+                    columns = st.columns(len(DOWNLOAD_FORMATS))
                     
-                    # Create three tabs for different views
-                    tab1, tab2, tab3 = st.tabs([
-                        "📊 Analysis Report",
-                        "⬇️ Download Options",
-                        "ℹ️ Implementation Guide"
-                    ])
+                    # Bytes come from the job queue's memory, not from re-reading reports/
+                    for column, (fmt, label, help_text) in zip(columns, DOWNLOAD_FORMATS):
+                        if fmt not in downloads:
+                            continue
+                        _, data, mime = downloads[fmt]
+                        with column:
+                            st.download_button(
+                                label,
+                                data=data,
+                                file_name=f"{company.lower()}_analysis.{fmt}",
+                                mime=mime,
+                                help=help_text
+                            )
+                
+                # Tab 3: Implementation guide
+                with tab3:
+                    st.write("""
+                    ### Implementation Guide
                     
-                    # Tab 1: Display analysis report
-                    with tab1:
-                        st.markdown(report)
+                    This analysis provides:
+                    
+                    #### Use Cases
+                    • Detailed problem statements
+                    • Clear business benefits
+                    • Implementation complexity assessment
+                    
+                    #### Resources
+                    • Official company documentation
+                    • Implementation guides
+                    • Technical frameworks
                     
-                    # Tab 2: Download options
-                    with tab2:
-                        st.write("### Download Analysis Report")
-                        col1, col2 = st.columns(2)
-                        
-                        # Markdown download button
-                        with col1:
-                            with open(md_file, 'rb') as f:
-                                st.download_button(
-                                    "📄 Download Markdown Report",
-                                    data=f,
-                                    file_name=f"{company.lower()}_analysis.md",
-                                    mime="text/markdown",
-                                    help="Download the report in Markdown format for easy editing"
-                                )
-                        
-                        # HTML download button
-                        with col2:
-                            with open(html_file, 'rb') as f:
-                                st.download_button(
-                                    "🌐 Download HTML Report",
-                                    data=f,
-                                    file_name=f"{company.lower()}_analysis.html",
-                                    mime="text/html",
-                                    help="Download the report in HTML format for web viewing"
-                                )
+                    #### Datasets & Code
+                    • Real, accessible datasets
+                    • Implementation code
+                    • Training materials
                     
-                    # Tab 3: Implementation guide
-                    with tab3:
-                        st.write("""
-                        ### Implementation Guide
-                        
-                        This analysis provides:
-                        
-                        #### Use Cases
-                        • Detailed problem statements
-                        • Clear business benefits
-                        • Implementation complexity assessment
-                        
-                        #### Resources
-                        • Official company documentation
-                        • Implementation guides
-                        • Technical frameworks
-                        
-                        #### Datasets & Code
-                        • Real, accessible datasets
-                        • Implementation code
-                        • Training materials
-                        
-                        All resources have been verified to ensure they are:
-                        • Currently accessible
-                        • Relevant to use cases
-                        • From reliable sources
-                        """)
-                else:
-                    st.error("Analysis generation failed")
-                    st.warning("Please check your inputs and try again")
+                    Every link is checked before the report is written:
+                    • Reachable links are kept as they are
+                    • Unreachable links are flagged
+                    • Links that could not be checked are marked as not verified
+                    """)
+            else:
+                st.error(f"Analysis generation failed: {job['error']}" if job["error"]
+                         else "Analysis generation failed")
+                st.warning("Please check your inputs and try again")
 
         # Handle errors
         except Exception as e:
@@ -0,0 +1,88 @@
+from batch_analysis import BatchAnalysis, load_manifest
+import json
+import pytest
+
+COMPANIES = [
+    {"company": "Nvidia", "industry": "Semiconductors"},
+    {"company": "Pfizer", "industry": "Pharmaceuticals"},
+    {"company": "Ford", "industry": "Automotive"}
+]
+
+
+# Stands in for MarketResearchSystem; crash_on simulates the process dying
+# mid-analysis, fail_on an analysis that raises
+class StubSystem:
+    analyzed = []
+    crash_on = None
+    fail_on = None
+
+    def __init__(self, company: str, industry: str, **options):
+        self.company = company
+        self.result_file = None
+        self.usage = {"totals": {"calls": 1}}
+
+    def run(self, execution_strategy: str = None):
+        StubSystem.analyzed.append(self.company)
+        if self.company == StubSystem.crash_on:
+            raise KeyboardInterrupt
+        if self.company == StubSystem.fail_on:
+            raise RuntimeError("Search provider down")
+        return f"# {self.company}", f"{self.company}.md", f"{self.company}.html"
+
+
+@pytest.fixture(autouse=True)
+def stub():
+    StubSystem.analyzed, StubSystem.crash_on, StubSystem.fail_on = [], None, None
+
+
+def make_batch(manifest) -> BatchAnalysis:
+    return BatchAnalysis(COMPANIES, str(manifest), "sk-fake", "tvly-fake", workers=1, openai_rpm=0,
+                         tavily_rpm=0, system_factory=StubSystem)
+
+
+def statuses(manifest) -> dict:
+    return {entry["company"]: entry["status"] for entry in load_manifest(str(manifest)).values()}
+
+
+def test_interrupted_batch_resumes_without_redoing_finished_companies(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    StubSystem.crash_on = "Pfizer"
+    with pytest.raises(KeyboardInterrupt):
+        make_batch(manifest).run()
+    # Pfizer never got a final entry, so it is still marked running
+    assert statuses(manifest)["Pfizer"] == "running"
+    assert statuses(manifest)["Nvidia"] == "done"
+
+    StubSystem.analyzed, StubSystem.crash_on = [], None
+    counts = make_batch(manifest).run()
+    assert "Nvidia" not in StubSystem.analyzed
+    assert "Pfizer" in StubSystem.analyzed
+    assert counts["failed"] == 0
+    assert set(statuses(manifest).values()) == {"done"}
+
+
+def test_crashed_running_entry_is_retried(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    lines = [
+        {"company": "Nvidia", "industry": "Semiconductors", "status": "done"},
+        {"company": "Pfizer", "industry": "Pharmaceuticals", "status": "running"}
+    ]
+    # A crash mid-write leaves a truncated final line, which is ignored
+    manifest.write_text("".join(json.dumps(line) + "\n" for line in lines) + '{"company": "Fo',
+                        encoding="utf-8")
+
+    counts = make_batch(manifest).run()
+    assert StubSystem.analyzed == ["Pfizer", "Ford"]
+    assert counts == {"done": 2, "failed": 0}
+
+
+@pytest.mark.parametrize("retry_failed, analyzed", [(True, ["Pfizer"]), (False, [])])
+def test_failed_companies_are_retried_unless_skipped(tmp_path, retry_failed, analyzed):
+    manifest = tmp_path / "manifest.jsonl"
+    StubSystem.fail_on = "Pfizer"
+    assert make_batch(manifest).run() == {"done": 2, "failed": 1}
+    assert "Search provider down" in load_manifest(str(manifest))["pfizer|pharmaceuticals"]["error"]
+
+    StubSystem.analyzed, StubSystem.fail_on = [], None
+    make_batch(manifest).run(retry_failed=retry_failed)
+    assert StubSystem.analyzed == analyzed
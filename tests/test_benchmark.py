@@ -0,0 +1,29 @@
+from benchmark import build_system, timed_run
+from pipelines import load_pipeline
+import asyncio
+import pytest
+
+
+# End-to-end smoke test: real CrewAI agents and the scheduler on the local stand-ins
+@pytest.mark.parametrize("pipeline, strategy", [
+    ("single_agent", "sequential"),
+    ("multi_agent", "sequential"),
+    ("multi_agent", "dag"),
+])
+def test_offline_run_completes(pipeline, strategy, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = timed_run(load_pipeline(pipeline), strategy, "Company0", llm_latency=0, search_latency=0)
+    assert result["ok"], result["error"]
+    assert result["error"] is None
+    assert len(result["tasks"]) == len(load_pipeline(pipeline)["tasks"])
+
+
+def test_run_refuses_a_running_event_loop(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = build_system(load_pipeline("single_agent"), "Company0", llm_latency=0, search_latency=0)
+
+    async def inside_loop():
+        system.run()
+
+    with pytest.raises(RuntimeError, match="await MarketResearchSystem.arun"):
+        asyncio.run(inside_loop())
@@ -0,0 +1,115 @@
+from checkpoints import CheckpointStore, checkpoint_key
+from scheduler import run_task_graph
+import pytest
+import scheduler
+import sqlite3
+
+
+class Agent:
+    role = "Analyst"
+    goal = "Analyse"
+    backstory = "Experienced"
+    tools = []
+
+
+class Task:
+    def __init__(self, description, context=None):
+        self.description = description
+        self.expected_output = None
+        self.agent = Agent()
+        self.context = context or []
+        self.name = description
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.sqlite"), max_age=60)
+
+
+def _age(store, key, seconds):
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE task_checkpoints SET created_at = created_at - ? WHERE key = ?", (seconds, key))
+
+
+def test_checkpoint_key_changes_with_upstream_output():
+    assert checkpoint_key("task", ["a"]) == checkpoint_key("task", ["a"])
+    assert checkpoint_key("task", ["a"]) != checkpoint_key("task", ["b"])
+
+
+def test_expired_checkpoints_are_not_restored(store):
+    store.set("fresh", "Task", "new output")
+    store.set("stale", "Task", "old output")
+    _age(store, "stale", 120)
+    assert store.get("fresh") == "new output"
+    assert store.get("stale") is None
+
+
+def test_writes_prune_expired_checkpoints(store):
+    store.set("stale", "Task", "old output")
+    _age(store, "stale", 120)
+    store.set("fresh", "Task", "new output")
+    with sqlite3.connect(store.path) as conn:
+        assert [row[0] for row in conn.execute("SELECT key FROM task_checkpoints")] == ["fresh"]
+
+
+def test_rerun_after_a_prompt_edit_recomputes_only_its_descendants(store, monkeypatch):
+    calls = []
+
+    async def execute(task, context):
+        calls.append(task.description)
+        return f"{task.description} done"
+
+    monkeypatch.setattr(scheduler, "execute_task_async", execute)
+    research = Task("Research")
+    resources = Task("Resources", context=[research])
+    datasets = Task("Datasets", context=[research])
+    report = Task("Report", context=[resources, datasets])
+    tasks = [research, resources, datasets, report]
+    run_task_graph(tasks, checkpoints=store)
+
+    calls.clear()
+    datasets.description = "Datasets, open licences only"
+    graph = run_task_graph(tasks, checkpoints=store)
+    recomputed = [timing["task"] for timing in graph["timings"] if not timing["restored"]]
+    assert recomputed == ["Datasets", "Report"]
+    assert graph["summary"]["restored_tasks"] == ["Research", "Resources"]
+    assert calls == ["Datasets, open licences only", "Report"]
+
+    calls.clear()
+    graph = run_task_graph(tasks, checkpoints=store)
+    assert calls == []
+    assert len(graph["summary"]["restored_tasks"]) == 4
+
+
+def test_least_recently_used_checkpoints_are_evicted(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"), max_age=60, max_entries=2)
+    store.set("a", "Task", "a")
+    store.set("b", "Task", "b")
+    assert store.get("a") == "a"
+    store.set("c", "Task", "c")
+    assert [store.get(key) for key in "abc"] == ["a", None, "c"]
+
+
+def test_failed_run_resumes_from_completed_tasks(store, monkeypatch):
+    calls = []
+
+    async def fail_report(task, context):
+        calls.append(task.description)
+        if task.description == "Report":
+            raise RuntimeError("model unavailable")
+        return f"{task.description} done"
+
+    monkeypatch.setattr(scheduler, "execute_task_async", fail_report)
+    research = Task("Research")
+    report = Task("Report", context=[research])
+    with pytest.raises(RuntimeError):
+        run_task_graph([research, report], checkpoints=store)
+
+    async def execute(task, context):
+        calls.append(task.description)
+        return f"{task.description} done"
+
+    monkeypatch.setattr(scheduler, "execute_task_async", execute)
+    graph = run_task_graph([research, report], checkpoints=store)
+    assert calls == ["Research", "Report", "Report"]
+    assert graph["summary"]["restored_tasks"] == ["Research"]
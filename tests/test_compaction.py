@@ -0,0 +1,121 @@
+from compaction import ContextCompactor, extract_facts, render_facts
+
+# Research analyst output: numbered use cases with nested, numbered details
+NUMBERED_USE_CASES = """Here are the 4 high-impact AI use cases for Nvidia:
+
+1. **AI-Driven Predictive Maintenance for Data Centers**
+   - **Problem:** Unplanned GPU cluster downtime is expensive.
+   - **Benefit:**
+     1. Reduced downtime by 30%
+     2. Longer hardware life
+   - Source: [NVIDIA Fleet Command](https://www.nvidia.com/en-us/data-center/products/fleet-command/)
+
+2. **Personalized Developer Experience**
+   - **Problem:** Developers struggle to find the right SDK.
+   - **Benefit:** Faster onboarding
+   - Source: https://developer.nvidia.com/blog/personalized-recommendations
+
+3. **Supply Chain Optimization**: Forecast wafer demand with ML.
+   1. Problem: Volatile demand
+   2. Benefit: Lower inventory costs
+   - Dataset: [Supply Chain Dataset](https://www.kaggle.com/datasets/supply-chain)
+
+4. **Generative AI for Chip Design**
+   - Uses generative models to explore layouts.
+"""
+
+# Tech architect output: a title, headings per use case, flush-left numbered details
+HEADED_USE_CASES = """# Implementation Resources for Nvidia
+
+## 1. Predictive Maintenance
+**Problem:** Unplanned downtime across GPU clusters.
+**Benefit:**
+1. Reduced downtime by 30%
+2. Lower maintenance costs
+[NVIDIA Predictive Maintenance Guide](https://developer.nvidia.com/blog/predictive-maintenance)
+
+## 2. Customer Support Automation
+Automates tier-1 support with conversational AI.
+1. Problem: Long response times
+2. Benefit: 24/7 coverage
+- [NeMo Framework](https://github.com/NVIDIA/NeMo)
+
+## Conclusion
+See https://www.nvidia.com/en-us/ai/ for more.
+"""
+
+# Integration specialist output: the final table
+FINAL_TABLE = """| Use Case | Description | Implementation Resources | Datasets & Code |
+|----------|-------------|-------------------------|-----------------|
+| Healthcare Imaging and Analysis | Utilizes advanced AI models for healthcare imaging. | • [AI in Healthcare](https://www.kaggle.com/code/abdonasser/ai-in-healthcare) - Guide | • [LLMTwin Dataset](https://huggingface.co/datasets/mlabonne/llmtwin) - Data |
+| Real-time Fraud Detection in Finance | Detects fraudulent transactions in real time. | • [NVIDIA Fraud Blueprint](https://developer.nvidia.com/blog/fraud) - Guide | |
+"""
+
+
+def _names(facts: dict) -> list:
+    return [use_case["name"] for use_case in facts["use_cases"]]
+
+
+def _urls(use_case: dict) -> list:
+    return [link["url"] for link in use_case["resources"] + use_case["datasets"]]
+
+
+def test_nested_numbering_and_labels_stay_details():
+    facts = extract_facts(NUMBERED_USE_CASES)
+    assert _names(facts) == [
+        "AI-Driven Predictive Maintenance for Data Centers",
+        "Personalized Developer Experience",
+        "Supply Chain Optimization",
+        "Generative AI for Chip Design"
+    ]
+    maintenance, developer, supply_chain, _ = facts["use_cases"]
+    assert _urls(maintenance) == ["https://www.nvidia.com/en-us/data-center/products/fleet-command/"]
+    assert _urls(developer) == ["https://developer.nvidia.com/blog/personalized-recommendations"]
+    assert supply_chain["description"] == "Forecast wafer demand with ML."
+    assert [link["url"] for link in supply_chain["datasets"]] == ["https://www.kaggle.com/datasets/supply-chain"]
+
+
+def test_headings_open_use_cases_and_numbered_lines_under_them_are_details():
+    facts = extract_facts(HEADED_USE_CASES)
+    assert _names(facts) == ["Predictive Maintenance", "Customer Support Automation"]
+    maintenance, support = facts["use_cases"]
+    assert maintenance["description"] == "Problem: Unplanned downtime across GPU clusters."
+    assert _urls(maintenance) == ["https://developer.nvidia.com/blog/predictive-maintenance"]
+    assert support["description"] == "Automates tier-1 support with conversational AI."
+    assert [link["url"] for link in support["datasets"]] == ["https://github.com/NVIDIA/NeMo"]
+    # Links under a closing section belong to no use case
+    assert [link["url"] for link in facts["resources"]] == ["https://www.nvidia.com/en-us/ai/"]
+
+
+def test_use_case_labels_open_use_cases():
+    facts = extract_facts("**Use Case 1: Demand Forecasting**\n1. Reduced stockouts by 20%\n"
+                          "**Use Case 2: Visual Inspection**\n1. Fewer defects\n")
+    assert _names(facts) == ["Demand Forecasting", "Visual Inspection"]
+
+
+def test_table_rows_become_use_cases():
+    facts = extract_facts(FINAL_TABLE)
+    assert _names(facts) == ["Healthcare Imaging and Analysis", "Real-time Fraud Detection in Finance"]
+    imaging = facts["use_cases"][0]
+    assert [link["url"] for link in imaging["datasets"]] == [
+        "https://www.kaggle.com/code/abdonasser/ai-in-healthcare",
+        "https://huggingface.co/datasets/mlabonne/llmtwin"
+    ]
+
+
+def test_render_facts_lists_use_cases_with_links():
+    rendered = render_facts(extract_facts(HEADED_USE_CASES))
+    assert rendered.splitlines()[0].startswith("USE CASE: Predictive Maintenance - Problem:")
+    assert "USE CASE: Reduced downtime" not in rendered
+    assert "OTHER RESOURCES: www.nvidia.com: https://www.nvidia.com/en-us/ai/" in rendered
+
+
+def test_compactor_trims_to_the_hop_limit_and_records_the_hop():
+    output = NUMBERED_USE_CASES + "\n" + "Search result dump. " * 2000
+    compactor = ContextCompactor(default_limit=300)
+    compacted = compactor.compact(output, "Research Analyst", "Tech Architect")
+    hop = compactor.summary()["hops"][0]
+    assert hop["hop"] == "Research Analyst -> Tech Architect"
+    assert hop["use_cases"] == 4
+    assert hop["tokens_after"] <= 300 < hop["tokens_before"]
+    assert compacted.startswith("USE CASE: AI-Driven Predictive Maintenance")
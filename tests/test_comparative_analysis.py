@@ -0,0 +1,60 @@
+from comparative_analysis import ComparativeAnalysis, comparison_table
+from fakes import FakeChatModel, fake_search_tool
+from market_research_system import MarketResearchSystem
+from results import AnalysisResult, Link, UseCase
+import asyncio
+import comparative_analysis
+import pytest
+
+
+def test_comparison_table_escapes_pipes_and_marks_empty_link_cells():
+    result = AnalysisResult(company="A|B Corp", industry="Semiconductors", use_cases=[
+        UseCase(name="Yield | Defect Prediction", description="Flags wafers | dies early",
+                resources=[Link(title="Guide | v2", url="https://example.com/guide", note="Part 1 | 2")])
+    ])
+    table = comparison_table({"A|B Corp": result})
+    header, separator, row = table.splitlines()
+    # Every row keeps exactly the header's five columns
+    assert row.count("|") == header.count("|") == separator.count("|") == 6
+    assert row.startswith("| A/B Corp | Yield / Defect Prediction | Flags wafers / dies early | ")
+    assert "• [Guide / v2](https://example.com/guide) - Part 1 / 2" in row
+    assert row.endswith("| - |")
+
+
+# Analyses every company offline; fail_company raises from its analysis
+def offline_comparison(monkeypatch, fail_company: str) -> ComparativeAnalysis:
+    class System(MarketResearchSystem):
+        def __init__(self, **options):
+            super().__init__(verify_links=False, **options)
+
+        async def arun(self, *args, **kwargs):
+            if self.company == fail_company:
+                raise RuntimeError("Search provider down")
+            return await super().arun(*args, **kwargs)
+
+    monkeypatch.setattr(comparative_analysis, "MarketResearchSystem", System)
+    return ComparativeAnalysis(["Company0", "Company1", "Company2"], "Semiconductors", "sk-fake", "tvly-fake",
+                               use_checkpoints=False, llm=FakeChatModel(latency=0),
+                               search_tool=fake_search_tool(latency=0))
+
+
+def test_a_failed_company_does_not_abort_the_comparison(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analysis = offline_comparison(monkeypatch, fail_company="Company1")
+    report, md_file, html_file = asyncio.run(analysis.arun())
+
+    assert list(analysis.results) == ["Company0", "Company2"]
+    assert analysis.failures == {"Company1": "Search provider down"}
+    assert "## Not Analyzed\n\n- Company1: Search provider down" in report
+    assert "| Company0 |" in report and "| Company2 |" in report
+
+
+def test_run_refuses_a_running_event_loop():
+    analysis = ComparativeAnalysis(["Company0"], "Semiconductors", "sk-fake", "tvly-fake",
+                                   llm=FakeChatModel(latency=0), search_tool=fake_search_tool(latency=0))
+
+    async def inside_loop():
+        analysis.run()
+
+    with pytest.raises(RuntimeError, match="await ComparativeAnalysis.arun"):
+        asyncio.run(inside_loop())
@@ -0,0 +1,54 @@
+from evidence_index import EvidenceIndex, LocalEvidenceTool, indexed_search_tool
+from fakes import fake_search_tool
+from search_broker import SearchBroker
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def index(tmp_path):
+    return EvidenceIndex(str(tmp_path / "evidence.sqlite"))
+
+
+def test_direct_searches_are_indexed_and_answered_locally(index):
+    search = indexed_search_tool(fake_search_tool(latency=0), index)
+    assert search.name == "tavily_search_results_json"
+
+    results = search.invoke({"query": "GPU predictive maintenance"})
+    assert len(results) == 8
+    assert search.stats == {"searches": 1, "new_documents": 8}
+
+    local = LocalEvidenceTool(index=index)
+    assert isinstance(local.invoke({"query": "predictive maintenance GPU"}), list)
+    assert local.invoke({"query": "semiconductor export controls"}).startswith("No local evidence")
+    stats = local.summary(web_searches=search.stats["searches"])
+    assert (stats["hits"], stats["lookups"]) == (1, 2)
+    assert stats["local_hit_ratio"] == pytest.approx(1 / 2)
+
+
+def test_async_searches_are_indexed(index):
+    search = indexed_search_tool(fake_search_tool(latency=0), index)
+    asyncio.run(search.ainvoke({"query": "GPU datasets"}))
+    assert search.stats == {"searches": 1, "new_documents": 8}
+    assert index.count() == 8
+
+
+def test_failed_searches_are_counted_but_not_indexed(index):
+    class FailingTool:
+        name, description, args_schema = "tavily_search_results_json", "Search", None
+
+        def invoke(self, payload):
+            return "HTTPError('503 Server Error')"
+
+    search = indexed_search_tool(FailingTool(), index)
+    assert search.invoke({"query": "GPU datasets"}).startswith("HTTPError")
+    assert search.stats == {"searches": 1, "new_documents": 0}
+    assert index.count() == 0
+
+
+def test_brokered_searches_are_indexed_once(index):
+    search = indexed_search_tool(fake_search_tool(latency=0.05), index)
+    broker = SearchBroker(search)
+    broker.search_many(["GPU datasets", "datasets for GPU"], agent="Analyst")
+    broker.close()
+    assert search.stats == {"searches": 1, "new_documents": 8}
@@ -0,0 +1,87 @@
+from job_queue import JobQueue, request_key
+import threading
+import time
+import pytest
+
+
+def blocking_runner(release: threading.Event):
+    def runner(job, openai_api_key, tavily_api_key, callback):
+        callback({"type": "task_started", "task": "Research Analyst"})
+        release.wait(5)
+        return {"report": f"# {job['company']}", "md_file": None, "html_file": None}
+    return runner
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "jobs.sqlite")
+
+
+def test_request_key_ignores_case_and_spacing_but_not_options():
+    key = request_key("Nvidia", "Semiconductors", {"pipeline": "multi_agent"})
+    assert key == request_key(" nvidia ", "semiconductors", {"pipeline": "multi_agent"})
+    assert key != request_key("Nvidia", "Semiconductors", {"pipeline": "quick_scan"})
+
+
+def test_enqueue_dedupes_in_flight_requests_across_queues(path):
+    first, second = JobQueue(path, worker_id="a"), JobQueue(path, worker_id="b", recover=False)
+    job_id = first.enqueue("Nvidia", "Semiconductors")
+    assert second.enqueue("nvidia", "semiconductors") == job_id
+    assert second.enqueue("Nvidia", "Semiconductors", {"pipeline": "quick_scan"}) != job_id
+    assert first.counts() == {"queued": 2}
+
+
+def test_submit_reuses_the_running_job_then_queues_a_new_one(path):
+    release = threading.Event()
+    queue = JobQueue(path, max_workers=1, runner=blocking_runner(release))
+    job_id = queue.submit("Nvidia", "Semiconductors", "sk-fake", "tvly-fake")
+    assert queue.submit("Nvidia", "Semiconductors", "sk-fake", "tvly-fake") == job_id
+
+    release.set()
+    queue._pool.shutdown(wait=True)
+    assert queue.get(job_id)["status"] == "done"
+    assert queue.get(job_id)["result"]["report"] == "# Nvidia"
+    assert queue.enqueue("Nvidia", "Semiconductors") != job_id
+
+
+def test_claiming_queue_runs_enqueued_jobs(path):
+    release = threading.Event()
+    release.set()
+    queue = JobQueue(path, max_workers=1, runner=blocking_runner(release), worker_id="a")
+    job_id = queue.enqueue("Nvidia", "Semiconductors")
+    queue.start_claiming("sk-fake", "tvly-fake", poll_interval=0.05)
+    try:
+        for _ in range(100):
+            if queue.get(job_id)["status"] == "done":
+                break
+            time.sleep(0.05)
+    finally:
+        queue.stop()
+        queue._pool.shutdown(wait=True)
+    job = queue.get(job_id)
+    assert (job["status"], job["worker"]) == ("done", "a")
+
+
+def test_restart_recovers_active_jobs_as_interrupted(path):
+    queue = JobQueue(path)
+    job_id = queue.enqueue("Nvidia", "Semiconductors")
+    JobQueue(path, recover=False)
+    assert queue.get(job_id)["status"] == "queued"
+
+    JobQueue(path)
+    assert queue.get(job_id)["status"] == "interrupted"
+    # An interrupted job no longer absorbs identical requests
+    assert queue.enqueue("Nvidia", "Semiconductors") != job_id
+
+
+def test_interrupt_worker_only_touches_that_workers_active_jobs(path):
+    queue = JobQueue(path)
+    mine, _ = queue._insert("Nvidia", "Semiconductors", {}, worker="a")
+    theirs, _ = queue._insert("AMD", "Semiconductors", {}, worker="b")
+    queue._update(mine, status="running")
+
+    assert queue.interrupt_worker("a") == 1
+    assert queue.interrupt_worker("a") == 0
+    assert queue.get(mine)["status"] == "interrupted"
+    assert queue.get(mine)["stage"] == "Worker exited"
+    assert queue.get(theirs)["status"] == "queued"
@@ -0,0 +1,147 @@
+from fakes import FakeLinkServer
+from link_checker import LinkCache, LinkChecker, annotate_links, connection_status, extract_urls, is_public_address
+from types import SimpleNamespace
+import aiohttp
+import link_checker
+import pytest
+import socket
+
+
+@pytest.fixture
+def server():
+    with FakeLinkServer(slow_latency=1.0) as server:
+        yield server
+
+
+@pytest.fixture
+def checker(tmp_path):
+    return LinkChecker(timeout=0.3, deadline=5.0, cache=LinkCache(str(tmp_path / "links.sqlite")), allow_private=True)
+
+
+def _closed_port_url() -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}/dataset"
+
+
+def test_verdicts_for_alive_dead_redirected_and_slow_links(server, checker):
+    urls = {
+        "ok": server.url("/ok/guide"),
+        "no_head": server.url("/no-head/guide"),
+        "missing": server.url("/missing/dataset"),
+        "gone": server.url("/gone/dataset"),
+        "redirect": server.url("/redirect/guide"),
+        "limited": server.url("/limited/guide"),
+        "error": server.url("/error/guide"),
+        "slow": server.url("/slow/guide"),
+        "refused": _closed_port_url(),
+        "tls": server.url("/ok/tls").replace("http://", "https://")
+    }
+    verdicts = checker.verify(list(urls.values()))
+    status = {name: verdicts[url]["status"] for name, url in urls.items()}
+
+    assert status == {
+        "ok": "ok", "no_head": "ok", "missing": "dead", "gone": "dead", "redirect": "ok",
+        "limited": "unverified", "error": "unverified", "slow": "unverified", "refused": "dead",
+        "tls": "unverified"
+    }
+    assert verdicts[urls["redirect"]]["final_url"] == server.url("/ok/guide")
+    assert checker.stats["checked"] == len(urls)
+
+
+def test_cached_verdicts_are_not_checked_again(server, checker):
+    urls = [server.url("/ok/guide"), server.url("/missing/dataset")]
+    first = checker.verify(urls)
+    requests = server.requests
+
+    second = checker.verify(urls)
+    assert server.requests == requests
+    assert (checker.stats["cached"], checker.stats["checked"]) == (2, 0)
+    assert {url: v["status"] for url, v in second.items()} == {url: v["status"] for url, v in first.items()}
+
+
+def test_unverified_verdicts_expire_first(server, tmp_path):
+    cache = LinkCache(str(tmp_path / "links.sqlite"), ttls={"unverified": 0})
+    checker = LinkChecker(timeout=2.0, cache=cache, allow_private=True)
+    urls = [server.url("/ok/guide"), server.url("/limited/guide")]
+    checker.verify(urls)
+    checker.verify(urls)
+    assert (checker.stats["cached"], checker.stats["checked"]) == (1, 1)
+
+
+def test_offline_checker_reports_unverified_instead_of_dead(checker):
+    verdicts = checker.verify([_closed_port_url()])
+    assert [v["status"] for v in verdicts.values()] == ["unverified"]
+
+
+@pytest.mark.parametrize("errno, status", [
+    (socket.EAI_NONAME, "dead"),
+    (socket.EAI_AGAIN, "unverified"),
+])
+def test_dns_failures(errno, status):
+    key = SimpleNamespace(host="example.invalid", port=443, ssl=True)
+    error = aiohttp.ClientConnectorDNSError(key, socket.gaierror(errno, "lookup failed"))
+    assert connection_status(error) == status
+
+
+REPORT = """| Use Case | Description | Implementation Resources | Datasets & Code |
+|----------|-------------|-------------------------|-----------------|
+| Maintenance | Predicts failures. | • [Guide](https://example.com/guide) - Setup<br>• Docs: https://example.com/dead - Old docs | • https://example.com/dead-dataset - Sensor data<br>• [Data](https://example.com/data) - CSV |
+"""
+
+
+def test_extract_urls_finds_markdown_and_bare_urls():
+    assert extract_urls(REPORT) == [
+        "https://example.com/guide", "https://example.com/data", "https://example.com/dead",
+        "https://example.com/dead-dataset"
+    ]
+
+
+def test_annotate_flags_bare_dead_urls_without_touching_longer_ones():
+    verdicts = {"https://example.com/dead": {"status": "dead"}, "https://example.com/guide": {"status": "ok"}}
+    annotated = annotate_links(REPORT, verdicts)
+    assert "https://example.com/dead ⚠️ *unreachable* - Old docs" in annotated
+    assert "https://example.com/dead-dataset - Sensor data" in annotated
+    assert "[Guide](https://example.com/guide) - Setup" in annotated
+
+
+def test_annotate_drops_dead_bullets_of_both_kinds():
+    verdicts = {url: {"status": "dead"} for url in
+                ("https://example.com/dead", "https://example.com/dead-dataset", "https://example.com/guide")}
+    annotated = annotate_links(REPORT, verdicts, drop_dead=True)
+    row = annotated.splitlines()[2]
+    assert "example.com/dead" not in row
+    assert "Guide" not in row and "Old docs" not in row
+    assert row.endswith("| Predicts failures. | | • [Data](https://example.com/data) - CSV |")
+
+
+def test_non_public_addresses_are_refused_by_default(server, tmp_path):
+    checker = LinkChecker(timeout=0.3, cache=LinkCache(str(tmp_path / "links.sqlite")))
+    urls = [server.url("/ok/guide"), server.url("/ok/guide").replace("127.0.0.1", "localhost"),
+            "http://169.254.169.254/latest/meta-data/", "http://[::1]:8080/admin"]
+    verdicts = checker.verify(urls)
+    assert server.requests == 0
+    assert [v["status"] for v in verdicts.values()] == ["unverified"] * 4
+    assert all("public address" in v["error"] for v in verdicts.values())
+
+
+def test_redirects_to_non_public_addresses_are_refused(server, tmp_path, monkeypatch):
+    # Treat the test server as a public site redirecting into the private network
+    monkeypatch.setattr(link_checker, "is_public_address", lambda address: address == "127.0.0.1")
+    checker = LinkChecker(timeout=0.3, cache=LinkCache(str(tmp_path / "links.sqlite")))
+    verdicts = checker.verify([server.url("/redirect-host/10.0.0.1/guide"), server.url("/ok/guide")])
+    assert [v["status"] for v in verdicts.values()] == ["unverified", "ok"]
+    assert "10.0.0.1 is not a public address" in verdicts[server.url("/redirect-host/10.0.0.1/guide")]["error"]
+    assert server.requests == 2
+
+
+@pytest.mark.parametrize("address, public", [
+    ("93.184.216.34", True), ("2606:2800:220:1:248:1893:25c8:1946", True), ("127.0.0.1", False),
+    ("10.1.2.3", False), ("172.16.0.1", False), ("192.168.1.1", False), ("169.254.169.254", False),
+    ("100.64.0.1", False), ("0.0.0.0", False), ("224.0.0.1", False), ("::1", False), ("fe80::1%eth0", False),
+    ("fd00::1", False), ("::ffff:127.0.0.1", False)
+])
+def test_public_addresses(address, public):
+    assert is_public_address(address) == public
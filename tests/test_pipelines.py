@@ -0,0 +1,38 @@
+from pipelines import load_pipeline
+import json
+import pytest
+import sys
+
+PIPELINE = """name: two_agent
+execution_strategy: sequential
+agents:
+  - {name: analyst, role: Research Analyst, goal: "Identify AI use cases for {company}", backstory: "Analyst"}
+  - {name: writer, role: Integration Specialist, goal: "Write the final table", backstory: "Writer"}
+tasks:
+  - {name: use_cases, agent: analyst, description: "Identify 4 AI use cases for {company}"}
+  - {name: table, agent: writer, description: "Create ONE TABLE", context: [use_cases]}
+"""
+
+
+def test_yaml_pipeline_file(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "two_agent.yaml"
+    path.write_text(PIPELINE, encoding="utf-8")
+    pipeline = load_pipeline(str(path))
+    assert [task["name"] for task in pipeline["tasks"]] == ["use_cases", "table"]
+    assert "default" in pipeline["models"]
+
+
+def test_yaml_without_pyyaml_fails_clearly_and_json_still_loads(tmp_path, monkeypatch):
+    yaml = pytest.importorskip("yaml")
+    spec = yaml.safe_load(PIPELINE)
+    monkeypatch.setitem(sys.modules, "yaml", None)
+
+    path = tmp_path / "two_agent.yaml"
+    path.write_text(PIPELINE, encoding="utf-8")
+    with pytest.raises(ImportError, match="pip install pyyaml"):
+        load_pipeline(str(path))
+
+    path = tmp_path / "two_agent.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    assert load_pipeline(str(path))["name"] == "two_agent"
@@ -0,0 +1,25 @@
+from renderer import ReportRenderer, page_parts
+import html
+import pytest
+
+
+@pytest.mark.parametrize("title", ["Nvidia $BODY report", "AT&T <Telecom> \"quoted\""])
+def test_page_parts_escapes_the_title_and_keeps_one_split_point(title):
+    head, tail = page_parts(title)
+    assert f"<title>{html.escape(title)}</title>" in head
+    assert head.endswith("<body>\n")
+    assert tail == "\n</body>\n</html>\n"
+
+
+def test_renderer_writes_markdown_and_html_for_any_title(tmp_path):
+    renderer = ReportRenderer(str(tmp_path / "reports" / "nvidia"), "Costs in $BODY", formats=("md", "html"))
+    renderer.add_section("# Nvidia")
+    renderer.add_section("| Use Case | Description |\n|---|---|\n| Maintenance | Predicts failures. |")
+    report = renderer.finish()
+
+    page = report.outputs["html"].decode("utf-8")
+    assert page.count("<body>") == 1
+    assert "<title>Costs in $BODY</title>" in page
+    assert "<td>Maintenance</td>" in page
+    assert report.markdown.startswith("# Nvidia\n\n| Use Case")
+    assert (tmp_path / "reports" / "nvidia.html").read_text(encoding="utf-8") == page
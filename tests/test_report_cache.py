@@ -0,0 +1,52 @@
+from report_cache import ReportCache
+import pytest
+import sqlite3
+
+LLM = {"routes": {"default": {"model": "gpt-4-turbo-preview"}}, "routing": True}
+OPTIONS = {"verify_links": True, "drop_dead_links": False, "search": {"max_results": 8}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(str(tmp_path / "report_cache.sqlite"))
+
+
+@pytest.fixture
+def report(tmp_path):
+    md_file, html_file = tmp_path / "report.md", tmp_path / "report.html"
+    md_file.write_text("# Nvidia", encoding="utf-8")
+    html_file.write_text("<h1>Nvidia</h1>", encoding="utf-8")
+    return str(md_file), str(html_file)
+
+
+def test_keys_separate_everything_that_changes_the_report(cache):
+    key = cache.make_key("Nvidia", "Semiconductors", LLM, "prompts", OPTIONS)
+    assert key == cache.make_key(" nvidia", "SEMICONDUCTORS ", LLM, "prompts", dict(OPTIONS))
+    assert len({
+        key,
+        cache.make_key("AMD", "Semiconductors", LLM, "prompts", OPTIONS),
+        cache.make_key("Nvidia", "Semiconductors", {"routes": {}, "routing": False}, "prompts", OPTIONS),
+        cache.make_key("Nvidia", "Semiconductors", LLM, "edited prompts", OPTIONS),
+        cache.make_key("Nvidia", "Semiconductors", LLM, "prompts", dict(OPTIONS, drop_dead_links=True)),
+        cache.make_key("Nvidia", "Semiconductors", LLM, "prompts", dict(OPTIONS, verify_links=False)),
+        cache.make_key("Nvidia", "Semiconductors", LLM, "prompts", dict(OPTIONS, search={"max_results": 5}))
+    }) == 7
+
+
+def test_fresh_reports_are_served_and_stale_ones_are_not(cache, report):
+    key = cache.make_key("Nvidia", "Semiconductors", LLM, "prompts", OPTIONS)
+    assert cache.get(key) is None
+    cache.set(key, "Nvidia", "Semiconductors", *report)
+    assert cache.get(key, max_age=60) == ("# Nvidia",) + report
+
+    with sqlite3.connect(cache.path) as conn:
+        conn.execute("UPDATE report_cache SET created_at = created_at - 120")
+    assert cache.get(key, max_age=60) is None
+    assert cache.get(key, max_age=None) is not None
+
+
+def test_deleted_report_files_are_a_miss(cache, report, tmp_path):
+    key = cache.make_key("Nvidia", "Semiconductors", LLM, "prompts", OPTIONS)
+    cache.set(key, "Nvidia", "Semiconductors", *report)
+    (tmp_path / "report.html").unlink()
+    assert cache.get(key) is None
@@ -0,0 +1,47 @@
+from report_store import ReportStore, fts_query
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.sqlite"))
+    reports = [
+        ("Nvidia", "Semiconductors", "Predictive maintenance for GPU fleets"),
+        ("Nvidia", "Semiconductors", "Demand forecasting with Kaggle data"),
+        ("AMD", "Semiconductors", "Predictive maintenance of fabs"),
+        ("Tesla", "Automotive", "Battery forecasting"),
+    ]
+    for index, (company, industry, body) in enumerate(reports):
+        store.add(company, industry, body, f"reports/{index}.md", created_at=1000 + index)
+    return store
+
+
+def test_fts_query_quotes_words_and_keeps_prefixes():
+    assert fts_query('maintenance OR "x" forecast*') == '"maintenance" "OR" "x" "forecast"*'
+    assert fts_query("***") == ""
+
+
+def test_count_without_query_counts_filtered_reports(store):
+    assert store.count() == 4
+    assert store.count(industry="semiconductors") == 3
+    assert store.count(company="Nvidia", query="  ") == 2
+
+
+def test_count_with_query_matches_search(store):
+    assert store.count(query="predictive") == 2
+    assert store.count(company="Nvidia", query="predictive") == 1
+    assert store.count(query="forecast*") == 2
+    assert store.count(query="forecast*") == len(store.search("forecast*"))
+
+
+def test_search_pages_cover_every_match(store):
+    total = store.count(industry="Semiconductors", query="maintenance")
+    pages = [store.search("maintenance", industry="Semiconductors", limit=1, offset=offset)
+             for offset in range(total)]
+    assert total == 2
+    assert sorted(page[0]["company"] for page in pages) == ["AMD", "Nvidia"]
+    assert "**maintenance**" in pages[0][0]["snippet"].lower()
+
+
+def test_list_is_newest_first(store):
+    assert [report["company"] for report in store.list(limit=2)] == ["Tesla", "AMD"]
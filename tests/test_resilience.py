@@ -0,0 +1,190 @@
+from resilience import CircuitBreaker, CircuitOpenError, Resilience, ResilienceMetrics, RetryPolicy, recording, \
+    reset_breakers
+import asyncio
+import pytest
+import time
+
+FAST_POLICY = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0, deadline=10.0, call_timeout=5.0)
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.snapshot() == {"state": "open", "consecutive_failures": 3, "times_opened": 1}
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through_and_closes_on_success():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    _open(breaker)
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_half_open_trial_failure_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    _open(breaker)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.snapshot()["state"] == "open"
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+def test_call_retries_transient_errors_then_succeeds():
+    outcomes = [Unavailable("busy"), Unavailable("busy"), "ok"]
+
+    def fn():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with recording(ResilienceMetrics()) as metrics:
+        assert Resilience("test", FAST_POLICY).call(fn) == "ok"
+    stats = metrics.summary()["providers"]["test"]
+    assert (stats["calls"], stats["attempts"], stats["retries"], stats["failures"]) == (1, 3, 2, 0)
+
+
+def test_call_does_not_retry_permanent_errors():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        Resilience("test", FAST_POLICY).call(fn)
+    assert len(calls) == 1
+
+
+def test_cancelled_trial_releases_the_half_open_breaker():
+    resilience = Resilience("test", FAST_POLICY)
+    resilience.breaker.failure_threshold = 1
+    resilience.breaker.reset_timeout = 0
+    _open(resilience.breaker)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(resilience.acall(hang))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        async def ok():
+            return "ok"
+        return await resilience.acall(ok)
+
+    assert asyncio.run(cancel_trial()) == "ok"
+    assert resilience.breaker.state == "closed"
+
+
+def test_stage_timeout_releases_the_half_open_breaker():
+    resilience = Resilience("test", FAST_POLICY)
+    resilience.breaker.failure_threshold = 1
+    resilience.breaker.reset_timeout = 0
+    _open(resilience.breaker)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def time_out():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(resilience.acall(hang), 0.05)
+
+    asyncio.run(time_out())
+    resilience.breaker.before_call()
+
+
+def test_sync_hedge_wins_when_primary_is_slow():
+    policy = FAST_POLICY.with_hedging(0.05)
+    delays = [1.0, 0.0]
+
+    def fn():
+        delay = delays.pop(0)
+        time.sleep(delay)
+        return delay
+
+    with recording(ResilienceMetrics()) as metrics:
+        assert Resilience("test", policy).call(fn, hedge=True) == 0.0
+    stats = metrics.summary()["providers"]["test"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_async_hedge_cancels_the_losing_request():
+    policy = FAST_POLICY.with_hedging(0.05)
+    started = []
+    cancelled = []
+
+    async def fn():
+        index = len(started)
+        started.append(index)
+        try:
+            await asyncio.sleep(1.0 if index == 0 else 0.0)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return index
+
+    async def run():
+        with recording(ResilienceMetrics()) as metrics:
+            result = await Resilience("test", policy).acall(fn, hedge=True)
+            await asyncio.sleep(0)
+        return result, metrics.summary()["providers"]["test"]
+
+    result, stats = asyncio.run(run())
+    assert result == 1
+    assert cancelled == [0]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_fast_primary_is_not_hedged():
+    policy = FAST_POLICY.with_hedging(1.0)
+
+    with recording(ResilienceMetrics()) as metrics:
+        assert Resilience("test", policy).call(lambda: "primary", hedge=True) == "primary"
+    assert metrics.summary()["providers"]["test"]["hedges"] == 0
@@ -0,0 +1,78 @@
+from results import AnalysisResult, load_portfolio, parse_links, parse_use_case_table, save_portfolio
+import pytest
+
+TABLE = """Thought: I now know the final answer
+
+| Use Case | Description | Implementation Resources | Datasets & Code |
+|----------|-------------|-------------------------|-----------------|
+| **Predictive Maintenance** | Predicts GPU failures.<br>Cuts downtime. | • [Fleet Command](https://www.nvidia.com/fleet-command) - Deployment guide<br>• [Blog](https://developer.nvidia.com/blog/pm) | • [Sensor Data](https://www.kaggle.com/datasets/sensors) - 10GB of telemetry |
+| Fraud Detection | Flags fraudulent payments. | • https://developer.nvidia.com/fraud - Blueprint | |
+| Chip Design | Generates layouts. | • [Broken link](not-a-url) - Missing scheme<br>• Internal wiki only | • [Layouts](https://huggingface.co/datasets/layouts) |
+| Customer Support | Answers tier-1 tickets. | - | • [Support Bot](https://github.com/example/support) - Code |
+
+Let me know if you need anything else.
+"""
+
+
+def test_four_row_table():
+    use_cases = parse_use_case_table(TABLE)
+    assert [use_case.name for use_case in use_cases] == [
+        "Predictive Maintenance", "Fraud Detection", "Chip Design", "Customer Support"
+    ]
+    maintenance = use_cases[0]
+    assert maintenance.description == "Predicts GPU failures. Cuts downtime."
+    assert [link.url for link in maintenance.datasets] == ["https://www.kaggle.com/datasets/sensors"]
+    assert maintenance.datasets[0].note == "10GB of telemetry"
+
+
+def test_br_separated_link_cells():
+    links = parse_links("• [Fleet Command](https://www.nvidia.com/fleet-command) - Deployment guide"
+                        "<br/>• [Blog](https://developer.nvidia.com/blog/pm)")
+    assert [(link.title, link.url, link.note) for link in links] == [
+        ("Fleet Command", "https://www.nvidia.com/fleet-command", "Deployment guide"),
+        ("Blog", "https://developer.nvidia.com/blog/pm", None)
+    ]
+
+
+def test_bare_missing_and_malformed_links():
+    fraud, design, support = parse_use_case_table(TABLE)[1:]
+    assert [(link.title, link.url) for link in fraud.resources] == [
+        ("https://developer.nvidia.com/fraud", "https://developer.nvidia.com/fraud")
+    ]
+    assert fraud.datasets == []
+    # A link without a scheme and an item without a URL are skipped
+    assert design.resources == []
+    assert support.resources == []
+
+
+def test_answer_without_a_table():
+    answer = "Here are four use cases:\n1. Predictive maintenance\n2. Fraud detection"
+    assert parse_use_case_table(answer) == []
+    with pytest.raises(ValueError, match="No use case table"):
+        AnalysisResult.from_report("Nvidia", "Semiconductors", answer)
+
+
+def test_first_table_with_a_use_case_column_is_used():
+    report = "| Metric | Value |\n|---|---|\n| Revenue | $60B |\n\n" + TABLE
+    assert len(parse_use_case_table(report)) == 4
+
+
+@pytest.fixture
+def portfolio():
+    return [
+        AnalysisResult.from_report("Nvidia", "Semiconductors", TABLE),
+        AnalysisResult.from_report("Pfizer", "Pharmaceuticals", TABLE.replace("GPU", "lab equipment"))
+    ]
+
+
+@pytest.mark.parametrize("extension, module", [("jsonl", None), ("msgpack", "msgpack"), ("parquet", "pyarrow")])
+def test_portfolio_round_trip(portfolio, tmp_path, extension, module):
+    if module:
+        pytest.importorskip(module)
+    path = str(tmp_path / f"portfolio.{extension}")
+    save_portfolio(portfolio, path)
+
+    loaded = load_portfolio(path)
+    assert [result.model_dump() for result in loaded] == [result.model_dump() for result in portfolio]
+    assert [result.company for result in load_portfolio(path, companies=["Pfizer"])] == ["Pfizer"]
+    assert [result.company for result in load_portfolio(path, industries=["Semiconductors"])] == ["Nvidia"]
@@ -0,0 +1,71 @@
+from benchmark import build_system
+from clients import instrument_llm
+from events import set_current_task
+from fakes import FakeChatModel
+from market_research_system import MarketResearchSystem
+from pipelines import load_pipeline
+from resilience import ResilientChatModel
+from routing import ModelRouter, route_summary
+from usage import BudgetExceededError, UsageTracker, tracking
+import pytest
+import routing
+
+MODELS = {"default": {"model": "gpt-4o"}, "fast": {"model": "gpt-4o-mini"}}
+
+
+def test_injected_models_get_usage_callbacks_and_retries():
+    stand_in = FakeChatModel(latency=0, search_first=False)
+    llm = instrument_llm(stand_in)
+    assert isinstance(llm, ResilientChatModel)
+    # The caller's model is left as it was
+    assert not stand_in.callbacks
+
+    tracker = UsageTracker()
+    with tracking(tracker):
+        llm.invoke("Which use cases?")
+    assert tracker.summary()["totals"]["calls"] == 1
+
+
+def test_injected_models_are_held_to_budgets():
+    llm = instrument_llm(FakeChatModel(latency=0, search_first=False))
+    with tracking(UsageTracker(max_run_tokens=1)):
+        llm.invoke("Which use cases?")
+        with pytest.raises(BudgetExceededError):
+            llm.invoke("Which use cases?")
+
+
+def test_route_summary_counts_calls_of_injected_models():
+    router = ModelRouter(MODELS, "sk-fake", llm=FakeChatModel(latency=0, search_first=False),
+                         llms={"fast": FakeChatModel(latency=0, search_first=False, model_name="fake-mini")})
+    tracker = UsageTracker()
+    with tracking(tracker):
+        set_current_task("Research Analyst")
+        router.llm("default").invoke("Which use cases?")
+        set_current_task("Integration Specialist")
+        router.llm("fast").invoke("Assemble the table")
+        router.llm("fast").invoke("Assemble the table")
+
+    routes = route_summary(router, tracker.summary(),
+                           {"Research Analyst": "default", "Integration Specialist": "fast"}, {}, [])
+    assert (routes["default"]["calls"], routes["fast"]["calls"]) == (1, 2)
+    assert routes["fast"]["model"] == "fake-mini"
+
+
+def test_routing_off_builds_only_the_default_route(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    built = []
+    monkeypatch.setattr(routing, "get_llm", lambda openai_api_key, **config: built.append(config["model"]) or
+                        instrument_llm(FakeChatModel(latency=0, model_name=config["model"])))
+    MarketResearchSystem("Nvidia", "Semiconductors", "sk-fake", "tvly-fake", use_model_routing=False,
+                         use_checkpoints=False, use_evidence_index=False)
+    assert built == ["gpt-4-turbo-preview"]
+
+
+@pytest.mark.parametrize("fast_invalid, model", [(False, "fake-gpt-mini"), (True, "fake-gpt")])
+def test_report_records_the_model_that_wrote_the_final_table(fast_invalid, model, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = build_system(load_pipeline("multi_agent"), "Company0", llm_latency=0, search_latency=0,
+                          fast_latency=0, fast_invalid=fast_invalid)
+    report, _, _ = system.run(execution_strategy="dag")
+    assert report
+    assert system.report_store.latest("Company0")["model"] == model
@@ -0,0 +1,113 @@
+from scheduler import StageCancelled, arun_task_graph, check_cancelled, critical_path, task_dependencies
+import asyncio
+import pytest
+import threading
+import time
+
+
+class Agent:
+    role = "Analyst"
+
+
+# Blocking task standing in for a CrewAI agent loop: one step per interval, with
+# the step callback between steps
+class SteppingTask:
+    def __init__(self, name, steps: int = 50, interval: float = 0.02, context=None):
+        self.name = name
+        self.agent = Agent()
+        self.context = context or []
+        self.steps_taken = 0
+        self.steps = steps
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.received_context = None
+
+    def execute_sync(self, agent, context=None):
+        self.received_context = context
+        try:
+            for _ in range(self.steps):
+                time.sleep(self.interval)
+                self.steps_taken += 1
+                check_cancelled()
+            return f"{self.name} done"
+        except StageCancelled:
+            self.stopped.set()
+            raise
+
+
+def test_timed_out_stage_stops_at_the_next_step():
+    task = SteppingTask("Research")
+    with pytest.raises(TimeoutError, match="Research"):
+        asyncio.run(arun_task_graph([task], stage_timeout=0.1))
+    assert task.stopped.wait(1)
+    assert task.steps_taken < task.steps
+
+
+def test_stages_within_their_timeout_finish():
+    research = SteppingTask("Research", steps=2)
+    report = SteppingTask("Report", steps=2, context=[research])
+    graph = asyncio.run(arun_task_graph([research, report], stage_timeouts={"Research": 5.0}))
+    assert graph["outputs"] == ["Research done", "Report done"]
+    assert not research.stopped.is_set()
+
+
+def test_check_cancelled_outside_a_stage_is_a_no_op():
+    check_cancelled()
+
+
+def test_critical_path_follows_the_longest_chain():
+    timings = [
+        {"task": "Research", "depends_on": [], "duration": 2.0},
+        {"task": "Resources", "depends_on": [0], "duration": 1.0},
+        {"task": "Datasets", "depends_on": [0], "duration": 3.0},
+        {"task": "Report", "depends_on": [1, 2], "duration": 1.0}
+    ]
+    assert critical_path(timings) == (["Research", "Datasets", "Report"], 6.0)
+
+
+def test_dependencies_come_from_the_task_context():
+    research = SteppingTask("Research")
+    outsider = SteppingTask("Outsider")
+    report = SteppingTask("Report", context=[research, outsider])
+    # CrewAI leaves a sentinel rather than a list when no context is set
+    research.context = object()
+    assert task_dependencies(report, [research, report]) == [0]
+    assert task_dependencies(research, [research, report]) == []
+
+
+def test_depending_on_a_later_task_is_rejected():
+    research = SteppingTask("Research", steps=1)
+    report = SteppingTask("Report", steps=1, context=[research])
+    with pytest.raises(ValueError, match="'Report' depends on a task declared after it"):
+        asyncio.run(arun_task_graph([report, research]))
+    assert research.received_context is None and report.received_context is None
+
+
+def diamond():
+    research = SteppingTask("Research", steps=2, interval=0.05)
+    resources = SteppingTask("Resources", steps=2, interval=0.05, context=[research])
+    datasets = SteppingTask("Datasets", steps=4, interval=0.05, context=[research])
+    report = SteppingTask("Report", steps=1, interval=0.05, context=[resources, datasets])
+    return [research, resources, datasets, report]
+
+
+def test_independent_tasks_run_concurrently():
+    tasks = diamond()
+    graph = asyncio.run(arun_task_graph(tasks, max_workers=4))
+    research, resources, datasets, report = graph["timings"]
+
+    assert resources["started"] < datasets["finished"] and datasets["started"] < resources["finished"]
+    assert min(resources["started"], datasets["started"]) >= research["finished"]
+    assert report["started"] >= max(resources["finished"], datasets["finished"])
+    assert tasks[3].received_context.count("done") == 2
+
+    summary = graph["summary"]
+    assert summary["critical_path"] == ["Research", "Datasets", "Report"]
+    assert summary["wall_time"] < summary["sequential_time"]
+
+
+def test_a_single_worker_runs_tasks_one_at_a_time():
+    graph = asyncio.run(arun_task_graph(diamond(), max_workers=1))
+    timings = sorted(graph["timings"], key=lambda timing: timing["started"])
+    assert all(earlier["finished"] <= later["started"] for earlier, later in zip(timings, timings[1:]))
+    assert graph["outputs"] == ["Research done", "Resources done", "Datasets done", "Report done"]
@@ -0,0 +1,64 @@
+from search_broker import SearchBroker, query_signature, split_queries
+import threading
+import time
+
+
+class FlakyTool:
+    # Answers like the Tavily tool: a list of results, or a repr() string on failure
+    def __init__(self, failures: int = 0, latency: float = 0.0):
+        self.failures = failures
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, payload: dict):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                return "HTTPError('503 Server Error')"
+        return [{"url": f"https://example.com/{query_signature(payload['query']).replace(' ', '-')}",
+                 "title": payload["query"], "content": "", "score": 0.5}]
+
+
+def test_query_signature_ignores_order_case_and_filler():
+    assert query_signature("AI use cases for Nvidia") == query_signature("nvidia AI use-cases")
+    assert split_queries("a; b\n\nc") == ["a", "b", "c"]
+
+
+def test_identical_queries_share_one_search():
+    tool = FlakyTool(latency=0.1)
+    broker = SearchBroker(tool)
+    results = broker.search_many(["AI use cases for Nvidia", "nvidia AI use-cases"], agent="Analyst")
+    assert tool.calls == 1
+    assert len(results) == 1
+    assert broker.summary()["collapsed"] == 1
+
+
+def test_failed_search_is_not_reused():
+    tool = FlakyTool(failures=1)
+    broker = SearchBroker(tool)
+    assert broker.search("GPU datasets", agent="Analyst") == []
+    assert [result["url"] for result in broker.search("GPU datasets", agent="Analyst")] == [
+        "https://example.com/datasets-gpu"
+    ]
+    assert tool.calls == 2
+    assert broker.summary()["failed"] == 1
+
+
+def test_raised_errors_are_failures_too():
+    class BrokenTool:
+        def invoke(self, payload):
+            raise ConnectionError("offline")
+
+    broker = SearchBroker(BrokenTool())
+    assert broker.search("GPU datasets") == []
+    assert broker.summary()["failed"] == 1
+
+
+def test_agents_are_not_given_the_same_url_twice():
+    broker = SearchBroker(FlakyTool())
+    assert len(broker.search("GPU datasets", agent="Analyst")) == 1
+    assert broker.search("datasets GPU", agent="Analyst") == []
+    assert len(broker.search("GPU datasets", agent="Architect")) == 1
+    assert broker.evidence()[0]["agents"] == ["Analyst", "Architect"]
@@ -0,0 +1,89 @@
+from fakes import fake_search_tool
+from search_cache import SearchCache
+from shared_locks import SharedLock
+import asyncio
+import fcntl
+import pytest
+import time
+
+PARAMS = {"max_results": 8, "search_depth": "advanced"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SearchCache(str(tmp_path / "search_cache.sqlite"), ttl_seconds=60, max_entries=3)
+
+
+def test_keys_ignore_case_and_whitespace_but_not_parameters(cache):
+    key = cache.make_key("AI use cases  for Nvidia", PARAMS)
+    assert key == cache.make_key(" ai USE cases for nvidia", dict(reversed(PARAMS.items())))
+    assert key != cache.make_key("AI use cases for Nvidia", dict(PARAMS, max_results=5))
+    assert key != cache.make_key("AI use cases for AMD", PARAMS)
+
+
+def test_hits_misses_and_expiry(cache):
+    key = cache.make_key("GPU datasets", PARAMS)
+    assert cache.get(key) is None
+    cache.set(key, "GPU datasets", ["result"])
+    assert cache.get(key) == ["result"]
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    keys = [cache.make_key(f"query {n}", PARAMS) for n in range(4)]
+    for n, key in enumerate(keys[:3]):
+        cache.set(key, f"query {n}", n)
+        time.sleep(0.01)
+    assert cache.get(keys[0]) == 0
+    cache.set(keys[3], "query 3", 3)
+
+    assert cache.stats()["entries"] == 3
+    assert cache.get(keys[1]) is None
+    assert [cache.get(key) for key in (keys[0], keys[2], keys[3])] == [0, 2, 3]
+
+
+def test_repeated_queries_are_served_from_the_cache(tmp_path):
+    tool = fake_search_tool(latency=0, use_cache=True, cache_path=str(tmp_path / "search_cache.sqlite"))
+    assert isinstance(tool.invoke({"query": "GPU datasets"}), list)
+    assert isinstance(tool.invoke({"query": "gpu  DATASETS"}), list)
+    assert tool.api_wrapper.calls == 1
+
+
+def _is_free(lock: SharedLock) -> bool:
+    with open(lock.path, "a+") as file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        fcntl.flock(file, fcntl.LOCK_UN)
+        return True
+
+
+def test_cancelled_waiter_does_not_leak_the_lock(tmp_path):
+    lock_dir = str(tmp_path / "locks")
+
+    async def scenario():
+        holder = SharedLock("GPU datasets", lock_dir)
+        holder.acquire()
+        waiter = SharedLock("GPU datasets", lock_dir)
+        waiting = asyncio.ensure_future(waiter.aacquire())
+        await asyncio.sleep(0.1)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        holder.release()
+        # The waiter's thread gets the lock once the holder lets go, then gives it back
+        for _ in range(50):
+            await asyncio.sleep(0.02)
+            if waiter._file is None:
+                break
+        return waiter
+
+    waiter = asyncio.run(scenario())
+    assert waiter._file is None
+    assert _is_free(waiter)
@@ -0,0 +1,84 @@
+from job_queue import JobQueue
+from renderer import slugify
+from service import ServiceHandler, ServiceServer, parse_analysis_request
+import http.client
+import json
+import pytest
+import socket
+import threading
+
+
+def test_parse_analysis_request_strips_names_and_keeps_options():
+    body = {"company": "  Nvidia ", "industry": "Semiconductors", "options": {"pipeline": "single_agent"}}
+    assert parse_analysis_request(body) == ("Nvidia", "Semiconductors", {"pipeline": "single_agent"})
+
+
+@pytest.mark.parametrize("body, message", [
+    ([], "JSON object"),
+    ({"industry": "Semiconductors"}, "'company' is required"),
+    ({"company": "Nvidia", "industry": " "}, "'industry' is required"),
+    ({"company": "Nvidia\n", "industry": "Semiconductors"}, "control characters"),
+    ({"company": "x" * 201, "industry": "Semiconductors"}, "longer than"),
+    ({"company": "Nvidia", "industry": "Semiconductors", "options": []}, "must be an object"),
+    ({"company": "Nvidia", "industry": "Semiconductors", "options": {"pipeline": "/etc/passwd"}}, "Invalid value"),
+    ({"company": "Nvidia", "industry": "Semiconductors", "options": {"llm": "gpt"}}, "Unknown option"),
+])
+def test_parse_analysis_request_rejects(body, message):
+    with pytest.raises(ValueError, match=message):
+        parse_analysis_request(body)
+
+
+@pytest.mark.parametrize("name, slug", [
+    ("Nvidia", "nvidia"),
+    ("General Motors", "general_motors"),
+    ("../../../tmp/pwn", "tmp_pwn"),
+    ("..\\..\\windows", "windows"),
+    ("...", "report"),
+])
+def test_slugify_keeps_report_paths_inside_the_directory(name, slug):
+    assert slugify(name) == slug
+
+
+@pytest.fixture
+def server(tmp_path):
+    sock = socket.create_server(("127.0.0.1", 0))
+    httpd = ServiceServer(sock.getsockname()[:2], ServiceHandler, bind_and_activate=False)
+    httpd.socket = sock
+    httpd.queue = JobQueue(str(tmp_path / "jobs.sqlite"), max_workers=1)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(httpd, body: bytes, headers: dict):
+    conn = http.client.HTTPConnection(*httpd.socket.getsockname()[:2], timeout=5)
+    conn.putrequest("POST", "/analyses")
+    for name, value in headers.items():
+        conn.putheader(name, value)
+    conn.endheaders()
+    if body:
+        conn.send(body)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_post_enqueues_and_joins_identical_requests(server):
+    body = json.dumps({"company": "Nvidia", "industry": "Semiconductors"}).encode("utf-8")
+    status, first = _post(server, body, {"Content-Length": str(len(body))})
+    _, second = _post(server, body, {"Content-Length": str(len(body))})
+    assert status == 202
+    assert first["status"] == "queued"
+    assert second["job_id"] == first["job_id"]
+
+
+def test_post_rejects_negative_content_length(server):
+    status, response = _post(server, b"", {"Content-Length": "-1"})
+    assert status == 400
+    assert "Content-Length" in response["error"]
+
+
+def test_post_rejects_oversized_body(server):
+    status, _ = _post(server, b"", {"Content-Length": str(10 ** 6)})
+    assert status == 413
@@ -0,0 +1,84 @@
+from events import current_task
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation, LLMResult
+from usage import BudgetExceededError, UsageCallbackHandler, UsageTracker, tracking
+from uuid import uuid4
+import pytest
+
+
+def chat_result(input_tokens: int, output_tokens: int) -> LLMResult:
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                                      "total_tokens": input_tokens + output_tokens})
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+def legacy_result(prompt_tokens: int, completion_tokens: int, model: str) -> LLMResult:
+    return LLMResult(generations=[[Generation(text="ok")]], llm_output={
+        "model_name": model,
+        "token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+    })
+
+
+# Drive one LLM call through the handler the way LangChain's callback manager does
+def call(handler: UsageCallbackHandler, task: str, result: LLMResult):
+    run_id = uuid4()
+    with current_task(task):
+        handler.on_chat_model_start({}, [[]], run_id=run_id)
+        handler.on_llm_end(result, run_id=run_id)
+
+
+def test_calls_are_charged_to_the_agent_task_that_made_them():
+    handler = UsageCallbackHandler("gpt-4o")
+    tracker = UsageTracker()
+    with tracking(tracker):
+        call(handler, "Research Analyst", chat_result(1000, 200))
+        call(handler, "Research Analyst", chat_result(500, 100))
+        call(handler, "Integration Specialist", legacy_result(2000, 1000, "gpt-4o-mini-2024-07-18"))
+
+    summary = tracker.summary()
+    research = summary["agents"]["Research Analyst"]
+    assert (research["calls"], research["prompt_tokens"], research["completion_tokens"]) == (2, 1500, 300)
+    assert research["cost"] == pytest.approx(1.5 * 0.0025 + 0.3 * 0.01)
+    integration = summary["agents"]["Integration Specialist"]
+    # The model reported in llm_output is priced, not the handler's default
+    assert integration["cost"] == pytest.approx(2 * 0.00015 + 1 * 0.0006)
+
+    totals = summary["totals"]
+    assert (totals["calls"], totals["prompt_tokens"], totals["completion_tokens"], totals["total_tokens"]) == (
+        3, 3500, 1300, 4800
+    )
+    assert totals["cost"] == pytest.approx(research["cost"] + integration["cost"])
+
+
+def test_calls_outside_a_tracked_run_are_not_recorded():
+    handler = UsageCallbackHandler("gpt-4o")
+    call(handler, "Research Analyst", chat_result(1000, 200))
+    tracker = UsageTracker()
+    with tracking(tracker):
+        handler.on_llm_end(chat_result(1000, 200), run_id=uuid4())
+    assert tracker.summary()["totals"]["calls"] == 0
+
+
+@pytest.mark.parametrize("budget, message", [
+    ({"max_run_tokens": 1000}, "Run token budget"),
+    ({"max_run_cost": 0.001}, "Run cost budget"),
+    ({"max_agent_tokens": {"Research Analyst": 1000}}, "Token budget for Research Analyst"),
+])
+def test_exhausted_budgets_raise_before_the_next_call(budget, message):
+    handler = UsageCallbackHandler("gpt-4o")
+    assert handler.raise_error
+    with tracking(UsageTracker(**budget)):
+        call(handler, "Research Analyst", chat_result(1000, 200))
+        with pytest.raises(BudgetExceededError, match=message):
+            call(handler, "Research Analyst", chat_result(10, 10))
+
+
+def test_agent_budgets_only_stop_their_own_agent():
+    handler = UsageCallbackHandler("gpt-4o")
+    tracker = UsageTracker(max_agent_tokens={"Research Analyst": 1000})
+    with tracking(tracker):
+        call(handler, "Research Analyst", chat_result(1000, 200))
+        call(handler, "Integration Specialist", chat_result(1000, 200))
+        with pytest.raises(BudgetExceededError):
+            call(handler, "Research Analyst", chat_result(10, 10))
+    assert tracker.summary()["agents"]["Integration Specialist"]["calls"] == 1
@@ -0,0 +1,231 @@
+# Lightweight tracing for agent runs.
+# Spans cover the run, each task, agent iterations, LLM calls, tool calls and
+# report generation, with durations and payload sizes. Finished traces are
+# appended to a local JSONL file and can also be written as OTLP/JSON, the
+# OpenTelemetry file format accepted by collectors and trace viewers.
+from langchain_core.callbacks import BaseCallbackHandler
+from events import get_current_task
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import os
+import secrets
+import threading
+import time
+
+DEFAULT_TRACE_PATH = os.path.join(".cache", "traces.jsonl")
+
+_tracer = ContextVar("market_research_tracer", default=None)
+_current_span = ContextVar("market_research_current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, path: str = DEFAULT_TRACE_PATH, otlp_path: str = None, service_name: str = "market-research"):
+        self.path = path
+        self.otlp_path = otlp_path
+        self.service_name = service_name
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self._iteration_marks = {}
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: str, parent=None, **attributes) -> dict:
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": secrets.token_hex(8),
+            "parent_id": parent["span_id"] if parent else None,
+            "name": name,
+            "kind": kind,
+            "start": time.time(),
+            "end": None,
+            "duration": None,
+            "status": "ok",
+            "attributes": attributes
+        }
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def end_span(self, span: dict, error: Exception = None, **attributes):
+        _finish(span, error, attributes)
+
+    # Close one agent iteration: the time since the previous iteration of the same
+    # task (or since the enclosing span started) becomes an agent_iteration span
+    def mark_iteration(self, parent, task: str, **attributes):
+        now = time.time()
+        key = (parent["span_id"] if parent else None, task)
+        with self._lock:
+            started = self._iteration_marks.get(key, parent["start"] if parent else now)
+            self._iteration_marks[key] = now
+        iteration = self.start_span("agent_iteration", "agent_iteration", parent=parent, task=task, **attributes)
+        iteration["start"] = started
+        _finish(iteration, None, {})
+
+    # Time and count per span kind, plus the slowest spans
+    def summary(self) -> dict:
+        with self._lock:
+            spans = [span for span in self.spans if span["duration"] is not None]
+        kinds = {}
+        for span in spans:
+            stats = kinds.setdefault(span["kind"], {"count": 0, "total_duration": 0.0, "max_duration": 0.0})
+            stats["count"] += 1
+            stats["total_duration"] += span["duration"]
+            stats["max_duration"] = max(stats["max_duration"], span["duration"])
+        slowest = sorted(spans, key=lambda span: span["duration"], reverse=True)[:10]
+        return {
+            "trace_id": self.trace_id,
+            "kinds": kinds,
+            "slowest": [
+                {"name": span["name"], "kind": span["kind"], "duration": span["duration"]}
+                for span in slowest
+            ]
+        }
+
+    def export(self):
+        with self._lock:
+            spans = list(self.spans)
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps(span, default=str) + "\n")
+
+        if self.otlp_path:
+            directory = os.path.dirname(self.otlp_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.otlp_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(to_otlp(spans, self.service_name)) + "\n")
+
+
+def _finish(span: dict, error, attributes: dict):
+    span["end"] = time.time()
+    span["duration"] = span["end"] - span["start"]
+    span["attributes"].update(attributes)
+    if error is not None:
+        span["status"] = "error"
+        span["attributes"]["error"] = str(error)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# OTLP/JSON ExportTraceServiceRequest for a list of finished spans
+def to_otlp(spans: list, service_name: str) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]
+            },
+            "scopeSpans": [{
+                "scope": {"name": "market_research.tracing"},
+                "spans": [
+                    {
+                        "traceId": span["trace_id"],
+                        "spanId": span["span_id"],
+                        "parentSpanId": span["parent_id"] or "",
+                        "name": span["name"],
+                        "kind": 1,
+                        "startTimeUnixNano": str(int(span["start"] * 1e9)),
+                        "endTimeUnixNano": str(int((span["end"] or span["start"]) * 1e9)),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)}
+                            for key, value in dict(span["attributes"], kind=span["kind"]).items()
+                        ],
+                        "status": {"code": 2 if span["status"] == "error" else 1}
+                    }
+                    for span in spans
+                ]
+            }]
+        }]
+    }
+
+
+# Record spans created in this context with tracer
+@contextmanager
+def tracing(tracer: Tracer):
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+
+
+# Start a span under the current one without making it current (for callback pairs)
+def start_span(name: str, kind: str, **attributes):
+    tracer = _tracer.get()
+    if tracer is None:
+        return None
+    return tracer.start_span(name, kind, parent=_current_span.get(), **attributes)
+
+
+def end_span(span, error: Exception = None, **attributes):
+    if span is not None:
+        _finish(span, error, attributes)
+
+
+# Record an agent iteration for the task executing in this context
+def mark_iteration(**attributes):
+    tracer = _tracer.get()
+    if tracer is not None:
+        tracer.mark_iteration(_current_span.get(), get_current_task(), **attributes)
+
+
+# Time a block as a span nested under the current one; yields the span's attribute
+# dict (or a throwaway dict when tracing is off) so callers can add payload sizes
+@contextmanager
+def span(name: str, kind: str, **attributes):
+    tracer = _tracer.get()
+    if tracer is None:
+        yield dict(attributes)
+        return
+
+    current = tracer.start_span(name, kind, parent=_current_span.get(), **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current["attributes"]
+    except Exception as e:
+        tracer.end_span(current, error=e)
+        raise
+    else:
+        tracer.end_span(current)
+    finally:
+        _current_span.reset(token)
+
+
+# LangChain callback turning every LLM call into an llm_call span
+class TracingCallbackHandler(BaseCallbackHandler):
+    def __init__(self):
+        self._spans = {}
+
+    def _start(self, run_id, prompt_chars: int, **kwargs):
+        current = start_span("llm_call", "llm_call", prompt_chars=prompt_chars)
+        if current is not None:
+            self._spans[run_id] = current
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, sum(len(prompt) for prompt in prompts))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, sum(len(str(message.content)) for batch in messages for message in batch))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        completion_chars = sum(len(generation.text) for generations in response.generations
+                               for generation in generations)
+        end_span(current, completion_chars=completion_chars)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        end_span(self._spans.pop(run_id, None), error=error)
@@ -0,0 +1,163 @@
+# Token, cost and latency accounting per agent task, with run budgets.
+# Like progress events, the tracker for the current run lives in a context
+# variable so LLM clients shared between analyses charge the right run.
+from langchain_core.callbacks import BaseCallbackHandler
+from events import get_current_task
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+# USD per 1K (prompt, completion) tokens
+MODEL_PRICES = {
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015)
+}
+
+_tracker = ContextVar("market_research_usage_tracker", default=None)
+
+
+class BudgetExceededError(Exception):
+    pass
+
+
+# Longest known model name that prefixes the reported one, e.g. dated snapshots
+def model_price(model: str) -> tuple:
+    matches = [name for name in MODEL_PRICES if model and model.startswith(name)]
+    if not matches:
+        return (0.0, 0.0)
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+class UsageTracker:
+    # max_run_tokens / max_run_cost cap the whole run; max_agent_tokens caps every
+    # agent task, or individual ones when given as a {task label: tokens} dict
+    def __init__(self, max_run_tokens: int = None, max_run_cost: float = None, max_agent_tokens=None):
+        self.max_run_tokens = max_run_tokens
+        self.max_run_cost = max_run_cost
+        self.max_agent_tokens = max_agent_tokens
+        self.agents = {}
+        self._lock = threading.Lock()
+
+    def _agent(self, task: str) -> dict:
+        return self.agents.setdefault(task or "unassigned", {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cost": 0.0,
+            "latency": 0.0
+        })
+
+    def _agent_limit(self, task: str):
+        if isinstance(self.max_agent_tokens, dict):
+            return self.max_agent_tokens.get(task)
+        return self.max_agent_tokens
+
+    def totals(self) -> dict:
+        with self._lock:
+            totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0,
+                      "cost": 0.0, "latency": 0.0}
+            for stats in self.agents.values():
+                for name in totals:
+                    totals[name] += stats[name]
+            return totals
+
+    # Raise before an LLM call if the run or this agent has used up its budget
+    def check(self, task: str):
+        totals = self.totals()
+        if self.max_run_tokens is not None and totals["total_tokens"] >= self.max_run_tokens:
+            raise BudgetExceededError(
+                f"Run token budget exceeded: {totals['total_tokens']} of {self.max_run_tokens} tokens used"
+            )
+        if self.max_run_cost is not None and totals["cost"] >= self.max_run_cost:
+            raise BudgetExceededError(
+                f"Run cost budget exceeded: ${totals['cost']:.2f} of ${self.max_run_cost:.2f} spent"
+            )
+
+        limit = self._agent_limit(task)
+        if limit is not None:
+            with self._lock:
+                used = self._agent(task)["total_tokens"]
+            if used >= limit:
+                raise BudgetExceededError(f"Token budget for {task} exceeded: {used} of {limit} tokens used")
+
+    def record(self, task: str, model: str, prompt_tokens: int, completion_tokens: int, latency: float):
+        prompt_price, completion_price = model_price(model)
+        with self._lock:
+            stats = self._agent(task)
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["total_tokens"] += prompt_tokens + completion_tokens
+            stats["cost"] += (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+            stats["latency"] += latency
+
+    def summary(self) -> dict:
+        totals = self.totals()
+        with self._lock:
+            agents = {task: dict(stats) for task, stats in self.agents.items()}
+        return {"agents": agents, "totals": totals}
+
+
+# Charge LLM calls made in this context to tracker
+@contextmanager
+def tracking(tracker: UsageTracker):
+    token = _tracker.set(tracker)
+    try:
+        yield
+    finally:
+        _tracker.reset(token)
+
+
+def _token_usage(response) -> tuple:
+    # Chat models report usage on the message; older ones in llm_output
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+# LangChain callback recording usage into the current run's tracker.
+# raise_error lets a BudgetExceededError abort the call instead of being logged.
+class UsageCallbackHandler(BaseCallbackHandler):
+    raise_error = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started = {}
+
+    def _start(self, run_id):
+        tracker = _tracker.get()
+        if tracker is None:
+            return
+        tracker.check(get_current_task())
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        tracker = _tracker.get()
+        started = self._started.pop(run_id, None)
+        if tracker is None or started is None:
+            return
+        prompt_tokens, completion_tokens = _token_usage(response)
+        model = (response.llm_output or {}).get("model_name") or self.model
+        tracker.record(get_current_task(), model, prompt_tokens, completion_tokens,
+                       time.perf_counter() - started)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)